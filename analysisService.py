@@ -0,0 +1,417 @@
+"""
+@date 2026.10.18
+
+an asyncio analysis service: Jack source in, XML out, over a local socket,
+for programs such as a grading backend that can't wait on a blocking call.
+
+	python analysisService.py --socket /tmp/jack.sock --workers 4
+	python analysisService.py --socket /tmp/jack.sock --send Main.jack
+	python analysisService.py --socket /tmp/jack.sock --stats
+
+the protocol is one JSON object per line each way. requests are
+	{"id": any, "source": text, "filename": name or null, "tokens": false,
+	 "timeout": seconds or null}
+and each is answered, in the order they finish, with
+	{"id": any, "xml": text or null, "error": null or message,
+	 "seconds": float}
+where seconds runs from the request being read to its answer. a client can
+pipeline any number of requests on one connection and match the answers by
+id. {"stats": true} is answered with the stats() of the service.
+
+parses run in a process pool, or a thread pool with --threads, of --workers
+workers, fed by that many worker tasks from one queue of --queue requests.
+when the queue is full, a connection's next request isn't read until there
+is room, so a client that sends faster than the pool parses is slowed down
+by its socket instead of growing the server's memory. a request that can't
+be answered within its timeout, counted from when it was read, is answered
+with an error; if its parse has already started it runs to the end, still
+holding its worker, since a process can't be interrupted part way through.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from analyzer import analyze
+from tokenizer import JackTokenizer
+from xmlWriter import tokensXml
+
+# longest request line read, in bytes; a request is the whole Jack source
+MAX_REQUEST_BYTES = 16 << 20
+
+
+# parses one class in an executor worker. returns (xml, error) rather than
+# raising, like syntaxAnalyzer.compileFile, so a syntax error is a result.
+# tokensOnly only tokenizes, as syntaxAnalyzer --tokens does: the listing
+# costs a lexing pass, and source that lexes but doesn't parse still has one
+def analyzeSource(source, filename, tokensOnly=False):
+	try:
+		if tokensOnly:
+			tokens = JackTokenizer(
+				filename or '<source>', 'regex', source=source).tokens
+			return tokensXml(tokens), None
+		return analyze(source, filename).xml, None
+	except Exception as e:
+		return None, f'{type(e).__name__}: {e}'
+
+
+# nearest-rank percentiles of values, in seconds, as milliseconds
+def percentiles(values, points=(50, 90, 99)):
+	ranked = sorted(values)
+	if not ranked:
+		return {f'p{point}': None for point in points}
+	return {f'p{point}': ranked[max(0, -(-len(ranked) * point // 100) - 1)]
+			* 1000 for point in points}
+
+
+class Job:
+	"""
+	one queued request. future gets (xml, error) once a worker has parsed it,
+	or is cancelled if the request times out first
+	"""
+
+	__slots__ = ('source', 'filename', 'tokensOnly', 'future')
+
+	def __init__(self, source, filename, tokensOnly, future):
+		self.source = source
+		self.filename = filename
+		self.tokensOnly = tokensOnly
+		self.future = future
+
+
+class AnalysisService:
+	"""
+	:param workers: parses run at once (default: one per core)
+	:param queueSize: requests waiting for a worker before connections stop
+		being read (default: four per worker)
+	:param timeout: seconds a request may take unless it gives its own
+	:param threads: parse in a thread pool instead of a process pool. threads
+		start faster and share memory, but parse one at a time under the GIL
+	:param window: how many of the latest requests latency percentiles cover
+	"""
+
+	def __init__(self, workers=None, queueSize=None, timeout=30.0,
+				 threads=False, window=10000):
+		self.workers = workers or os.cpu_count() or 1
+		self.queueSize = queueSize or 4 * self.workers
+		self.timeout = timeout
+		self.threads = threads
+
+		self.queue = None  # made in start(), inside the running event loop
+		self.executor = None
+		self.tasks = []
+		self.connections = set()  # handleConnection tasks
+		self.server = None
+		self.socketPath = None
+
+		self.started = None
+		self.requests = 0
+		self.completed = 0  # answered with xml
+		self.failed = 0  # answered with a syntax error
+		self.timeouts = 0
+		self.rejected = 0  # bad requests
+		self.running = 0
+		self.latencies = deque(maxlen=window)  # read → answered, seconds
+		self.waits = deque(maxlen=window)  # read → parse started, seconds
+
+	async def start(self, socketPath=None, port=None):
+		"""
+		starts the workers and listens on a Unix socket at socketPath, or on
+		127.0.0.1:port
+		"""
+		self.queue = asyncio.Queue(self.queueSize)
+		if self.threads:
+			self.executor = ThreadPoolExecutor(self.workers)
+		else:
+			self.executor = ProcessPoolExecutor(self.workers)
+		self.tasks = [asyncio.create_task(self.worker())
+					  for n in range(self.workers)]
+		self.started = time.perf_counter()
+
+		self.socketPath = socketPath
+		if socketPath is not None:
+			# a socket file left by a service that didn't shut down cleanly
+			if os.path.exists(socketPath) and \
+				stat.S_ISSOCK(os.stat(socketPath).st_mode):
+				os.remove(socketPath)
+			self.server = await asyncio.start_unix_server(
+				self.handleConnection, socketPath, limit=MAX_REQUEST_BYTES)
+		else:
+			self.server = await asyncio.start_server(
+				self.handleConnection, '127.0.0.1', port,
+				limit=MAX_REQUEST_BYTES)
+		return self.server
+
+	async def close(self):
+		if self.server is not None:
+			self.server.close()
+		tasks = self.tasks + list(self.connections)
+		for task in tasks:
+			task.cancel()
+		await asyncio.gather(*tasks, return_exceptions=True)
+		if self.server is not None:
+			await self.server.wait_closed()
+		if self.socketPath is not None and os.path.exists(self.socketPath):
+			os.remove(self.socketPath)
+		if self.executor is not None:
+			self.executor.shutdown(cancel_futures=True)
+
+	# takes jobs off the queue and parses each in the executor, one at a time
+	async def worker(self):
+		loop = asyncio.get_running_loop()
+		while True:
+			job, received = await self.queue.get()
+			try:
+				if job.future.done():
+					continue  # timed out while it waited
+				self.waits.append(time.perf_counter() - received)
+				self.running += 1
+				try:
+					result = await loop.run_in_executor(
+						self.executor, analyzeSource, job.source, job.filename,
+						job.tokensOnly)
+				finally:
+					self.running -= 1
+				if not job.future.done():
+					job.future.set_result(result)
+			except asyncio.CancelledError:
+				raise
+			except Exception as e:
+				# the executor itself failed, e.g. a worker process died
+				if not job.future.done():
+					job.future.set_result((None, f'{type(e).__name__}: {e}'))
+			finally:
+				self.queue.task_done()
+
+	async def handleConnection(self, reader, writer):
+		connection = asyncio.current_task()
+		self.connections.add(connection)
+		answers = set()
+		try:
+			while True:
+				try:
+					line = await reader.readline()
+				except ValueError:
+					self.rejected += 1
+					await self.send(writer, {'error': 'bad request: longer than '
+											 f'{MAX_REQUEST_BYTES} bytes'})
+					break
+				if not line:
+					break
+				received = time.perf_counter()
+
+				try:
+					request = json.loads(line)
+					if request.get('stats'):
+						await self.send(writer, self.stats())
+						continue
+					job, timeout = self.job(request)
+				except (ValueError, KeyError, TypeError, AttributeError) as e:
+					self.rejected += 1
+					await self.send(writer, {
+						'error': f'bad request: {type(e).__name__}: {e}'})
+					continue
+
+				# waiting here for room in the queue stops this connection
+				# being read: that's the backpressure
+				self.requests += 1
+				requestId = request.get('id')
+				try:
+					await asyncio.wait_for(
+						self.queue.put((job, received)), timeout)
+				except asyncio.TimeoutError:
+					job.future.cancel()
+					self.timeouts += 1
+					await self.send(writer, self.answer(
+						requestId, None, f'timed out after {timeout}s waiting '
+						'for a worker', received))
+					continue
+
+				task = asyncio.create_task(
+					self.answerWhenDone(writer, requestId, job, received,
+										timeout))
+				answers.add(task)
+				task.add_done_callback(answers.discard)
+
+			if answers:
+				await asyncio.gather(*answers, return_exceptions=True)
+		except ConnectionError:
+			pass  # the client went away; its queued jobs still finish
+		except asyncio.CancelledError:
+			# close() ends open connections. the server's streams would log
+			# a handler that ends cancelled as an error
+			for task in answers:
+				task.cancel()
+		finally:
+			self.connections.discard(connection)
+			writer.close()
+
+	# a Job for a parsed request line, and its timeout in seconds
+	def job(self, request):
+		source = request['source']
+		if not isinstance(source, str):
+			raise TypeError(f'source is {type(source).__name__}, not text')
+		timeout = request.get('timeout') or self.timeout
+		if not 0 < timeout:
+			raise ValueError(f'timeout {timeout} is not positive')
+		future = asyncio.get_running_loop().create_future()
+		job = Job(source, request.get('filename') or '<source>',
+				  bool(request.get('tokens', False)), future)
+		return job, float(timeout)
+
+	async def answerWhenDone(self, writer, requestId, job, received, timeout):
+		remaining = timeout - (time.perf_counter() - received)
+		try:
+			xml, error = await asyncio.wait_for(job.future, max(remaining, 0))
+		except asyncio.TimeoutError:
+			self.timeouts += 1
+			xml, error = None, f'timed out after {timeout}s'
+		else:
+			if error is None:
+				self.completed += 1
+			else:
+				self.failed += 1
+		await self.send(writer, self.answer(requestId, xml, error, received))
+
+	def answer(self, requestId, xml, error, received):
+		seconds = time.perf_counter() - received
+		self.latencies.append(seconds)
+		return {'id': requestId, 'xml': xml, 'error': error,
+				'seconds': seconds}
+
+	@staticmethod
+	async def send(writer, reply):
+		writer.write(json.dumps(reply).encode() + b'\n')
+		await writer.drain()
+
+	def stats(self) -> dict:
+		"""
+		counts since start(), the queue and pool as they are now, and
+		percentiles in milliseconds over the latest requests: latency from a
+		request being read to its answer, and wait for a worker
+		"""
+		return {
+			'uptime': time.perf_counter() - self.started,
+			'workers': self.workers,
+			'executor': 'threads' if self.threads else 'processes',
+			'requests': self.requests,
+			'completed': self.completed,
+			'failed': self.failed,
+			'timeouts': self.timeouts,
+			'rejected': self.rejected,
+			'queued': self.queue.qsize(),
+			'queueSize': self.queueSize,
+			'running': self.running,
+			'latency': percentiles(self.latencies),
+			'wait': percentiles(self.waits),
+		}
+
+
+# sends requests to a running service and returns their replies, in the
+# order they come back
+def sendRequests(address, requests):
+	family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+	with socket.socket(family, socket.SOCK_STREAM) as client:
+		client.connect(address)
+		client.sendall(b''.join(
+			json.dumps(request).encode() + b'\n' for request in requests))
+		with client.makefile('rb') as replies:
+			return [json.loads(replies.readline()) for request in requests]
+
+
+async def serve(service, socketPath=None, port=None):
+	server = await service.start(socketPath, port)
+	where = socketPath or f'127.0.0.1:{server.sockets[0].getsockname()[1]}'
+	print(f'listening on {where}', flush=True)
+
+	stop = asyncio.Event()
+	loop = asyncio.get_running_loop()
+	for signum in (signal.SIGINT, signal.SIGTERM):
+		loop.add_signal_handler(signum, stop.set)
+	try:
+		await stop.wait()
+	finally:
+		await service.close()
+		print(json.dumps(service.stats()), flush=True)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument(
+		'paths', nargs='*', help='client mode: .jack files to send')
+	parser.add_argument(
+		'--socket', metavar='PATH', default=None,
+		help='listen on, or with --send/--stats connect to, this Unix socket')
+	parser.add_argument(
+		'--port', type=int, default=None,
+		help='use 127.0.0.1:PORT instead of a Unix socket')
+	parser.add_argument(
+		'--workers', type=int, default=None,
+		help='parses run at once (default: one per core)')
+	parser.add_argument(
+		'--threads', action='store_true',
+		help='parse in a thread pool instead of a process pool')
+	parser.add_argument(
+		'--queue', metavar='N', type=int, default=None,
+		help='requests waiting for a worker before clients are slowed down '
+			 '(default: four per worker)')
+	parser.add_argument(
+		'--timeout', type=float, default=30.0,
+		help='seconds a request may take unless it sets its own')
+	parser.add_argument(
+		'--tokens', action='store_true',
+		help='client mode: ask for XxxT.xml <tokens> listings')
+	parser.add_argument(
+		'--send', action='store_true',
+		help='client mode: send paths to the service and print the XML')
+	parser.add_argument(
+		'--stats', action='store_true',
+		help='client mode: print the service\'s stats')
+	args = parser.parse_args(argv)
+
+	if args.socket is None and args.port is None:
+		parser.error('give a --socket or a --port')
+	address = args.socket if args.port is None else ('127.0.0.1', args.port)
+
+	if args.stats:
+		print(json.dumps(sendRequests(address, [{'stats': True}])[0],
+						 indent=2))
+		return 0
+
+	if args.send:
+		if not args.paths:
+			parser.error('--send needs .jack files to send')
+		requests = []
+		for path in args.paths:
+			with open(path, 'r') as jack_file:
+				requests.append({'id': path, 'source': jack_file.read(),
+								 'filename': path, 'tokens': args.tokens})
+		replies = {reply['id']: reply
+				   for reply in sendRequests(address, requests)}
+		failures = 0
+		for reply in map(replies.get, args.paths):
+			if reply['error'] is not None:
+				failures += 1
+				print(f'FAIL  {reply["id"]}: {reply["error"]}', file=sys.stderr)
+			else:
+				sys.stdout.write(reply['xml'])
+		return 1 if failures else 0
+
+	if args.paths:
+		parser.error('paths are only for --send')
+	service = AnalysisService(args.workers, args.queue, args.timeout,
+							  args.threads)
+	asyncio.run(serve(service, args.socket, args.port))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
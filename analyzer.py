@@ -0,0 +1,100 @@
+"""
+@date 2026.10.18
+
+the syntax analyzer as a library: analyze() parses Jack source held in memory
+or in a file and returns the XML, without writing any files.
+
+	from analyzer import analyze
+	result = analyze('class Main { }')
+	result.xml        # what syntaxAnalyzer.py would write to Main.xml
+	result.tokensXml  # what --tokens would write to MainT.xml
+	analyze(Path('tests/Square/Main.jack'), tree=True).tree
+
+importing this module does no I/O and imports nothing beyond os. the
+tokenizer and compilation engine are imported by the first analyze() call, so
+tools that import it without analyzing anything don't pay for them. see
+benchmarks/startup.py for what an import costs
+"""
+
+import os
+
+
+class Analysis:
+	"""
+	what analyze() made of one class
+		filename: the path it was read from, or the name it was given
+		tokens: its TokenStream
+		xml: the parse as project 10 XML, the Xxx.xml format
+		tree: the root ParseNode, if analyze() was asked for the tree
+		symbols: the class's SymbolTable, with every subroutine's scope
+	"""
+
+	__slots__ = ('filename', 'tokens', 'xml', 'tree', 'symbols')
+
+	def __init__(self, filename, tokens, xml, tree=None, symbols=None):
+		self.filename = filename
+		self.tokens = tokens
+		self.xml = xml
+		self.tree = tree
+		self.symbols = symbols
+
+	def __repr__(self):
+		return f'Analysis({self.filename!r}, {len(self.tokens)} tokens)'
+
+	# the <tokens> listing, the XxxT.xml format. made when asked for, since
+	# most callers only want the parse
+	@property
+	def tokensXml(self):
+		from xmlWriter import tokensXml
+		return tokensXml(self.tokens)
+
+
+def analyze(source, filename=None, tree=False, symbols=False):
+	"""
+	tokenizes and parses one Jack class
+
+	:param source: the source text as a str, or as UTF-8 bytes, or the path
+		of a .jack file as an os.PathLike such as a pathlib.Path. a str is
+		always source text, never a path
+	:param filename: names source text in error messages. defaults to
+		'<source>'; a path names itself
+	:param tree: also keep the parse tree, as result.tree
+	:param symbols: annotate the identifiers of variables in the XML, and
+		the tree, with their kind, type, and index. result.symbols has the
+		symbol tables either way
+	:raises ValueError: on a syntax error, naming the filename:line:column
+		where it was found
+	:return: Analysis
+	"""
+	# imported on first use: see the module docstring
+	import io
+	from compilationEngine import CompilationEngine
+	from parseTree import writeXml
+
+	if isinstance(source, os.PathLike):
+		filename = os.fspath(source)
+		text = None
+	elif isinstance(source, (bytes, bytearray, memoryview)):
+		text = str(source, 'utf-8')
+	elif isinstance(source, str):
+		text = source
+	else:
+		raise TypeError(f'analyze() takes source text, bytes, or a path, '
+						f'not {type(source).__name__}')
+	if filename is None:
+		filename = '<source>'
+
+	buffer = io.StringIO()
+	ce = CompilationEngine(filename, None if tree else buffer, 'regex',
+						   buildTree=tree, source=text, annotateSymbols=symbols)
+	try:
+		ce.compileClass()
+	finally:
+		ce.close()
+
+	root = None
+	if tree:
+		root = ce.out.root
+		writeXml(root, buffer)
+	return Analysis(filename, ce.tk.tokens, buffer.getvalue(), root,
+					ce.symbols)
@@ -0,0 +1,231 @@
+"""
+@date 2026.10.18
+
+keeps the analyzer resident so compiles don't pay for interpreter startup
+and imports every time.
+
+it watches source trees by polling file mtimes and recompiles only the .jack
+files that are new or have changed. it can also take compile requests from
+other programs, e.g. an editor, over a Unix socket where the platform has
+them; watching works everywhere:
+
+	python analyzerDaemon.py tests -o out --socket /tmp/jack.sock
+	python analyzerDaemon.py --send /tmp/jack.sock tests/Square/Main.jack
+
+the socket protocol is one JSON object per line each way. requests are
+	{"jack": path, "xml": path or null, "tokens": false}
+and each is answered with
+	{"jack": path, "xml": path, "error": null or message, "seconds": float}
+a client can keep its connection open for any number of requests.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from pathlib import Path
+
+from syntaxAnalyzer import compileFile, findJackFiles
+
+
+class SourceWatcher:
+	"""
+	finds the .jack files under paths that are new or changed since the last
+	scan, from their (mtime, size). polling is one stat() per file per scan:
+	portable, dependency-free, and with no inotify watch limits to run into
+	on large trees
+	"""
+
+	def __init__(self, paths, outputDir=None, suffix='.xml'):
+		self.paths = paths
+		self.outputDir = outputDir
+		self.suffix = suffix
+		self.seen = {}  # jackPath → (mtime_ns, size) at the last scan
+
+	# (jackPath, xmlPath) of every file that changed. the first scan returns
+	# them all. files that disappear are forgotten, so they count as new if
+	# they come back
+	def scan(self):
+		try:
+			jobs = findJackFiles(self.paths, self.outputDir, self.suffix)
+		except ValueError:
+			jobs = []  # a watched path is gone; maybe it'll be back
+
+		changed = []
+		current = {}
+		for jackPath, xmlPath in jobs:
+			try:
+				status = jackPath.stat()
+			except FileNotFoundError:
+				continue
+			stamp = status.st_mtime_ns, status.st_size
+			current[jackPath] = stamp
+			if self.seen.get(jackPath) != stamp:
+				changed.append((jackPath, xmlPath))
+
+		self.seen = current
+		return changed
+
+
+# output path → the lock its compiles hold. the watch loop and the socket's
+# handler threads may be asked for the same file at once; two compiles
+# writing one .xml would interleave their output
+compileLocks = {}
+compileLocksGuard = threading.Lock()
+
+
+# compileFile, one compile at a time per output path
+def compileLocked(jackPath, xmlPath, **options):
+	with compileLocksGuard:
+		lock = compileLocks.setdefault(xmlPath.resolve(), threading.Lock())
+	with lock:
+		return compileFile(jackPath, xmlPath, **options)
+
+
+# handles one client connection: a JSON request per line, a JSON reply per line
+class CompileRequestHandler(socketserver.StreamRequestHandler):
+	def handle(self):
+		for line in self.rfile:
+			self.wfile.write(json.dumps(self.reply(line)).encode() + b'\n')
+
+	def reply(self, line):
+		try:
+			request = json.loads(line)
+			jackPath = Path(request['jack'])
+			tokensOnly = bool(request.get('tokens', False))
+			if request.get('xml'):
+				xmlPath = Path(request['xml'])
+			else:
+				suffix = 'T.xml' if tokensOnly else '.xml'
+				xmlPath = jackPath.with_name(jackPath.stem + suffix)
+		except (ValueError, KeyError, TypeError) as e:
+			return {'error': f'bad request: {type(e).__name__}: {e}'}
+
+		jackPath, error, seconds, cached = compileLocked(
+			jackPath, xmlPath, engine=self.server.engine, tokensOnly=tokensOnly)
+		return {'jack': str(jackPath), 'xml': str(xmlPath), 'error': error,
+				'seconds': seconds}
+
+
+# socketserver only defines its Unix socket servers where there are Unix
+# sockets, e.g. not on older Windows. without them AnalyzerServer is None
+# and the daemon can only watch
+if hasattr(socket, 'AF_UNIX'):
+	class AnalyzerServer(socketserver.ThreadingUnixStreamServer):
+		daemon_threads = True
+
+		def __init__(self, socketPath, engine='regex'):
+			self.engine = engine
+
+			# a socket file left by a daemon that didn't shut down cleanly
+			if os.path.exists(socketPath) and \
+				stat.S_ISSOCK(os.stat(socketPath).st_mode):
+				os.remove(socketPath)
+			super().__init__(socketPath, CompileRequestHandler)
+
+		def server_close(self):
+			super().server_close()
+			if os.path.exists(self.server_address):
+				os.remove(self.server_address)
+else:
+	AnalyzerServer = None
+
+
+# sends one compile request to a running daemon and returns its reply
+def sendRequest(socketPath, jackUri, xmlUri=None, tokensOnly=False):
+	request = {'jack': str(Path(jackUri).resolve()),
+			   'xml': str(Path(xmlUri).resolve()) if xmlUri else None,
+			   'tokens': tokensOnly}
+	with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+		client.connect(socketPath)
+		client.sendall(json.dumps(request).encode() + b'\n')
+		with client.makefile('rb') as replies:
+			return json.loads(replies.readline())
+
+
+# recompiles whatever changed every interval seconds, until interrupted
+def watch(watcher, interval, engine='regex', tokensOnly=False):
+	while True:
+		for jackPath, xmlPath in watcher.scan():
+			jackPath, error, seconds, cached = compileLocked(
+				jackPath, xmlPath, engine=engine, tokensOnly=tokensOnly)
+			if error is not None:
+				print(f'FAIL  {jackPath}: {error}', flush=True)
+			else:
+				print(f'ok    {jackPath}  {seconds * 1000:.1f} ms', flush=True)
+		time.sleep(interval)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument(
+		'paths', nargs='*',
+		help='.jack files, or directories to search for .jack files')
+	parser.add_argument(
+		'-o', '--output-dir', default=None,
+		help='write .xml files here instead of next to each .jack file')
+	parser.add_argument(
+		'--engine', choices=['char', 'regex', 'stream', 'mmap'],
+		default='regex', help='JackTokenizer engine (default: regex)')
+	parser.add_argument(
+		'--tokens', action='store_true',
+		help='only tokenize: write XxxT.xml <tokens> listings')
+	parser.add_argument(
+		'--interval', type=float, default=0.5,
+		help='seconds between scans for changed files')
+	parser.add_argument(
+		'--socket', metavar='PATH', default=None,
+		help='also accept compile requests on this Unix socket')
+	parser.add_argument(
+		'--send', metavar='SOCKET', default=None,
+		help='client mode: ask the daemon on SOCKET to compile paths[0], '
+			 'to paths[1] if given')
+	args = parser.parse_args(argv)
+
+	if (args.socket or args.send) and AnalyzerServer is None:
+		parser.error('--socket and --send need Unix sockets, which this '
+					 'platform lacks; watch paths instead')
+
+	if args.send:
+		if not 1 <= len(args.paths) <= 2:
+			parser.error('--send takes a .jack file and optionally an .xml path')
+		reply = sendRequest(args.send, *args.paths, tokensOnly=args.tokens)
+		print(json.dumps(reply))
+		return 0 if reply.get('error') is None else 1
+
+	if not args.paths and not args.socket:
+		parser.error('give paths to watch, a --socket to serve, or both')
+
+	# a plain kill should still remove the socket file, below
+	signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+	server = None
+	if args.socket:
+		server = AnalyzerServer(args.socket, args.engine)
+		threading.Thread(target=server.serve_forever, daemon=True).start()
+		print(f'listening on {args.socket}', flush=True)
+
+	try:
+		if args.paths:
+			watcher = SourceWatcher(args.paths, args.output_dir,
+									'T.xml' if args.tokens else '.xml')
+			watch(watcher, args.interval, args.engine, args.tokens)
+		else:
+			threading.Event().wait()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		if server is not None:
+			server.shutdown()
+			server.server_close()
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+@date 2026.10.18
+
+stress benchmark for deeply nested expressions: a class with one let
+statement whose expression nests depth levels deep, cycling through every
+way an expression can contain another: parentheses, array indexes, call
+arguments, and unary ops.
+
+	python -m benchmarks.deepExpressions
+	python -m benchmarks.deepExpressions --depths 10 1000 100000
+
+for each depth it times CompilationEngine building a parse tree, and up to
+--xml-depth also writing indented XML to os.devnull. indentation makes XML
+size grow with the square of the depth, so past a few thousand levels only
+the tree is built. a recursive expression parser overflows python's stack
+somewhere under 1000 levels; this one has no limit but memory.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from compilationEngine import CompilationEngine
+
+# (before, after) the inner expression at each level, cycled through
+NESTINGS = [
+	('(x + ', ')'),
+	('a[', ']'),
+	('Math.max(1, ', ')'),
+	('-(', ')'),
+	('~g(', ')'),
+]
+
+
+def nestedExpression(depth):
+	before = []
+	after = []
+	for level in range(depth):
+		opening, closing = NESTINGS[level % len(NESTINGS)]
+		before.append(opening)
+		after.append(closing)
+	after.reverse()
+	return ''.join(before) + 'x' + ''.join(after)
+
+
+def deepClass(depth):
+	return (
+		'class Deep {\n'
+		'\tfunction int f() {\n'
+		'\t\tvar int x;\n'
+		f'\t\tlet x = {nestedExpression(depth)};\n'
+		'\t\treturn x;\n'
+		'\t}\n'
+		'}\n')
+
+
+def compileOnce(uri, engine, xml):
+	if xml:
+		ce = CompilationEngine(uri, os.devnull, engine)
+	else:
+		ce = CompilationEngine(uri, None, engine, buildTree=True)
+	ce.compileClass()
+	ce.close()
+
+
+def bestOf(function, repeat):
+	times = []
+	for n in range(repeat):
+		start = time.perf_counter()
+		function()
+		times.append(time.perf_counter() - start)
+	return min(times)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--depths', type=int, nargs='+',
+						default=[10, 1000, 100000])
+	parser.add_argument('--engine', default='regex',
+						choices=['char', 'regex', 'stream', 'mmap'])
+	parser.add_argument('--xml-depth', type=int, default=2000,
+						help='deepest nesting to also write as XML')
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args(argv)
+
+	for depth in args.depths:
+		handle, uri = tempfile.mkstemp(suffix='.jack')
+		with os.fdopen(handle, 'w') as f:
+			f.write(deepClass(depth))
+
+		try:
+			line = f'depth {depth:>7}:'
+			seconds = bestOf(
+				lambda: compileOnce(uri, args.engine, False), args.repeat)
+			line += f' tree {seconds:8.3f}s {seconds / depth * 1e6:7.1f} µs/level'
+			if depth <= args.xml_depth:
+				seconds = bestOf(
+					lambda: compileOnce(uri, args.engine, True), args.repeat)
+				line += (f'   xml {seconds:8.3f}s '
+						 f'{seconds / depth * 1e6:7.1f} µs/level')
+			print(line)
+		finally:
+			os.remove(uri)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,81 @@
+"""
+@date 2026.10.18
+
+incremental reparse vs a full reparse of one large synthesized class (see
+jackSynth.py and incrementalParse.py), for a few typical edits made in the
+middle of the class.
+
+each edit is timed as incrementalParse.reparse() and as analyzer.analyze()
+of the whole edited text, and the two XML outputs are checked to be
+identical, as is the old XML with xmlEdit applied:
+	python -m benchmarks.incrementalReparse --subroutines 400
+"""
+
+import argparse
+import time
+
+from analyzer import analyze
+from benchmarks.jackSynth import JackSynthesizer
+from incrementalParse import parseIncremental, reparse
+
+
+# (name, start, end, text) edits around the middle of source
+def middleEdits(source):
+	middle = source.index('\tfunction', len(source) // 2)
+	statement = source.index('\t\tlet ', middle)
+	# the leading digit of an integer constant; 1 keeps it in range
+	digit = next(i for i in range(statement, len(source))
+				 if source[i].isdigit() and not source[i - 1].isdigit())
+	lineEnd = source.index('\n', statement) + 1
+	return [
+		('change a digit', digit, digit + 1, '1'),
+		('insert a statement', lineEnd, lineEnd, '\t\tlet i = i + 1;\n'),
+		('insert a subroutine', middle, middle,
+		 'function void added() {\n\t\treturn;\n\t}\n\n\t'),
+		('delete a subroutine', middle,
+		 source.index('\tfunction', middle + 1), ''),
+		('comment out a line', statement, statement, '// '),
+	]
+
+
+def bestOf(function, repeat):
+	times = []
+	for n in range(repeat):
+		start = time.perf_counter()
+		result = function()
+		times.append(time.perf_counter() - start)
+	return min(times), result
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--subroutines', type=int, default=400)
+	parser.add_argument('--statements', type=int, default=10)
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args(argv)
+
+	source = JackSynthesizer().jackClass(
+		subroutines=args.subroutines, statements=args.statements)
+	seconds, state = bestOf(
+		lambda: parseIncremental(source, 'Generated.jack'), 1)
+	print(f'{source.count(chr(10))} lines, {len(state.tokens)} tokens, '
+		  f'{len(state.members)} members; first parse {seconds:.3f}s')
+
+	for name, start, end, text in middleEdits(source):
+		edited = source[:start] + text + source[end:]
+		full, expected = bestOf(
+			lambda: analyze(edited, 'Generated.jack', tree=True), args.repeat)
+		partial, result = bestOf(
+			lambda: reparse(state, start, end, text), args.repeat)
+
+		editStart, editEnd, xml = result.xmlEdit
+		same = result.xml == expected.xml and \
+			state.xml[:editStart] + xml + state.xml[editEnd:] == expected.xml
+		print(f'{name:>20}: full {full * 1000:8.1f} ms   incremental '
+			  f'{partial * 1000:7.2f} ms  x{full / partial:6.1f}   '
+			  f'{len(result.reparsed)} reparsed, {len(xml)} chars of XML   '
+			  f'{"identical" if same else "DIFFERENT"}')
+
+
+if __name__ == '__main__':
+	main()
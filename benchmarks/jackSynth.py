@@ -0,0 +1,123 @@
+"""
+@date 2026.10.18
+
+synthesizes large, valid Jack classes for the benchmarks: many subroutines,
+long statement lists, nested expressions, and long string constants. output
+is deterministic for a given seed so runs on different commits parse exactly
+the same program.
+"""
+
+import random
+
+OPS = ['+', '-', '*', '/', '&', '|', '<', '>', '=']
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'omega', 'count', 'index', 'total']
+
+
+class JackSynthesizer:
+	def __init__(self, seed=10, expressionDepth=6, stringLength=60):
+		self.random = random.Random(seed)
+		self.expressionDepth = expressionDepth
+		self.stringLength = stringLength
+
+	def varName(self):
+		return self.random.choice(['a', 'b', 'c', 'i', 'j', 'sum', 'arr'])
+
+	def stringConstant(self):
+		words = []
+		length = 0
+		while length < self.stringLength:
+			word = self.random.choice(WORDS)
+			words.append(word)
+			length += len(word) + 1
+		return '"' + ' '.join(words)[:self.stringLength] + '"'
+
+	# a term, nesting at most depth more expressions inside it
+	def term(self, depth):
+		choices = ['int', 'var', 'keyword']
+		if depth > 0:
+			choices += ['parens', 'parens', 'unary', 'array', 'call', 'method']
+		match self.random.choice(choices):
+			case 'int':
+				return str(self.random.randint(0, 32767))
+			case 'var':
+				return self.varName()
+			case 'keyword':
+				return self.random.choice(['true', 'false', 'null', 'this'])
+			case 'parens':
+				return f'({self.expression(depth - 1)})'
+			case 'unary':
+				return self.random.choice(['-', '~']) + self.term(depth - 1)
+			case 'array':
+				return f'arr[{self.expression(depth - 1)}]'
+			case 'call':
+				return f'helper({self.expressionList(depth - 1)})'
+			case 'method':
+				return f'Math.max({self.expressionList(depth - 1)})'
+
+	# term (op term)*. only the first term nests further, so an expression's
+	# size grows linearly with depth instead of exponentially
+	def expression(self, depth):
+		terms = [self.term(depth)]
+		for n in range(self.random.randint(0, 2)):
+			terms.append(self.random.choice(OPS))
+			terms.append(self.term(0))
+		return ' '.join(terms)
+
+	def expressionList(self, depth):
+		count = self.random.randint(0, 3)
+		if count == 0:
+			return ''
+		return ', '.join(
+			[self.expression(depth)] + [self.term(0) for n in range(count - 1)])
+
+	# one statement, indented; block statements contain nested statements
+	def statement(self, indent, nesting=1):
+		pad = '\t' * indent
+		kinds = ['let', 'let', 'letArray', 'do', 'string']
+		if nesting > 0:
+			kinds += ['if', 'while']
+		depth = self.expressionDepth
+
+		match self.random.choice(kinds):
+			case 'let':
+				return f'{pad}let {self.varName()} = {self.expression(depth)};\n'
+			case 'letArray':
+				return (f'{pad}let arr[{self.expression(1)}] = '
+						f'{self.expression(depth)};\n')
+			case 'do':
+				return f'{pad}do Output.printInt({self.expression(depth)});\n'
+			case 'string':
+				return f'{pad}do Output.printString({self.stringConstant()});\n'
+			case 'if':
+				return (f'{pad}if ({self.expression(2)}) {{\n'
+						f'{self.statements(indent + 1, 3, nesting - 1)}'
+						f'{pad}}} else {{\n'
+						f'{self.statements(indent + 1, 2, nesting - 1)}'
+						f'{pad}}}\n')
+			case 'while':
+				return (f'{pad}while ({self.expression(2)}) {{\n'
+						f'{self.statements(indent + 1, 3, nesting - 1)}'
+						f'{pad}}}\n')
+
+	def statements(self, indent, count, nesting=1):
+		return ''.join(self.statement(indent, nesting) for n in range(count))
+
+	def subroutine(self, number, statementCount):
+		kind = self.random.choice(['function', 'method'])
+		return (f'\t/** generated subroutine {number} */\n'
+				f'\t{kind} int sub{number}(int a, int b, boolean c) {{\n'
+				f'\t\tvar int i, j, sum;\n'
+				f'\t\tvar Array arr;\n'
+				f'{self.statements(2, statementCount)}'
+				f'\t\treturn {self.expression(self.expressionDepth)};\n'
+				f'\t}}\n\n')
+
+	def jackClass(self, name='Generated', subroutines=200, statements=25):
+		parts = ['// generated by benchmarks/jackSynth.py\n',
+				 f'class {name} {{\n',
+				 '\tfield int x, y;\n',
+				 '\tstatic Array table;\n\n']
+		for number in range(subroutines):
+			parts.append(self.subroutine(number, statements))
+		parts.append('}\n')
+		return ''.join(parts)
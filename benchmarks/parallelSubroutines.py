@@ -0,0 +1,75 @@
+"""
+@date 2026.10.18
+
+serial vs parallel compilation of one large synthesized class (see
+jackSynth.py and parallelCompile.py).
+
+times CompilationEngine.compileClass and compileClassParallel at each
+worker count, and checks every parallel output is byte-identical to the
+serial one:
+	python -m benchmarks.parallelSubroutines --workers 1 2 4 8
+"""
+
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+
+from benchmarks.jackSynth import JackSynthesizer
+from compilationEngine import CompilationEngine
+from parallelCompile import compileClassParallel, findSubroutines
+from tokenizer import JackTokenizer
+
+
+def compileSerial(jackUri, xmlUri):
+	ce = CompilationEngine(jackUri, xmlUri, 'regex')
+	ce.compileClass()
+	ce.close()
+
+
+def timeOnce(function):
+	start = time.perf_counter()
+	function()
+	return time.perf_counter() - start
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--subroutines', type=int, default=2000)
+	parser.add_argument('--statements', type=int, default=10)
+	parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+	args = parser.parse_args(argv)
+
+	source = JackSynthesizer().jackClass(
+		subroutines=args.subroutines, statements=args.statements)
+	directory = tempfile.mkdtemp()
+	jackUri = os.path.join(directory, 'Generated.jack')
+	serialUri = os.path.join(directory, 'serial.xml')
+	parallelUri = os.path.join(directory, 'parallel.xml')
+	with open(jackUri, 'w') as f:
+		f.write(source)
+
+	try:
+		start = time.perf_counter()
+		ranges = findSubroutines(JackTokenizer(jackUri, engine='regex').tokens)
+		print(f'{len(ranges)} subroutines, {source.count(chr(10))} lines; '
+			  f'tokenize + brace matching {time.perf_counter() - start:.3f}s')
+
+		serial = timeOnce(lambda: compileSerial(jackUri, serialUri))
+		print(f'   serial: {serial:7.3f}s')
+		for workers in args.workers:
+			seconds = timeOnce(lambda: compileClassParallel(
+				jackUri, parallelUri, workers, minSubroutines=0))
+			same = filecmp.cmp(serialUri, parallelUri, shallow=False)
+			print(f'{workers:>3} jobs: {seconds:7.3f}s  x{serial / seconds:.2f}  '
+				  f'{"identical" if same else "DIFFERENT"}')
+	finally:
+		for uri in [jackUri, serialUri, parallelUri]:
+			if os.path.exists(uri):
+				os.remove(uri)
+		os.rmdir(directory)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,130 @@
+"""
+@date 2026.10.18
+
+randomized check of incrementalParse.reparse() against a full parse.
+
+each round parses a class, from tests/ or synthesized (see jackSynth.py),
+then makes a few random edits in a row: a snippet of Jack, or a comment or
+string delimiter, replaces a random span, or a field the class declares is
+declared again after one of its classVarDecs. after
+every edit, reparse() must agree with analyzer.analyze() of the edited text:
+the same XML, the same token types, the same symbol tables, and an xmlEdit that turns the old XML
+into the new. where the full parse raises, reparse() must raise the same
+error. an edit that errs ends its round:
+	python -m benchmarks.reparseFuzz --rounds 3000 --seed 1
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+from analyzer import analyze
+from benchmarks.jackSynth import JackSynthesizer
+from incrementalParse import parseIncremental, reparse
+
+testsDir = Path(__file__).resolve().parent.parent / 'tests'
+
+# what an edit puts in place of the span it replaces
+SNIPPETS = [
+	'', 'x', ' ', '\n', '/*', '*/', '//', '"', '"ab"', '1', '99999', ';', '{',
+	'}', '(', ')', 'let x = 1;', 'var int i;\n', 'int a, int a',
+	'field int q;\n', 'field int x;\n', 'function void f() { return; }\n',
+]
+
+# lengths of the replaced span, mostly insertions
+SPAN_LENGTHS = [0, 0, 1, 2, 5, 30]
+
+
+# analyze() or reparse()'s result, or the repr of the error it raised
+def outcome(function, *arguments):
+	try:
+		return function(*arguments), None
+	except ValueError as error:
+		return None, repr(error)
+
+
+# (start, end, text) of an edit that declares one of the class's fields or
+# statics again, after one of its classVarDecs, or None if it has none
+def redeclaration(rng, state):
+	declarations = [member for member in state.members
+					if member.node.tag == 'classVarDec']
+	if not declarations:
+		return None
+	member = rng.choice(declarations)
+	name = rng.choice(member.node.children[2::2]).value
+	# a character past its ';', so it's outside the damaged range and reused
+	position = state.tokens.ends[member.last - 1] + 1
+	return position, position, f'field int {name}; '
+
+
+# a description of how reparse()'s result differs from the full parse's,
+# or None if they agree
+def difference(previous, result, expected):
+	if result.xml != expected.xml:
+		return 'XML differs'
+	start, end, text = result.xmlEdit
+	if previous.xml[:start] + text + previous.xml[end:] != expected.xml:
+		return 'xmlEdit does not give the new XML'
+	if list(result.tokens.types) != list(expected.tokens.types):
+		return 'token types differ'
+	if result.symbols.classScope != expected.symbols.classScope:
+		return 'class scopes differ'
+	if result.symbols.subroutineScopes != expected.symbols.subroutineScopes:
+		return 'subroutine scopes differ'
+	return None
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--rounds', type=int, default=3000)
+	parser.add_argument('--seed', type=int, default=1)
+	parser.add_argument('--edits', type=int, default=4,
+						help='most edits per round')
+	args = parser.parse_args(argv)
+
+	rng = random.Random(args.seed)
+	sources = [path.read_text() for path in sorted(testsDir.rglob('*.jack'))]
+	sources.append(JackSynthesizer(seed=args.seed).jackClass(
+		subroutines=20, statements=5))
+
+	agreed = errors = failures = 0
+	for n in range(args.rounds):
+		state = parseIncremental(rng.choice(sources), 'Fuzz.jack')
+		for edit in range(rng.randint(1, args.edits)):
+			source = state.source
+			edit = redeclaration(rng, state) if rng.random() < 0.1 else None
+			if edit is None:
+				start = rng.randrange(len(source) + 1)
+				end = min(len(source), start + rng.choice(SPAN_LENGTHS))
+				edit = start, end, rng.choice(SNIPPETS)
+			start, end, text = edit
+			edited = source[:start] + text + source[end:]
+
+			expected, expectedError = outcome(analyze, edited, 'Fuzz.jack')
+			result, error = outcome(reparse, state, start, end, text)
+			if expectedError is not None or error is not None:
+				if error == expectedError:
+					errors += 1
+				else:
+					failures += 1
+					print(f'round {n}: {text!r} at [{start}, {end}): '
+						  f'reparse() gave {error}, a full parse '
+						  f'{expectedError}')
+				break
+
+			problem = difference(state, result, expected)
+			if problem is not None:
+				failures += 1
+				print(f'round {n}: {text!r} at [{start}, {end}): {problem}')
+				break
+			agreed += 1
+			state = result
+
+	print(f'{args.rounds} rounds: {agreed} edits agreed, {errors} raised the '
+		  f'same error, {failures} failures')
+	return 1 if failures else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
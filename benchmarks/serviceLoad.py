@@ -0,0 +1,106 @@
+"""
+@date 2026.10.18
+
+load on the asyncio analysis service (see analysisService.py): many clients
+sending synthesized classes at once, more than its queue holds.
+
+the service runs in this process on a temporary Unix socket. every client
+opens its own connection and pipelines its requests; the answers are
+checked against analyzer.analyze() of the same source, then the service's
+stats are printed: throughput, and latency and queue wait percentiles. a
+last round with a timeout shorter than a parse shows timeouts answered as
+errors while the service keeps serving:
+	python -m benchmarks.serviceLoad --clients 16 --requests 8 --workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from analysisService import AnalysisService
+from analyzer import analyze
+from benchmarks.jackSynth import JackSynthesizer
+
+
+# one client: sends its requests down one connection, returns the answers
+async def client(socketPath, requests):
+	reader, writer = await asyncio.open_unix_connection(
+		socketPath, limit=64 << 20)
+	for request in requests:
+		writer.write(json.dumps(request).encode() + b'\n')
+	await writer.drain()
+	answers = [json.loads(await reader.readline()) for request in requests]
+	writer.close()
+	await writer.wait_closed()
+	return answers
+
+
+async def run(args, sources):
+	service = AnalysisService(args.workers, args.queue, threads=args.threads)
+	with tempfile.TemporaryDirectory() as directory:
+		socketPath = os.path.join(directory, 'service.sock')
+		await service.start(socketPath)
+		try:
+			batches = [[{'id': [c, r], 'source': sources[(c + r) % len(sources)],
+						 'filename': 'Generated.jack'}
+						for r in range(args.requests)]
+					   for c in range(args.clients)]
+			start = time.perf_counter()
+			results = await asyncio.gather(
+				*(client(socketPath, batch) for batch in batches))
+			elapsed = time.perf_counter() - start
+
+			expected = [analyze(source, 'Generated.jack').xml
+						for source in sources]
+			wrong = sum(1 for answers in results for answer in answers
+						if answer['xml'] != expected[sum(answer['id'])
+													 % len(sources)])
+			count = args.clients * args.requests
+			stats = service.stats()
+			print(f'{count} requests from {args.clients} clients, '
+				  f'{stats["workers"]} {stats["executor"]}, queue of '
+				  f'{stats["queueSize"]}: {elapsed:.2f}s, '
+				  f'{count / elapsed:.1f} requests/s, {wrong} wrong')
+			print('latency ms', formatPoints(stats['latency']))
+			print('wait ms   ', formatPoints(stats['wait']))
+
+			# a timeout far shorter than a parse
+			answers = await client(socketPath, [
+				{'id': n, 'source': sources[-1], 'timeout': 0.001}
+				for n in range(service.workers * 2)])
+			timedOut = sum(1 for answer in answers
+						   if answer['error'] and 'timed out' in answer['error'])
+			after = await client(socketPath, [{'id': 0, 'source': sources[0]}])
+			print(f'timeout round: {timedOut} of {len(answers)} timed out; '
+				  f'next request {"ok" if after[0]["error"] is None else "FAILED"}'
+				  f', {service.stats()["timeouts"]} timeouts in stats')
+		finally:
+			await service.close()
+
+
+def formatPoints(points):
+	return '  '.join(f'{name} {value:8.1f}' for name, value in points.items())
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--clients', type=int, default=16)
+	parser.add_argument('--requests', type=int, default=8,
+						help='requests per client')
+	parser.add_argument('--workers', type=int, default=None)
+	parser.add_argument('--queue', type=int, default=None)
+	parser.add_argument('--threads', action='store_true')
+	parser.add_argument('--subroutines', type=int, default=20)
+	args = parser.parse_args(argv)
+
+	sources = [JackSynthesizer(seed=seed).jackClass(
+		subroutines=args.subroutines * (1 + seed % 3), statements=10)
+		for seed in range(4)]
+	asyncio.run(run(args, sources))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,176 @@
+"""
+@date 2026.10.18
+
+cold-start cost of the analyzer's modules, each measured in fresh child
+interpreters, the way a tool that shells out to python or imports the
+analyzer once per process pays it.
+
+for every module it reports:
+	import: the module's cumulative time from python -X importtime, the
+		median over --repeat interpreters
+	wall: median wall-clock time of python -c 'import module', less that of
+		python -c pass, so interpreter startup itself isn't counted
+	heaviest: the imports that module pulls in with the most self time
+and for analyzer.analyze(), the time of the first call on a small class in
+a new interpreter, which includes the imports it defers.
+
+children may write __pycache__ even under PYTHONDONTWRITEBYTECODE, and one
+warm-up run fills it, so compiling source to bytecode isn't counted either:
+	python -m benchmarks.startup --json before.json
+	python -m benchmarks.startup --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.throughput import gitCommit
+
+MODULES = ['analyzer', 'compilationEngine', 'syntaxAnalyzer']
+
+REPO = Path(__file__).resolve().parent.parent
+
+FIRST_ANALYZE = '''
+import time
+start = time.perf_counter()
+from analyzer import analyze
+analyze('class Main { function void main() { do Output.printInt(1 + 2); return; } }')
+print(time.perf_counter() - start)
+'''
+
+
+def runChild(*arguments):
+	env = dict(os.environ)
+	env.pop('PYTHONDONTWRITEBYTECODE', None)
+	return subprocess.run(
+		[sys.executable, *arguments], capture_output=True, text=True,
+		check=True, cwd=REPO, env=env)
+
+
+# {module: (self µs, cumulative µs)} from python -X importtime's stderr
+def parseImportTime(stderr):
+	times = {}
+	for line in stderr.splitlines():
+		if not line.startswith('import time:') or 'self [us]' in line:
+			continue
+		selfTime, cumulative, name = line[len('import time:'):].split('|')
+		times[name.strip()] = int(selfTime), int(cumulative)
+	return times
+
+
+def wallSeconds(code):
+	start = time.perf_counter()
+	runChild('-c', code)
+	return time.perf_counter() - start
+
+
+def measureModule(module, repeat, baseline):
+	code = f'import {module}'
+	try:
+		runChild('-c', code)  # warm-up: writes __pycache__
+	except subprocess.CalledProcessError:
+		return None  # e.g. a module that didn't exist at this commit
+
+	cumulative = []
+	selfTimes = {}
+	for n in range(repeat):
+		times = parseImportTime(runChild('-X', 'importtime', '-c', code).stderr)
+		cumulative.append(times[module][1])
+		for name, (selfTime, total) in times.items():
+			selfTimes.setdefault(name, []).append(selfTime)
+
+	walls = [wallSeconds(code) for n in range(repeat)]
+	heaviest = sorted(
+		((statistics.median(values), name) for name, values in selfTimes.items()),
+		reverse=True)[:5]
+	return {
+		'importMicroseconds': statistics.median(cumulative),
+		'wallSeconds': max(0.0, statistics.median(walls) - baseline),
+		'modules': len(selfTimes),
+		'heaviest': [[name, selfTime] for selfTime, name in heaviest],
+	}
+
+
+def runBenchmarks(args):
+	runChild('-c', 'pass')
+	baseline = statistics.median(
+		wallSeconds('pass') for n in range(args.repeat))
+
+	results = {module: measureModule(module, args.repeat, baseline)
+			   for module in args.modules}
+
+	try:
+		runChild('-c', FIRST_ANALYZE)
+		firstAnalyze = statistics.median(
+			float(runChild('-c', FIRST_ANALYZE).stdout)
+			for n in range(args.repeat))
+	except subprocess.CalledProcessError:
+		firstAnalyze = None
+
+	return {
+		'commit': gitCommit(),
+		'python': platform.python_version(),
+		'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		'interpreterSeconds': baseline,
+		'firstAnalyzeSeconds': firstAnalyze,
+		'results': results,
+	}
+
+
+def printReport(report, baseline=None):
+	print(f'commit {report["commit"]}, python {report["python"]}: '
+		  f'bare interpreter {report["interpreterSeconds"] * 1000:.1f} ms')
+
+	for module, result in report['results'].items():
+		if result is None:
+			print(f'{module:>18}: could not be imported')
+			continue
+		line = (f'{module:>18}: import {result["importMicroseconds"] / 1000:7.1f} ms'
+				f'   wall {result["wallSeconds"] * 1000:7.1f} ms'
+				f'   {result["modules"]:3} modules')
+		if baseline is not None and baseline['results'].get(module):
+			old = baseline['results'][module]
+			line += (f'   x{result["importMicroseconds"] / old["importMicroseconds"]:.2f}'
+					 f' import time vs {baseline["commit"]}')
+		print(line)
+		heaviest = ', '.join(
+			f'{name} {selfTime / 1000:.1f}' for name, selfTime in result['heaviest'])
+		print(f'{"":>20}heaviest (self ms): {heaviest}')
+
+	if report['firstAnalyzeSeconds'] is None:
+		return
+	line = f'first analyze(): {report["firstAnalyzeSeconds"] * 1000:.1f} ms'
+	if baseline is not None and baseline.get('firstAnalyzeSeconds'):
+		line += (f'   x{report["firstAnalyzeSeconds"] / baseline["firstAnalyzeSeconds"]:.2f}'
+				 f' vs {baseline["commit"]}')
+	print(line)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--modules', nargs='+', default=MODULES)
+	parser.add_argument('--repeat', type=int, default=7)
+	parser.add_argument('--json', metavar='PATH',
+						help='save results to PATH')
+	parser.add_argument('--compare', metavar='PATH',
+						help='show import times relative to saved results')
+	args = parser.parse_args(argv)
+
+	report = runBenchmarks(args)
+	baseline = None
+	if args.compare:
+		baseline = json.loads(Path(args.compare).read_text())
+	printReport(report, baseline)
+
+	if args.json:
+		Path(args.json).write_text(json.dumps(report, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+	sys.exit(main())
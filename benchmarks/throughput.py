@@ -0,0 +1,182 @@
+"""
+@date 2026.10.18
+
+throughput benchmark for JackTokenizer and CompilationEngine on a large
+synthesized class (see jackSynth.py).
+
+for every tokenizer engine it measures:
+	tokenizer: tokens/second to construct a JackTokenizer and drain it
+	compile: source lines/second for CompilationEngine.compileClass, with the
+		XML going to os.devnull
+	peak memory of each, from a separate tracemalloc run so tracing doesn't
+		slow down the timed runs
+
+results can be saved as JSON and compared against a run from another commit:
+	python -m benchmarks.throughput --json before.json
+	git checkout <other commit>
+	python -m benchmarks.throughput --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.jackSynth import JackSynthesizer
+from compilationEngine import CompilationEngine
+from tokenizer import JackTokenizer
+
+ENGINES = ['char', 'regex', 'stream', 'mmap']
+
+
+def drainTokenizer(uri, engine):
+	tk = JackTokenizer(uri, engine=engine)
+	count = 0
+	while tk.hasMoreTokens():
+		tk.advance()
+		count += 1
+	return count
+
+
+def compileToNowhere(uri, engine):
+	ce = CompilationEngine(uri, os.devnull, engine)
+	ce.compileClass()
+	ce.close()
+
+
+# best of repeat wall-clock times, then peak traced memory from one more run
+def measure(function, repeat):
+	times = []
+	for n in range(repeat):
+		start = time.perf_counter()
+		function()
+		times.append(time.perf_counter() - start)
+
+	tracemalloc.start()
+	try:
+		function()
+		current, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	return min(times), peak
+
+
+def gitCommit():
+	try:
+		return subprocess.run(
+			['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+			text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def runBenchmarks(args):
+	source = JackSynthesizer(
+		args.seed, args.depth, args.string_length).jackClass(
+		subroutines=args.subroutines, statements=args.statements)
+	handle, uri = tempfile.mkstemp(suffix='.jack')
+	with os.fdopen(handle, 'w') as f:
+		f.write(source)
+
+	try:
+		tokenCount = drainTokenizer(uri, 'regex')
+		lineCount = source.count('\n')
+		results = {}
+		for engine in args.engines:
+			seconds, peak = measure(
+				lambda: drainTokenizer(uri, engine), args.repeat)
+			results[f'tokenizer.{engine}'] = {
+				'seconds': seconds,
+				'tokensPerSecond': tokenCount / seconds,
+				'peakBytes': peak,
+			}
+
+			seconds, peak = measure(
+				lambda: compileToNowhere(uri, engine), args.repeat)
+			results[f'compile.{engine}'] = {
+				'seconds': seconds,
+				'linesPerSecond': lineCount / seconds,
+				'tokensPerSecond': tokenCount / seconds,
+				'peakBytes': peak,
+			}
+	finally:
+		os.remove(uri)
+
+	return {
+		'commit': gitCommit(),
+		'python': platform.python_version(),
+		'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		'input': {
+			'subroutines': args.subroutines,
+			'statements': args.statements,
+			'depth': args.depth,
+			'stringLength': args.string_length,
+			'seed': args.seed,
+			'lines': lineCount,
+			'bytes': len(source),
+			'tokens': tokenCount,
+		},
+		'results': results,
+	}
+
+
+def printReport(report, baseline=None):
+	size = report['input']
+	print(f'commit {report["commit"]}, python {report["python"]}: '
+		  f'{size["lines"]} lines, {size["bytes"]} bytes, '
+		  f'{size["tokens"]} tokens')
+
+	for name, result in report['results'].items():
+		rateName = 'linesPerSecond' if name.startswith('compile') \
+			else 'tokensPerSecond'
+		unit = rateName.replace('PerSecond', '/s')
+		line = (f'{name:>16}: {result["seconds"]:8.3f}s '
+				f'{result[rateName]:12.0f} {unit:<9}'
+				f'peak {result["peakBytes"] / 1e6:8.1f} MB')
+
+		if baseline is not None and name in baseline['results']:
+			old = baseline['results'][name]
+			line += (f'   x{result[rateName] / old[rateName]:.2f} speed, '
+					 f'x{result["peakBytes"] / old["peakBytes"]:.2f} memory '
+					 f'vs {baseline["commit"]}')
+		print(line)
+
+	if baseline is not None and baseline['input'] != report['input']:
+		print('warning: baseline was measured on a different input')
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--subroutines', type=int, default=400)
+	parser.add_argument('--statements', type=int, default=25)
+	parser.add_argument('--depth', type=int, default=6,
+						help='expression nesting depth')
+	parser.add_argument('--string-length', type=int, default=60)
+	parser.add_argument('--seed', type=int, default=10)
+	parser.add_argument('--repeat', type=int, default=3)
+	parser.add_argument('--engines', nargs='+', choices=ENGINES,
+						default=ENGINES)
+	parser.add_argument('--json', metavar='PATH',
+						help='save results to PATH')
+	parser.add_argument('--compare', metavar='PATH',
+						help='show speed and memory relative to saved results')
+	args = parser.parse_args(argv)
+
+	report = runBenchmarks(args)
+	baseline = None
+	if args.compare:
+		baseline = json.loads(Path(args.compare).read_text())
+	printReport(report, baseline)
+
+	if args.json:
+		Path(args.json).write_text(json.dumps(report, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+	sys.exit(main())
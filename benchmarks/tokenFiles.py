@@ -0,0 +1,99 @@
+"""
+@date 2026.10.18
+
+token files vs lexing again, on one large synthesized class (see
+jackSynth.py and tokenFile.py).
+
+it measures the token file's size against the *T.xml listing, the time to
+write it, the time to open it and drain a tokenizer over it against a regex
+tokenize and drain of the source, and a whole compile from the token file
+against one from the source, and checks the XML of both is identical:
+	python -m benchmarks.tokenFiles --subroutines 400
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.jackSynth import JackSynthesizer
+from compilationEngine import CompilationEngine
+from tokenFile import TokenFile, writeTokenFile
+from tokenizer import JackTokenizer
+from xmlWriter import tokensXml
+
+
+def bestOf(function, repeat):
+	times = []
+	for n in range(repeat):
+		start = time.perf_counter()
+		result = function()
+		times.append(time.perf_counter() - start)
+	return min(times), result
+
+
+def drain(tk):
+	count = 0
+	while tk.hasMoreTokens():
+		tk.advance()
+		count += 1
+	return count
+
+
+def compileTo(jackUri, xmlUri, engine, tokens=None):
+	ce = CompilationEngine(jackUri, xmlUri, engine, tokens=tokens)
+	ce.compileClass()
+	ce.close()
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--subroutines', type=int, default=400)
+	parser.add_argument('--statements', type=int, default=10)
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args(argv)
+
+	with tempfile.TemporaryDirectory() as directory:
+		jackUri = os.path.join(directory, 'Generated.jack')
+		tokenUri = os.path.join(directory, 'Generated.jtok')
+		Path(jackUri).write_text(JackSynthesizer().jackClass(
+			subroutines=args.subroutines, statements=args.statements))
+		source = Path(jackUri).read_bytes()
+
+		tokens = JackTokenizer(jackUri, 'regex').tokens
+		write, _ = bestOf(
+			lambda: writeTokenFile(tokens, source, tokenUri), args.repeat)
+		size = os.path.getsize(tokenUri)
+		listing = len(tokensXml(tokens).encode())
+		print(f'{len(source)} bytes of source, {len(tokens)} tokens')
+		print(f'token file {size} bytes, {size / len(tokens):.1f} per token; '
+			  f'T.xml listing {listing} bytes, '
+			  f'{listing / len(tokens):.1f} per token; written in '
+			  f'{write * 1000:.1f} ms')
+
+		lexed, count = bestOf(
+			lambda: drain(JackTokenizer(jackUri, 'regex')), args.repeat)
+		mapped, mappedCount = bestOf(
+			lambda: drain(JackTokenizer(jackUri, 'mmap',
+										tokens=TokenFile(tokenUri))),
+			args.repeat)
+		print(f'tokenize and drain: lexing {lexed * 1000:8.1f} ms   token '
+			  f'file {mapped * 1000:8.1f} ms  x{lexed / mapped:5.2f}'
+			  f'{"" if count == mappedCount else "   COUNTS DIFFER"}')
+
+		fromSource = os.path.join(directory, 'source.xml')
+		fromTokens = os.path.join(directory, 'tokens.xml')
+		compiled, _ = bestOf(
+			lambda: compileTo(jackUri, fromSource, 'regex'), args.repeat)
+		reused, _ = bestOf(
+			lambda: compileTo(jackUri, fromTokens, 'mmap',
+							  TokenFile(tokenUri)), args.repeat)
+		same = Path(fromSource).read_text() == Path(fromTokens).read_text()
+		print(f'compile:            lexing {compiled * 1000:8.1f} ms   token '
+			  f'file {reused * 1000:8.1f} ms  x{compiled / reused:5.2f}   '
+			  f'{"identical" if same else "DIFFERENT"}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,167 @@
+"""
+@date 2026.10.18
+
+per-token memory and time of JackTokenizer's token representation, on a
+large synthesized class (see jackSynth.py).
+
+memory, bytes per token for a whole file's tokens held at once:
+	tuples: (TokenType, value, offset), values sliced out of the source the
+		way the stream engine and parse trees used to keep them
+	interned: the same tuples with keyword and symbol values swapped for
+		tokenizer.INTERNED's shared copies, as every engine now does
+	TokenStream: the regex engine's parallel arrays, no per-token objects
+	tree: a buildTree parse tree, per token, which holds each value
+
+time, nanoseconds per token to drain the regex engine through
+getTokenType() and its accessor, and to compile to os.devnull. each is
+measured in a child interpreter run normally and with python -O, which
+compiles out the accessors' type asserts:
+	python -m benchmarks.tokenMemory
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.jackSynth import JackSynthesizer
+from compilationEngine import CompilationEngine
+from tokenizer import INTERNED, JackTokenizer, TokenType
+from tokenizer import KEYWORD, SYMBOL, IDENTIFIER, INT_CONST, STRING_CONST
+
+
+# traced bytes allocated by build() and still held by what it returns
+def retainedBytes(build):
+	tracemalloc.start()
+	try:
+		before = tracemalloc.get_traced_memory()[0]
+		kept = build()
+		after = tracemalloc.get_traced_memory()[0]
+	finally:
+		tracemalloc.stop()
+	del kept
+	return after - before
+
+
+def tokenTuples(tokens, intern):
+	code = tokens.code
+	result = []
+	for typeCode, start, end in zip(tokens.types, tokens.starts, tokens.ends):
+		value = code[start:end]
+		if intern and (typeCode == KEYWORD or typeCode == SYMBOL):
+			value = INTERNED[value]
+		result.append((TokenType(typeCode), value, start))
+	return result
+
+
+def measureMemory(uri):
+	tokens = JackTokenizer(uri, engine='regex').tokens
+	count = len(tokens)
+
+	def buildTree():
+		ce = CompilationEngine(uri, None, 'regex', buildTree=True)
+		root = ce.compileClass()
+		ce.close()
+		return root
+
+	def buildStream():
+		return JackTokenizer(uri, engine='regex').tokens
+
+	return count, {
+		'tuples': retainedBytes(lambda: tokenTuples(tokens, False)) / count,
+		'interned': retainedBytes(lambda: tokenTuples(tokens, True)) / count,
+		# minus the source text the TokenStream also holds
+		'TokenStream': (retainedBytes(buildStream) -
+						sys.getsizeof(tokens.code)) / count,
+		'tree': retainedBytes(buildTree) / count,
+	}
+
+
+def drainAccessors(uri):
+	accessors = {
+		KEYWORD: JackTokenizer.keyWord,
+		SYMBOL: JackTokenizer.symbol,
+		IDENTIFIER: JackTokenizer.identifier,
+		INT_CONST: JackTokenizer.intVal,
+		STRING_CONST: JackTokenizer.stringVal,
+	}
+	tk = JackTokenizer(uri, engine='regex')
+	while tk.hasMoreTokens():
+		tk.advance()
+		accessors[tk.getTokenType()](tk)
+
+
+def compileToNowhere(uri):
+	ce = CompilationEngine(uri, os.devnull, 'regex')
+	ce.compileClass()
+	ce.close()
+
+
+def bestOf(function, repeat):
+	times = []
+	for n in range(repeat):
+		start = time.perf_counter()
+		function()
+		times.append(time.perf_counter() - start)
+	return min(times)
+
+
+# runs in the child interpreters: prints seconds for each timed function
+def timeChild(uri, repeat):
+	print(json.dumps({
+		'optimized': not __debug__,
+		'drain': bestOf(lambda: drainAccessors(uri), repeat),
+		'compile': bestOf(lambda: compileToNowhere(uri), repeat),
+	}))
+
+
+def measureTimes(uri, repeat):
+	results = []
+	for flags in [[], ['-O']]:
+		child = subprocess.run(
+			[sys.executable, *flags, '-m', 'benchmarks.tokenMemory',
+			 '--time-child', uri, '--repeat', str(repeat)],
+			capture_output=True, text=True, check=True)
+		results.append(json.loads(child.stdout))
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('--subroutines', type=int, default=400)
+	parser.add_argument('--statements', type=int, default=25)
+	parser.add_argument('--repeat', type=int, default=3)
+	parser.add_argument('--time-child', metavar='JACK', help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	if args.time_child:
+		timeChild(args.time_child, args.repeat)
+		return
+
+	source = JackSynthesizer().jackClass(
+		subroutines=args.subroutines, statements=args.statements)
+	handle, uri = tempfile.mkstemp(suffix='.jack')
+	with os.fdopen(handle, 'w') as f:
+		f.write(source)
+
+	try:
+		count, perToken = measureMemory(uri)
+		times = measureTimes(uri, args.repeat)
+	finally:
+		os.remove(uri)
+
+	print(f'{count} tokens, {len(source)} bytes')
+	for name, size in perToken.items():
+		print(f'{name:>12}: {size:7.1f} bytes/token')
+	for result in times:
+		mode = 'python -O' if result['optimized'] else 'python'
+		print(f'{mode:>12}: drain {result["drain"] / count * 1e9:6.0f} ns/token, '
+			  f'compile {result["compile"] / count * 1e9:6.0f} ns/token')
+
+
+if __name__ == '__main__':
+	main()
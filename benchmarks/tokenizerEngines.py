@@ -0,0 +1,61 @@
+"""
+@date 2026.10.18
+
+compares JackTokenizer's 'char' and 'regex' engines on the tests/Square
+sources, concatenated many times over to make one large input file.
+
+run from the repository root:
+	python -m benchmarks.tokenizerEngines [copies]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from tokenizer import JackTokenizer
+
+squareDir = Path(__file__).resolve().parent.parent / 'tests' / 'Square'
+
+
+# writes every tests/Square .jack file, repeated 'copies' times, into one file.
+# the result isn't a valid class but the tokenizer doesn't care about grammar
+def buildScaledInput(copies: int) -> str:
+	source = ''.join(
+		path.read_text() for path in sorted(squareDir.glob('*.jack')))
+	handle, uri = tempfile.mkstemp(suffix='.jack')
+	with os.fdopen(handle, 'w') as f:
+		f.write(source * copies)
+	return uri
+
+
+# tokenizes the whole file, returning (seconds, token count)
+def timeEngine(uri: str, engine: str):
+	start = time.perf_counter()
+	tk = JackTokenizer(uri, engine=engine)
+	count = 0
+	while tk.hasMoreTokens():
+		tk.advance()
+		count += 1
+	return time.perf_counter() - start, count
+
+
+def main():
+	copies = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+	uri = buildScaledInput(copies)
+	try:
+		print(f'input: tests/Square x{copies}, {os.path.getsize(uri)} bytes')
+		results = {}
+		for engine in ['char', 'regex']:
+			elapsed, count = timeEngine(uri, engine)
+			results[engine] = elapsed
+			print(f'{engine:>6}: {elapsed:8.3f}s  {count} tokens  '
+				  f'{count / elapsed:12.0f} tokens/s')
+		print(f'speedup: {results["char"] / results["regex"]:.1f}x')
+	finally:
+		os.remove(uri)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,156 @@
+"""
+@date 2026.10.18
+
+micro-benchmark: XmlWriter against the writer CompilationEngine used before
+it, an indentLevel * '  ' string and a file write for every line.
+
+the write calls are replayed from the engine's output for tests/Square, so
+the mix of open tags, close tags, and terminals matches a real compile. the
+calls are bound to each writer's methods before the clock starts, and a
+writer that does nothing is timed the same way: what's left of the replay
+loop once its time is subtracted is the writers' own work.
+
+run from the repository root:
+	python -m benchmarks.xmlWriter [repeats]
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from compilationEngine import CompilationEngine
+from xmlWriter import XmlWriter
+
+squareDir = Path(__file__).resolve().parent.parent / 'tests' / 'Square'
+
+LINE_PATTERN = re.compile(r'(\s*)<(/?)(\w+)>(?: (.*) </\w+>)?\n')
+
+
+# compiles tests/Square and turns every output line back into the call that
+# wrote it: ('open', tag), ('close', tag), or ('terminal', tag, value)
+def recordEvents():
+	events = []
+	handle, uri = tempfile.mkstemp(suffix='.xml')
+	os.close(handle)
+	try:
+		for jackPath in sorted(squareDir.glob('*.jack')):
+			ce = CompilationEngine(str(jackPath), uri, 'regex')
+			ce.compileClass()
+			ce.close()
+			with open(uri) as f:
+				for line in f:
+					indent, slash, tag, value = LINE_PATTERN.match(line).groups()
+					if value is not None:
+						events.append(('terminal', tag, value))
+					else:
+						events.append(('close' if slash else 'open', tag))
+	finally:
+		os.remove(uri)
+	return events
+
+
+# the engine's writer before XmlWriter. write(), indent(), and outdent()
+# were CompilationEngine methods; the rest are the calls the engine made
+# through them, e.g. write('<class>\n'); indent()
+class LegacyWriter:
+	def __init__(self, uri):
+		self.out = open(uri, 'w')
+		self.indentLevel = 0
+
+	def indent(self):
+		self.indentLevel += 1
+
+	def outdent(self):
+		self.indentLevel -= 1
+
+	def write(self, s):
+		self.out.write(self.indentLevel * '  ' + s)
+
+	def openTag(self, tag):
+		self.write(f'<{tag}>\n')
+		self.indent()
+
+	def closeTag(self, tag):
+		self.outdent()
+		self.write(f'</{tag}>\n')
+
+	def terminal(self, tag, value):
+		self.write(f'<{tag}> {value} </{tag}>\n')
+
+	def close(self):
+		self.out.close()
+
+
+# takes the calls and writes nothing: times the replay loop alone
+class NullWriter:
+	def __init__(self, uri):
+		pass
+
+	def openTag(self, tag):
+		pass
+
+	def closeTag(self, tag):
+		pass
+
+	def terminal(self, tag, value):
+		pass
+
+	def close(self):
+		pass
+
+
+WRITERS = [('replay only', NullWriter), ('legacy', LegacyWriter),
+		   ('XmlWriter', XmlWriter)]
+
+
+# seconds to make every call in events on a new writer and close it, with
+# the calls bound to the writer's methods beforehand
+def replay(writerClass, events, uri):
+	writer = writerClass(uri)
+	methods = {'open': writer.openTag, 'close': writer.closeTag,
+			   'terminal': writer.terminal}
+	calls = [(methods[event[0]], event[1:]) for event in events]
+
+	start = time.perf_counter()
+	for method, arguments in calls:
+		method(*arguments)
+	writer.close()
+	return time.perf_counter() - start
+
+
+def main():
+	repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+	events = recordEvents() * repeats
+	print(f'{len(events)} writes (tests/Square x{repeats}), best of 5')
+
+	handle, uri = tempfile.mkstemp(suffix='.xml')
+	os.close(handle)
+	try:
+		# the writers take turns in each round, so a slow patch on the machine
+		# hits them all alike
+		outputs = {}
+		results = {name: float('inf') for name, writerClass in WRITERS}
+		for n in range(5):
+			for name, writerClass in WRITERS:
+				results[name] = min(results[name],
+									replay(writerClass, events, uri))
+				outputs[name] = Path(uri).read_bytes()
+	finally:
+		os.remove(uri)
+
+	assert outputs['legacy'] == outputs['XmlWriter'], 'outputs differ'
+	loop = results['replay only']
+	print(f'{"replay only":>11}: {loop:8.3f}s')
+	for name in ['legacy', 'XmlWriter']:
+		print(f'{name:>11}: {results[name]:8.3f}s, '
+			  f'{results[name] - loop:8.3f}s without the replay loop')
+	print(f'speedup: {results["legacy"] / results["XmlWriter"]:.2f}x, '
+		  f'{(results["legacy"] - loop) / (results["XmlWriter"] - loop):.2f}x '
+		  f'without the replay loop')
+
+
+if __name__ == '__main__':
+	main()
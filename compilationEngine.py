@@ -73,21 +73,11 @@
 #   e.g. there is no compileStatement because statement has subtypes, and it's
 #   split into compileIf, compileWhile, etc.
 
-from tokenizer import JackTokenizer, TokenType
-
-
-def convertSymbolToHtml(value):
-	result = None
-	match value:
-		case '<':
-			result = '&lt;'
-		case '>':
-			result = '&gt;'
-		case '&':
-			result = '&amp;'
-		case _:
-			result = value
-	return result
+from tokenizer import JackTokenizer
+from tokenizer import KEYWORD, SYMBOL, IDENTIFIER, INT_CONST, STRING_CONST
+from parseTree import TreeBuilder, writeXml
+from symbolTable import SymbolTable, ARG, VAR
+from xmlWriter import XmlWriter, TOKEN_TAGS
 
 
 class CompilationEngine:
@@ -95,17 +85,46 @@ class CompilationEngine:
 	The compilationEngine generates the compiler's output
 	"""
 
+	# every compile method reads these, so they're slots rather than a dict
+	__slots__ = ('tk', 'outputXmlUri', 'buildTree', 'out', 'skipNextAdvance',
+				 'statementHandlers', 'termHandlers', 'termSuffixHandlers',
+				 'steps', 'symbols', 'annotateSymbols', 'scannedTokens')
+
 	# creates a new compilation engine with the given input and output
 	# the next routine called must be compileClass
-	def __init__(self, inputJackUri, outputXmlUri):
-		# create a Tokenizer object from the inputURI
-		self.tk = JackTokenizer(inputJackUri)
-
-		# open file for writing with URI=outputXML
-		self.out = open(outputXmlUri, 'w')
-
-		# indentation level of XML. after each tag, indent contents, then revert
-		self.indentLevel = 0
+	# tokenizerEngine selects JackTokenizer's scanner: 'char', 'regex',
+	# 'stream', or 'mmap'. all but char can hand peekToken() any number of
+	# tokens ahead; stream also starts output before the whole file has been
+	# read, and mmap scans the file in place without reading it into a string
+	#
+	# with buildTree, the compile methods build a parseTree.ParseNode tree that
+	# compileClass() returns. XML is then written from the tree by close(),
+	# and only if outputXmlUri isn't None
+	#
+	# trace and tokens are passed to JackTokenizer: see tokenizer.printTrace,
+	# loggerTrace. outputXmlUri may also be an open text file: see XmlWriter
+	#
+	# the declarations are entered in self.symbols as they're parsed: see
+	# symbolTable.py. with annotateSymbols, each identifier used as a
+	# variable is written with its symbol's kind, type, and index, e.g.
+	# <identifier kind="field" type="int" index="0"> size </identifier>
+	def __init__(self, inputJackUri, outputXmlUri, tokenizerEngine='char',
+				 buildTree=False, trace=None, tokens=None, source=None,
+				 annotateSymbols=False):
+		# create a Tokenizer object from the inputURI, or from source text if
+		# given, which inputJackUri then only names
+		self.tk = JackTokenizer(
+			inputJackUri, engine=tokenizerEngine, trace=trace, tokens=tokens,
+			source=source)
+
+		# where compile methods send tags and tokens: buffered XML output to
+		# URI=outputXML, which tracks the indentation level, or a tree
+		self.outputXmlUri = outputXmlUri
+		self.buildTree = buildTree
+		if buildTree:
+			self.out = TreeBuilder()
+		else:
+			self.out = XmlWriter(outputXmlUri)
 
 		# sometimes compileTerm will need to do an additional advance for LL2.
 		# this flag tells us to skip the next advance() if that's the case.
@@ -115,18 +134,33 @@ class CompilationEngine:
 		# if true, the next eat() doesn't advance
 		self.skipNextAdvance = False
 
-		# ops in the Jack Grammar
-		self.opsList = ['+', '-', '*', '/', '&', '|', '<', '>', '=']
-		pass
+		# the grammar tables at the end of the class, bound to this engine
+		self.statementHandlers = self.__bind(self.STATEMENT_FIRST)
+		self.termHandlers = self.__bind(self.TERM_FIRST)
+		self.termSuffixHandlers = self.__bind(self.TERM_SUFFIXES)
+
+		# pending (method, argument) steps of the expression parser: see
+		# __parse
+		self.steps = []
+
+		self.symbols = SymbolTable()
+		self.annotateSymbols = annotateSymbols
 
-	def indent(self):
-		self.indentLevel += 1
+		# the regex and mmap engines' tokens, which peekToken() reads directly
+		self.scannedTokens = None
+		if self.tk.engine == 'regex' or self.tk.engine == 'mmap':
+			self.scannedTokens = self.tk.tokens
 
-	def outdent(self):
-		self.indentLevel -= 1
+	# {(type, value): function} → {(type, value): bound method}
+	def __bind(self, table):
+		return {key: function.__get__(self) for key, function in table.items()}
 
-	def write(self, s):
-		self.out.write(self.indentLevel * '  ' + s)
+	# flushes and closes the output file. in buildTree mode this is when the
+	# tree is serialized
+	def close(self):
+		self.out.close()
+		if self.buildTree and self.outputXmlUri is not None:
+			writeXml(self.out.root, self.outputXmlUri)
 
 	# calls compile on whatever needs testing at the moment
 	def testCompile(self):
@@ -163,12 +197,11 @@ class CompilationEngine:
 
 		follows pattern: class className '{' classVarDec* subroutineDec* '}'
 		"""
-		self.write('<class>\n')
-		self.indent()
+		self.out.openTag('class')
 		self.eat('class')  # this will output <keyword> class </keyword>
 
 		# className is an identifier
-		self.compileIdentifier()
+		self.symbols.className = self.compileIdentifier()
 		self.eat('{')
 
 		while self.compileClassVarDec():
@@ -178,8 +211,10 @@ class CompilationEngine:
 			continue
 
 		self.eat('}')
-		self.outdent()
-		self.write('</class>\n')
+		self.out.closeTag('class')
+
+		# the finished tree in buildTree mode
+		return self.out.root if self.buildTree else None
 
 	# compiles a static variable or field declaration
 	def compileClassVarDec(self):
@@ -196,47 +231,44 @@ class CompilationEngine:
 		type → int | char | boolean | className
 		"""
 		# static or field?
-		self.peek()
-
-		if self.tk.getTokenType() != TokenType.KEYWORD:
+		if self.peekToken() not in CLASS_VAR_DEC_FIRST:
 			return False
 
-		if self.tk.keyWord() not in ['static', 'field']:
-			return False
-
-		self.write('<classVarDec>\n')
-		self.indent()
+		self.out.openTag('classVarDec')
 
 		self.advance()
-		self.write(f'<keyword> {self.tk.keyWord()} </keyword>\n')
-		self.__compileType()
+		kind = self.tk.keyWord()
+		self.out.terminal('keyword', kind)
+		varType = self.__compileType()
 
 		# varName(',' varName)*
-		self.__compileVarNameList()
-		self.outdent()
-		self.write('</classVarDec>\n')
+		self.__compileVarNameList(varType, kind)
+		self.out.closeTag('classVarDec')
 
 		return True
 
 	# helper method for classVarDec, subroutineDec, parameterList, carDec
-	# pattern: int | char | boolean | className
+	# pattern: int | char | boolean | className. returns the type
 	def __compileType(self):
 		# type → advance, if TokenType is keyword: int char or boolean
 		self.advance()
 
-		match self.tk.getTokenType():
-			case TokenType.KEYWORD:
-				# process int, char, boolean
-				assert self.tk.keyWord() in ['int', 'char', 'boolean'], f'{self.tk.keyWord()}'
-				self.write(f'<keyword> {self.tk.keyWord()} </keyword>\n')
-			case TokenType.IDENTIFIER:
-				# process className
-
-				self.skipNextAdvance = True
-				self.compileIdentifier()
-			case _:
-				raise ValueError(
-					f'did not find identifier or keyword token: {self.tk.getTokenType()}')
+		tokenType = self.tk.getTokenType()
+		if tokenType is None:
+			self.__unexpectedEnd()
+		if (tokenType, self.tk.currentValue) in TYPE_KEYWORDS:
+			# process int, char, boolean
+			keyword = self.tk.keyWord()
+			self.out.terminal('keyword', keyword)
+			return keyword
+		elif tokenType == IDENTIFIER:
+			# process className
+			self.skipNextAdvance = True
+			return self.compileIdentifier()
+		else:
+			raise ValueError(
+				f'{self.where()}: expected a type, actual: '
+				f'{self.__currentValue()}')
 
 	# compiles a complete method, function, or constructor
 	def compileSubroutineDec(self):
@@ -244,23 +276,16 @@ class CompilationEngine:
 		:return: True if we found a subroutineDec, False if not.
 			this is so we can use while self.compileSubroutineDec
 		"""
-		# skipNextAdvOnEat because we might fail to find a subroutineDec
-		self.peek()
-
+		# peek rather than advance because we might fail to find one.
 		# if compileSubroutineDec is being called, it must start with:
 		# 'constructor', 'function', or 'method'
 		# so if it doesn't, we can return False
-		if self.tk.getTokenType() != TokenType.KEYWORD:
-			print(f'compilesrtDec → {self.tk.getTokenType()}')
+		if self.peekToken() not in SUBROUTINE_DEC_FIRST:
 			return False
-		else:
-			keywordValue = self.tk.keyWord()
-			if keywordValue not in ['constructor', 'function', 'method']:
-				return False
-			else:
-				# starts with the right keyword for subroutineDec!
-				self.__subroutineDecHelper()
-				return True
+
+		# starts with the right keyword for subroutineDec!
+		self.__subroutineDecHelper()
+		return True
 
 	# helper method that compiles subroutineDec with the help of detector logic
 	def __subroutineDecHelper(self):
@@ -285,8 +310,7 @@ class CompilationEngine:
 		pattern: ('constructor'|'function'|'method') ('void'|type)
 			subroutineName '('parameterList')' subroutineBody
 		"""
-		self.write('<subroutineDec>\n')
-		self.indent()
+		self.out.openTag('subroutineDec')
 
 		# remember we've already advanced when calling __subroutineDecHelper
 		# the skipOnNextEat flag is set to True
@@ -296,18 +320,16 @@ class CompilationEngine:
 		# ('constructor'|'function'|'method')
 		self.advance()
 		keywordValue = self.tk.keyWord()
-		self.write(f'<keyword> {keywordValue} </keyword>\n')
+		self.out.terminal('keyword', keywordValue)
 
 		# ('void'|type)
-		self.peek()
-
-		if self.tk.getTokenType() == TokenType.KEYWORD:
+		if self.peekToken() == (KEYWORD, 'void'):
 			self.eat('void')
 		else:
 			self.__compileType()
 
 		# subroutineName
-		self.compileIdentifier()
+		self.symbols.startSubroutine(self.compileIdentifier(), keywordValue)
 
 		# '(' parameterList ')'
 		self.eat('(')
@@ -316,8 +338,7 @@ class CompilationEngine:
 
 		# subroutineBody
 		self.compileSubroutineBody()
-		self.outdent()
-		self.write('</subroutineDec>\n')
+		self.out.closeTag('subroutineDec')
 
 	# compiles a (possibly empty) parameter list. does not handle enclosing '()'
 	def compileParameterList(self):
@@ -338,35 +359,32 @@ class CompilationEngine:
 			note that the entire pattern could be empty
 				the character after parameterList ends is always ')'
 		"""
-		self.write('<parameterList>\n')
-		self.indent()
+		self.out.openTag('parameterList')
 		self.peek()
 
 		# if next symbol is ')', end the parameterList
-		if self.tk.getTokenType() == TokenType.SYMBOL:
-			self.outdent()
-			self.write('</parameterList>\n')
+		if self.tk.getTokenType() == SYMBOL:
+			self.out.closeTag('parameterList')
 			return
 
 		# otherwise the next symbol MUST be a type: int char bool className
 		# consume: type varName
-		self.__compileType()  # type
-		self.compileIdentifier()  # varName
+		self.__compileDeclaredName(self.__compileType(), ARG)
 
 		# then while next token is ',', consume type varName
 		self.peek()
 
 		# pattern: (, type varName)*
 		# next token must be either ',' or ';'
-		assert self.tk.getTokenType() == TokenType.SYMBOL
-		while self.tk.symbol() == ',':
+		if self.tk.getTokenType() != SYMBOL:
+			raise ValueError(
+				f'{self.where()}: expected , or ), actual: {self.__currentValue()}')
+		while self.__atSymbol(','):
 			self.eat(',')
-			self.__compileType()
-			self.compileIdentifier()
+			self.__compileDeclaredName(self.__compileType(), ARG)
 			self.peek()  # check next symbol: ',' or ';'
 
-		self.outdent()
-		self.write('</parameterList>\n')
+		self.out.closeTag('parameterList')
 
 	# compiles a subroutine's body
 	# pattern: '{' varDec* statements'}'
@@ -404,23 +422,18 @@ class CompilationEngine:
 
 		🏭 our aim is to match the pattern: '{' varDec* statements'}'
 		"""
-		self.write('<subroutineBody>\n')
-		self.indent()
+		self.out.openTag('subroutineBody')
 		self.eat('{')
 
 		# varDec* vs statements
-		self.peek()
-
 		# varDec always starts with 'var'
-		while self.tk.getTokenType() == TokenType.KEYWORD and self.tk.keyWord() == 'var':
+		while self.peekToken() == (KEYWORD, 'var'):
 			self.compileVarDec()
-			self.peek()
 
 		# statements always starts with keyword in [let, if, while, do, return]
 		self.compileStatements()
 		self.eat('}')
-		self.outdent()
-		self.write('</subroutineBody>\n')
+		self.out.closeTag('subroutineBody')
 
 	# compiles a var declaration
 	def compileVarDec(self):
@@ -448,17 +461,15 @@ class CompilationEngine:
 
 	    pattern: var type varName (',' varName)*';'
 		"""
-		self.write('<varDec>\n')
-		self.indent()
+		self.out.openTag('varDec')
 
 		# var type varName
 		self.eat('var')
-		self.__compileType()
+		varType = self.__compileType()
 
 		# varName (',' varName)*';'
-		self.__compileVarNameList()
-		self.outdent()
-		self.write('</varDec>\n')
+		self.__compileVarNameList(varType, VAR)
+		self.out.closeTag('varDec')
 
 	# compiles a sequence of statements. does not handle enclosing '{}'
 	# a statement is one of 5 options: let, if, while, do, return
@@ -520,8 +531,7 @@ class CompilationEngine:
 
 		note that statements always ends in '}'!
 		"""
-		self.write('<statements>\n')
-		self.indent()
+		self.out.openTag('statements')
 
 		# we want to try to compile {let, if, while, do, return} statements
 		# until we run out of those keywords
@@ -530,8 +540,7 @@ class CompilationEngine:
 			# empty because we want to stop when it returns false
 			continue  # probably not necessary
 
-		self.outdent()
-		self.write('</statements>\n')
+		self.out.closeTag('statements')
 
 	# helper method for compileStatements, returning false if
 	# {let, if, while, do, return} are not found
@@ -540,32 +549,21 @@ class CompilationEngine:
 
 		:return: true if a statement was found, false if not
 		"""
-		self.peek()
-
-		# if compileStatement is being called, tokenType must be one of
-		# {let, if, while, do, return}
-		if self.tk.getTokenType() != TokenType.KEYWORD:
+		tokenType, value = self.peekToken()
+
+		# a statement starts with one of {let, if, while, do, return}. any
+		# other keyword is an error; anything else ends the statements
+		handler = self.statementHandlers.get((tokenType, value))
+		if handler is None:
+			if tokenType == KEYWORD:
+				self.advance()  # so where() points at the offending token
+				raise ValueError(
+					f'{self.where()}: did not find let, if, while, do, or '
+					f'return → {value}')
 			return False
-		else:
-			match self.tk.keyWord():
-				case 'let':
-					self.compileLet()
-					return True
-				case 'if':
-					self.compileIf()
-					return True
-				case 'while':
-					self.compileWhile()
-					return True
-				case 'do':
-					self.compileDo()
-					return True
-				case 'return':
-					self.compileReturn()
-					return True
-				case _:
-					raise ValueError(
-						f'did not find let, if, while, do, or return → {self.tk.keyWord()}')
+
+		handler()
+		return True
 
 	# helper method for compileClassVarDec, compileVarDec
 	# classVarDec pattern: (static | field) type varName (, varName)* ';'
@@ -573,53 +571,84 @@ class CompilationEngine:
 	#
 	# the pattern we are targeting is:
 	# 	varName (',' varName)*;
-	# the goal is to implement this repeated handling code once here
-	def __compileVarNameList(self):
+	# the goal is to implement this repeated handling code once here. each
+	# varName is declared as varType and kind
+	def __compileVarNameList(self, varType, kind):
 		# varName
-		self.compileIdentifier()
+		self.__compileDeclaredName(varType, kind)
 		self.peek()  # check ahead to see: ',' or ';' ?
 
 		# (',' varName)*
-		while self.tk.symbol() == ',':
+		while self.__atSymbol(','):
 			self.eat(',')
-			self.compileIdentifier()
+			self.__compileDeclaredName(varType, kind)
 			self.peek()
 
 		# the only token we have left is ';'
 		self.eat(';')
 
-	# eats token = identifier, checks type
+	# eats token = identifier, checks type. returns the identifier
 	def compileIdentifier(self):
+		name = self.__advanceIdentifier()
+
+		# then write <identifier> value </identifier>
+		self.out.terminal('identifier', name)
+		return name
+
+	# advances to an identifier and returns it, without writing it
+	def __advanceIdentifier(self):
 		# we actually don't eat because we're not sure what identifier it is
-		# instead, we advance and assert tokenType
+		# instead, we advance and check tokenType
 		self.advance()
 
 		# print(f'{self.tk.getTokenType()}')
-		assert self.tk.getTokenType() == TokenType.IDENTIFIER, f'{self.tk.getTokenType()}'
+		if self.tk.getTokenType() != IDENTIFIER:
+			if self.tk.getTokenType() is None:
+				self.__unexpectedEnd()
+			raise ValueError(
+				f'{self.where()}: expected an identifier, actual: '
+				f'{self.__currentValue()}')
+		return self.tk.identifier()
+
+	# writes an identifier that names a variable, with its symbol's kind,
+	# type, and index if annotateSymbols is on and it's in scope. a name
+	# that isn't, e.g. the Keyboard of Keyboard.keyPressed(), is written as is
+	def __writeVarName(self, name):
+		symbol = self.symbols.lookup(name) if self.annotateSymbols else None
+		if symbol is None:
+			self.out.terminal('identifier', name)
+		else:
+			self.out.annotatedIdentifier(name, symbol)
 
-		# then write <identifier> value </identifier>
-		self.write(f'<identifier> {self.tk.identifier()} </identifier>\n')
+	# varName in a declaration: advances to it and enters it in the symbol
+	# table as varType and kind
+	def __compileDeclaredName(self, varType, kind):
+		name = self.__advanceIdentifier()
+		if self.symbols.define(name, varType, kind) is None:
+			raise ValueError(
+				f'{self.where()}: {name} is already declared in this scope')
+		self.__writeVarName(name)
 
 	def compileLet(self):
 		"""
 		letStatement: 'let' varName ('[' expression ']')? '=' expression ';'
 		:return:
 		"""
-		self.write('<letStatement>\n')
-		self.indent()
+		self.out.openTag('letStatement')
 
 		# 'let'
 		self.eat('let')
 
 		# className, varName, subRName all identifiers ← 'program structure'
-		self.compileIdentifier()
+		self.__writeVarName(self.__advanceIdentifier())
 
 		# check next token for two options: '[' or '='
 		self.peek()
 
-		# assert it's a symbol
-		assert self.tk.getTokenType() == TokenType.SYMBOL
-		assert self.tk.symbol() == '[' or self.tk.symbol() == '='
+		# check it's a symbol
+		if self.tk.getTokenType() != SYMBOL or self.tk.symbol() not in ['[', '=']:
+			raise ValueError(
+				f'{self.where()}: expected [ or =, actual: {self.__currentValue()}')
 
 		# if next token is '[', eat('['), compileExpr, eat(']')
 		if self.tk.symbol() == '[':
@@ -630,7 +659,9 @@ class CompilationEngine:
 
 		# we are guaranteed the next symbol is '='
 		# eat it, compileExpr, eat(';')
-		assert self.tk.symbol() == '='
+		if not self.__atSymbol('='):
+			raise ValueError(
+				f'{self.where()}: expected: =, actual: {self.__currentValue()}')
 
 		self.eat('=')
 
@@ -640,8 +671,7 @@ class CompilationEngine:
 		self.compileExpression()
 		self.eat(';')
 
-		self.outdent()
-		self.write('</letStatement>\n')
+		self.out.closeTag('letStatement')
 
 	# compiles an if statement, possibly with a trailing else clause
 	# if '(' expression ')' '{' statements '}' (else '{' statements '}')?
@@ -668,8 +698,7 @@ class CompilationEngine:
         </ifStatement>
 		:return:
 		"""
-		self.write('<ifStatement>\n')
-		self.indent()
+		self.out.openTag('ifStatement')
 
 		# if '(' expression ')'
 		self.eat('if')
@@ -680,15 +709,14 @@ class CompilationEngine:
 
 		# (else '{' statements '}')?
 		self.advance()  # check for else token
-		if self.tk.getTokenType() == TokenType.KEYWORD:
+		if self.tk.getTokenType() == KEYWORD:
 			if self.tk.keyWord() == 'else':
-				self.write('<keyword> else </keyword>\n')
+				self.out.terminal('keyword', 'else')
 				self.__compileStatementsWithinBrackets()
 			else:  # we've already advanced once to check the else keyword
 				self.skipNextAdvance = True
 
-		self.write('</ifStatement>\n')
-		self.outdent()
+		self.out.closeTag('ifStatement')
 
 	def __compileExprWithinParens(self):
 		self.eat('(')
@@ -704,8 +732,7 @@ class CompilationEngine:
 	def compileWhile(self):
 
 		# 'while'
-		self.write('<whileStatement>\n')
-		self.indent()
+		self.out.openTag('whileStatement')
 		self.eat('while')
 
 		# '(' expression ')'
@@ -714,8 +741,7 @@ class CompilationEngine:
 		# '{' statements '}'
 		self.__compileStatementsWithinBrackets()
 
-		self.outdent()
-		self.write('</whileStatement>\n')
+		self.out.closeTag('whileStatement')
 
 	# 'do' subroutineCall ';'
 	def compileDo(self):
@@ -738,16 +764,14 @@ class CompilationEngine:
         </doStatement>
 		:return:
 		"""
-		self.write('<doStatement>\n')
-		self.indent()
+		self.out.openTag('doStatement')
 		self.eat('do')
 
 		self.__compileSubroutineCallHelper()
 
 		# ';'
 		self.eat(';')
-		self.outdent()
-		self.write('</doStatement>\n')
+		self.out.closeTag('doStatement')
 
 	def __compileSubroutineCallHelper(self):
 		# subroutineName '(' expressionList ')' |
@@ -756,17 +780,15 @@ class CompilationEngine:
 		# two possibilities:
 		# 	identifier (className | varName) → '.' e.g. obj.render(x, y)
 		# 	identifier (subroutineName) → '(' e.g. render(x, y)
-		self.advance()
-		self.write(f'<identifier> {self.tk.identifier()} </identifier>\n')
-
-		self.peek()
+		name = self.__advanceIdentifier()
 
 		# handling the ',render' subroutineName after '.'
-		if self.tk.symbol() == '.':
+		if self.peekToken() == (SYMBOL, '.'):
+			self.__writeVarName(name)
 			self.eat('.')
-			# advance and grab the subroutineName
-			self.advance()
-			self.write(f'<identifier> {self.tk.identifier()} </identifier>\n')
+			self.compileIdentifier()
+		else:
+			self.out.terminal('identifier', name)
 
 		# then eat('(') → compileExpressionList
 		self.eat('(')
@@ -790,66 +812,42 @@ class CompilationEngine:
 		:return:
 		"""
 		# 'return'
-		self.write('<returnStatement>\n')
-		self.indent()
+		self.out.openTag('returnStatement')
 		self.eat('return')
 
 		# expression? ';'
 		# the next token is either a ';' or an expression
 		# expressions are more difficult to check for so, check for symbol ';'
-		# if it's a ';' we're done! although unary ops can start terms
-		self.peek()
-
-		if self.tk.getTokenType() == TokenType.SYMBOL:
-			if self.tk.symbol() == ';':
-				self.eat(';')
-				self.outdent()
-				self.write('</returnStatement>\n')
-				return
-		else:
+		# if it's a ';' we're done! unary ops and '(' are symbols too, but they
+		# start an expression
+		if self.peekToken() != (SYMBOL, ';'):
 			# there's an expression in → expression? ';'
 			self.compileExpression()
-			self.eat(';')
-			self.outdent()
-			self.write('</returnStatement>\n')
+
+		self.eat(';')
+		self.out.closeTag('returnStatement')
 
 	# the expressionless tests for project 10 use simplified 'term' tokens
 	# that can only be single identifiers or the keyword 'this'.
 	def compileSimpleTerm(self):
 		# the simple version of this rule is identifier | 'this' ←🦔
 
-		self.write('<term>\n')
-		self.indent()
+		self.out.openTag('term')
 		self.advance()
-		value = None
-
-		match self.tk.getTokenType():
-			case TokenType.IDENTIFIER:
-				value = self.tk.identifier()
-				self.write(f'<identifier> {value} </identifier>\n')
-			case TokenType.KEYWORD:
-				assert self.tk.keyWord() in ['this', 'false', 'true', 'null']
-				value = self.tk.keyWord()
-				self.write(f'<keyword> {value} </keyword>\n')
-
-			# adding extra cases: integer and string constant
-			case TokenType.INT_CONST:
-				value = self.tk.intVal()
-				self.write(f'<integerConstant> {value} </integerConstant>\n')
-			case TokenType.STRING_CONST:
-				value = self.tk.stringVal()
-				self.write(f'<stringConstant> {value} </stringConstant>\n')
-
-			# TODO technically we do unaryOp term here
-			case TokenType.SYMBOL:
-				value = convertSymbolToHtml(self.tk.symbol())
-				self.write(f'<symbol> {value} </symbol>\n')
-			case _:
-				raise ValueError(
-					f'simple term was not an identifier or keywordConstant: {self.tk.getTokenType()}→{value}')
+		tokenType = self.tk.getTokenType()
+		value = self.tk.currentValue
+
+		# TODO technically we do unaryOp term here; symbols are written as is
+		if tokenType == KEYWORD and (tokenType, value) not in self.TERM_FIRST:
+			raise ValueError(
+				f'{self.where()}: expected a keyword constant, actual: {value}')
+		if tokenType not in TOKEN_TAGS:
+			raise ValueError(
+				f'{self.where()}: simple term was not an identifier or '
+				f'keywordConstant: {tokenType}→{value}')
 
-		self.outdent()
-		self.write('</term>\n')
+		self.out.terminal(TOKEN_TAGS[tokenType], value)
+		self.out.closeTag('term')
 
 	# compiles a term. if the current token is an identifier, the routine must
 	# distinguish between a variable, an array entry, or a subroutine call. a
@@ -863,130 +861,11 @@ class CompilationEngine:
 			unaryOp term
 
 		unaryOp is ['-', '~']
-		"""
-		# 🏭 integerConst stringConst keywordConst identifier unaryOp→term
-		# remember that keywordConstants are false, true, null, this
-		self.write('<term>\n')
-		self.indent()
-		self.peek()
 
-		match self.tk.getTokenType():
-			case TokenType.IDENTIFIER:
-				self.advance()
-				value = self.tk.identifier()
-				self.write(f'<identifier> {value} </identifier>\n')
-
-				# we need to advance one more time to check 4 LL2 cases
-				#   foo ← varName
-				#	foo'['expression']' ← varName'['expression']'
-				#	subroutineCall if next token is '.' or '('
-				#		foo.bar'('expressionList')'
-				#		bar'('expressionList')'
-				self.peek()
-
-				tokenType = self.tk.getTokenType()
-				if tokenType == TokenType.SYMBOL:
-					advTokenValue = self.tk.symbol()
-					match advTokenValue:
-						case ';' | ')':
-							# we're at the end of the line!
-							pass
-						case '.':
-							# TODO matches pattern (className | varName).srtName(exprList) in subroutineCall
-							# let key = Keyboard.keyPressed();
-							#
-							# <expression>
-							#   <term>
-							#     <identifier> Keyboard </identifier>
-							#     <symbol> . </symbol>
-							#     <identifier> keyPressed </identifier>
-							#     <symbol> ( </symbol>
-							#     <expressionList>
-							#     </expressionList>
-							#     <symbol> ) </symbol>
-							#   </term>
-							# </expression>
-							self.eat('.')
-							self.compileIdentifier()
-							self.eat('(')
-							self.compileExpressionList()
-							self.eat(')')
-
-						case '(':
-							# TODO this matches subroutineName(expressionList)
-							self.eat('(')
-							self.compileExpressionList()
-							self.eat(')')
-
-						case '[':
-							# TODO process varName[expression]
-							self.eat('[')
-							self.compileExpression()
-							self.eat(']')
-
-						# these are all ops!
-						case '+' | '-' | '*' | '/' | '&' | '|' | '<' | '>' | '=':
-							pass
-
-						# this is the next token for expressionList
-						case ',':
-							pass
-
-						# closing array bracket for our simple term
-						case ']':
-							pass
-
-						case _:
-							raise ValueError(f'invalid symbol in term LL2: {advTokenValue}')
-
-			case TokenType.SYMBOL:
-				value = self.tk.symbol()
-				match value:
-					# '(' expression ')'
-					case '(':
-						self.eat('(')
-						self.compileExpression()
-						self.eat(')')
-
-					# unaryOp term: write op, recursively compileTerm
-					#   <expression>
-					#     <term>
-					#       <symbol> ~ </symbol>
-					#       <term>
-					#         <identifier> exit </identifier>
-					#       </term>
-					#     </term>
-					#   </expression>
-					case '-':
-						self.eat('-')
-						self.compileTerm()
-					case '~':
-						self.eat('~')
-						self.compileTerm()
-					case _:
-						raise ValueError(f'invalid symbol in term LL2: {value}')
-
-			case TokenType.KEYWORD:
-				self.advance()
-				value = self.tk.keyWord()
-				assert value in ['true', 'false', 'null', 'this'], value
-				self.write(f'<keyword> {value} </keyword>\n')
-
-			case TokenType.INT_CONST:
-				self.advance()
-				value = self.tk.intVal()
-				self.write(f'<integerConstant> {value} </integerConstant>\n')
-
-			case TokenType.STRING_CONST:
-				self.advance()
-				value = self.tk.stringVal()
-				self.write(f'<stringConstant> {value} </stringConstant>\n')
-
-			case _:
-				raise TypeError(f'invalid TokenType: {self.tk.getTokenType()}')
-
-		self.outdent()
-		self.write('</term>\n')
+		which alternative it is comes from the term's first token: see
+		TERM_FIRST at the end of the class
+		"""
+		self.__parse(self.__startTerm)
 
 	# not used in the first pass
 	def compileExpression(self):
@@ -1013,37 +892,7 @@ class CompilationEngine:
 		→ i * (-j)
 		pattern: term (op term)*
 		"""
-		self.write('<expression>\n')
-		self.indent()
-		self.indentLevel += 1
-
-		# temporarily call compileTerm for expressionLessSquare testing
-		# when we're ready to test expressions, then we can test Square
-		self.compileTerm()
-
-		# look ahead to determine if the next token is an op
-		# op symbols are: + - * / & | < > =
-		self.peek()
-
-		# while next symbol is an op: compile the term that follows and check
-		# for another op!
-		while self.tk.getTokenType() == TokenType.SYMBOL and \
-			self.tk.symbol() in self.opsList:
-
-			# eat it
-			self.advance()
-			self.write(f'<symbol> {convertSymbolToHtml(self.tk.symbol())} </symbol>\n')
-
-			# compile the next term in pattern: op term
-			self.compileTerm()
-
-			# peek at next token to see if it's another op so we can continue
-			self.peek()
-
-		# if the next term isn't a symbol in opsList, the expression is over
-		self.indentLevel -= 1
-		self.outdent()
-		self.write('</expression>\n')
+		self.__parse(self.__startExpression)
 
 	# compiles a (possibly empty) comma-separated list of expressions
 	# (expression (',' expression)*)?
@@ -1069,39 +918,180 @@ class CompilationEngine:
 			</expressionList>
 		:return:
 		"""
-		# (expression (',' expression)*)?
-		self.write('<expressionList>\n')
-		self.indent()
+		self.__parse(self.__startExpressionList)
+
+	def __parse(self, step, argument=None):
+		"""
+		runs the expression parser from step until it's done
+
+		expressions nest through terms: '(' expression ')', unaryOp term,
+		array indexes and call arguments. rather than recursing on the python
+		stack, which overflows on machine-generated code hundreds of levels
+		deep, each step does the part of its rule it can and pushes what's
+		left onto self.steps as (method, argument) pairs, pushed in reverse
+		so they're popped in order. nesting depth is then bounded only by
+		memory.
+
+		a statement inside an expression is impossible, so this never
+		re-enters itself, but it only runs the steps it pushed in case a
+		future step does
+		"""
+		steps = self.steps
+		depth = len(steps)
+		steps.append((step, argument))
+		pop = steps.pop
+		while len(steps) > depth:
+			step, argument = pop()
+			step(argument)
+
+	# expression: term (op term)*
+	def __startExpression(self, _=None):
+		self.out.openTag('expression')
+		self.steps.append((self.__continueExpression, None))
+		self.steps.append((self.__startTerm, None))
+
+	# after each term of an expression: another op term, or the end
+	def __continueExpression(self, _=None):
+		# look ahead to determine if the next token is an op
+		# op symbols are: + - * / & | < > =
+		if self.peekToken() in OPS:
+			# eat it, then the term that follows and check for another op!
+			self.advance()
+			self.out.terminal('symbol', self.tk.symbol())
+			self.steps.append((self.__continueExpression, None))
+			self.steps.append((self.__startTerm, None))
+		else:
+			# if the next token isn't an op, the expression is over
+			self.out.closeTag('expression')
+
+	# term: the handler for its first token compiles what it can and pushes
+	# steps for any expression it contains, above the closing </term>
+	def __startTerm(self, _=None):
+		self.out.openTag('term')
+		tokenType, value = self.peekToken()
+
+		handlers = self.termHandlers
+		handler = handlers.get((tokenType, value)) or \
+			handlers.get((tokenType, None))
+		if handler is None:
+			self.advance()  # so where() points at the offending token
+			if tokenType is None:
+				self.__unexpectedEnd()
+			raise ValueError(f'{self.where()}: expected a term, actual: {value}')
+
+		self.steps.append((self.out.closeTag, 'term'))
+		handler()
+
+	# (expression (',' expression)*)?
+	def __startExpressionList(self, _=None):
+		self.out.openTag('expressionList')
+
 		# how do we check if an expression exists? if it's ')', exprList empty
 		# e.g. out.write('compiler') vs out.write()
 		# hitting the last ')' ensures the expressionList is done
-		self.peek()
-
-		if self.tk.getTokenType() == TokenType.SYMBOL and self.tk.symbol() == ')':
-			self.outdent()
-			self.write('</expressionList>\n')
-			return
+		if self.peekToken() == (SYMBOL, ')'):
+			self.out.closeTag('expressionList')
 		else:
-			self.compileExpression()
+			self.steps.append((self.__continueExpressionList, None))
+			self.steps.append((self.__startExpression, None))
 
+	# after each expression of a list, next token has only two options: ')'
+	# vs ','. ',' corresponds to (',' expression)*. eat(',') → expression
+	def __continueExpressionList(self, _=None):
 		self.peek()
-
-		# after compileExpression, next token has only two options:  ')' vs ','
-		# ',' corresponds to (',' expression)*. eat(',') → compileExpression
-		while self.tk.symbol() == ',':
+		if self.__atSymbol(','):
 			self.eat(',')
-			self.compileExpression()
-			self.peek()
+			self.steps.append((self.__continueExpressionList, None))
+			self.steps.append((self.__startExpression, None))
 
 		# ending case: ')' means we're done
-		# TODO potential bug double evaluating ')' in subroutineName(exprList)
-		# TODO maybe move this code to compileDo
-		if self.tk.symbol() == ')':
-			self.outdent()
-			self.write('</expressionList>\n')
+		elif self.__atSymbol(')'):
+			self.out.closeTag('expressionList')
 		else:
 			raise ValueError(
-				f'expressionList did not end with closeParen token')
+				f'{self.where()}: expressionList did not end with closeParen '
+				f'token')
+
+	# integerConstant | stringConstant | keywordConstant: a single token
+	def __compileTermConstant(self):
+		self.advance()
+		self.out.terminal(
+			TOKEN_TAGS[self.tk.getTokenType()], self.tk.currentValue)
+
+	# varName | varName'['expression']' | subroutineCall
+	def __compileTermIdentifier(self):
+		name = self.__advanceIdentifier()
+
+		# we need to look one more token ahead to check 4 LL2 cases
+		#   foo ← varName
+		#	foo'['expression']' ← varName'['expression']'
+		#	subroutineCall if next token is '.' or '('
+		#		foo.bar'('expressionList')'
+		#		bar'('expressionList')'
+		token = self.peekToken()
+		if token == CALL_ARGUMENTS:
+			self.out.terminal('identifier', name)  # a subroutineName
+		else:
+			self.__writeVarName(name)
+		handler = self.termSuffixHandlers.get(token)
+		if handler is not None:
+			handler()
+		elif token[0] == SYMBOL and token not in TERM_FOLLOW:
+			self.advance()
+			raise ValueError(
+				f'{self.where()}: invalid symbol in term LL2: {token[1]}')
+
+	# '(' expression ')'
+	def __compileTermParenthesized(self):
+		self.eat('(')
+		self.steps.append((self.eat, ')'))
+		self.steps.append((self.__startExpression, None))
+
+	# unaryOp term: write op, then the term it applies to
+	#   <expression>
+	#     <term>
+	#       <symbol> ~ </symbol>
+	#       <term>
+	#         <identifier> exit </identifier>
+	#       </term>
+	#     </term>
+	#   </expression>
+	def __compileTermUnary(self):
+		self.advance()
+		self.out.terminal('symbol', self.tk.symbol())
+		self.steps.append((self.__startTerm, None))
+
+	# (className | varName) '.' subroutineName '(' expressionList ')', after
+	# the className or varName
+	# let key = Keyboard.keyPressed();
+	#
+	# <expression>
+	#   <term>
+	#     <identifier> Keyboard </identifier>
+	#     <symbol> . </symbol>
+	#     <identifier> keyPressed </identifier>
+	#     <symbol> ( </symbol>
+	#     <expressionList>
+	#     </expressionList>
+	#     <symbol> ) </symbol>
+	#   </term>
+	# </expression>
+	def __compileQualifiedCall(self):
+		self.eat('.')
+		self.compileIdentifier()
+		self.__compileCallArguments()
+
+	# subroutineName '(' expressionList ')', after the subroutineName
+	def __compileCallArguments(self):
+		self.eat('(')
+		self.steps.append((self.eat, ')'))
+		self.steps.append((self.__startExpressionList, None))
+
+	# varName '[' expression ']', after the varName
+	def __compileArrayIndex(self):
+		self.eat('[')
+		self.steps.append((self.eat, ']'))
+		self.steps.append((self.__startExpression, None))
 
 	# we must have two versions of eat: one with advance and one without
 	# this is for cases with ()? or ()* and we must advance first before
@@ -1129,36 +1119,72 @@ class CompilationEngine:
 		self.advance()
 		# reset the flag now that we've 'consumed' an eat command
 
-		tokenType = self.tk.getTokenType()  # current token
+		# current token: its value, written under the tag for its type
+		tokenType = self.tk.getTokenType()
+		if tokenType is None:
+			self.__unexpectedEnd()
+		value = self.tk.currentValue
+		self.out.terminal(TOKEN_TAGS[tokenType], value)
 
-		match tokenType:  # determine value of token
-			case TokenType.KEYWORD:
-				value = self.tk.keyWord()
-				self.write(f'<keyword> {value} </keyword>\n')
-
-			case TokenType.SYMBOL:
-				value = convertSymbolToHtml(self.tk.symbol())
-				self.write(f'<symbol> {value} </symbol>\n')
+		# check expectedToken matches actual token
+		# print(f'[eating → {value}]')
+		if expectedTokenValue != value:
+			raise ValueError(
+				f'{self.where()}: expected: {expectedTokenValue}, actual: {value}')
+
+	# returns (TokenType, value) of the k-th token that hasn't been consumed
+	# yet, without consuming it: peekToken() is what the next advance() or
+	# eat() will see; (None, None) past the end. the grammar only branches on
+	# keywords and symbols, so the value of any other token is None. the char
+	# engine can only look one token ahead
+	def peekToken(self, k=1):
+		tokens = self.scannedTokens
+		if tokens is not None:
+			# the lookahead the parser does at every step: read the type code
+			# straight from the token arrays, and slice out only the values
+			# it compares. a pending skipNextAdvance means the current token
+			# is unconsumed
+			index = self.tk.tokenIndex + k - 1 - self.skipNextAdvance
+			if index >= len(tokens.types):
+				return None, None
+			tokenType = tokens.types[index]
+			if tokenType == SYMBOL or tokenType == KEYWORD:
+				return tokenType, tokens.value(index)
+			return tokenType, None
+
+		if self.tk.engine == 'stream':
+			tokenType, value = \
+				self.tk.lookahead(k - 1 if self.skipNextAdvance else k)
+		else:
+			if k != 1:
+				raise ValueError(f'char tokenizer cannot peek {k} tokens ahead')
+			self.peek()
+			tokenType, value = self.tk.getTokenType(), self.__currentValue()
 
-			case TokenType.IDENTIFIER:
-				value = self.tk.identifier()
-				self.write(f'<identifier> {value} </identifier>\n')
+		if tokenType == SYMBOL or tokenType == KEYWORD:
+			return tokenType, value
+		return tokenType, None
 
-			case TokenType.INT_CONST:
-				value = self.tk.intVal()
-				self.write(f'<integerConstant> {value} </integerConstant>\n')
+	# 'file:line:column' of the tokenizer's current token, for diagnostics.
+	# only called when building an error message, so the line index behind
+	# it is never built for files that parse cleanly
+	def where(self):
+		return self.tk.where()
 
-			case TokenType.STRING_CONST:
-				value = self.tk.stringVal()
-				self.write(f'<stringConstant> {value} </stringConstant>\n')
+	# the tokenizer went past the last token while the grammar still expected
+	# one, e.g. the class's closing brace is missing
+	def __unexpectedEnd(self):
+		raise ValueError(f'{self.where()}: unexpected end of file')
 
-			case _:  # impossible
-				raise TypeError(f'token type invalid: not keyword, symbol, \
-					identifier, int constant, or string constant: {tokenType}')
+	# value of the tokenizer's current token, whatever its type
+	def __currentValue(self):
+		return self.tk.currentValue
 
-		# assert expectedToken matches actual token
-		# print(f'[eating → {value}]')
-		assert expectedTokenValue == value, f'expected: {expectedTokenValue}, actual: {value}'
+	# True if the current token is the symbol value. unlike tk.symbol() this
+	# is safe on any token type, so a syntax error is reported by the check
+	# that follows rather than by the accessor's assert
+	def __atSymbol(self, value):
+		return self.tk.getTokenType() == SYMBOL and self.tk.currentValue == value
 
 	# wrapper for self.tk.advance. skips next advance
 	def peek(self):
@@ -1171,3 +1197,61 @@ class CompilationEngine:
 			self.tk.advance()
 
 		self.skipNextAdvance = False
+
+	# grammar tables: FIRST sets, (token type, value) of the token a rule's
+	# alternative starts with → the method that compiles it. a None value
+	# matches any token of that type. __init__ binds these per engine; to
+	# extend the grammar, add the rule's entry here
+
+	# statement: letStatement | ifStatement | whileStatement | doStatement |
+	# 	returnStatement
+	STATEMENT_FIRST = {
+		(KEYWORD, 'let'): compileLet,
+		(KEYWORD, 'if'): compileIf,
+		(KEYWORD, 'while'): compileWhile,
+		(KEYWORD, 'do'): compileDo,
+		(KEYWORD, 'return'): compileReturn,
+	}
+
+	# term: integerConstant | stringConstant | keywordConstant | varName |
+	# 	varName'['expression']' | subroutineCall | '('expression')' |
+	# 	unaryOp term
+	TERM_FIRST = {
+		(INT_CONST, None): __compileTermConstant,
+		(STRING_CONST, None): __compileTermConstant,
+		(KEYWORD, 'true'): __compileTermConstant,
+		(KEYWORD, 'false'): __compileTermConstant,
+		(KEYWORD, 'null'): __compileTermConstant,
+		(KEYWORD, 'this'): __compileTermConstant,
+		(IDENTIFIER, None): __compileTermIdentifier,
+		(SYMBOL, '('): __compileTermParenthesized,
+		(SYMBOL, '-'): __compileTermUnary,
+		(SYMBOL, '~'): __compileTermUnary,
+	}
+
+	# what can follow the identifier a term starts with
+	TERM_SUFFIXES = {
+		(SYMBOL, '.'): __compileQualifiedCall,
+		(SYMBOL, '('): __compileCallArguments,
+		(SYMBOL, '['): __compileArrayIndex,
+	}
+
+
+# the '(' after a subroutineName
+CALL_ARGUMENTS = (SYMBOL, '(')
+
+# op: + - * / & | < > =
+OPS = frozenset((SYMBOL, op) for op in '+-*/&|<>=')
+
+CLASS_VAR_DEC_FIRST = frozenset({(KEYWORD, 'static'), (KEYWORD, 'field')})
+
+SUBROUTINE_DEC_FIRST = frozenset(
+	(KEYWORD, keyword) for keyword in ['constructor', 'function', 'method'])
+
+# type: 'int' | 'char' | 'boolean' | className
+TYPE_KEYWORDS = frozenset(
+	(KEYWORD, keyword) for keyword in ['int', 'char', 'boolean'])
+
+# symbols that may follow a varName term without being part of it: the end
+# of its statement, expression, or expressionList, an op, or ']'
+TERM_FOLLOW = OPS | frozenset((SYMBOL, symbol) for symbol in ';),]')
@@ -0,0 +1,121 @@
+"""
+@date 2026.10.18
+
+on-disk cache of CompilationEngine output, keyed by the SHA-256 of a .jack
+file's contents plus analyzerVersion() and the kind of output. an unchanged
+file maps to the same key and its XML is copied out of the cache instead of
+being reparsed.
+
+entries live in <directory>/<key[:2]>/<key>.xml. reading an entry touches its
+mtime, so evict() can drop the least recently used entries first once the
+cache grows past maxBytes.
+"""
+
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# the modules whose code decides what XML a .jack file compiles to, by any
+# of syntaxAnalyzer's paths: lexing, parsing, writing, and the subroutine
+# jobs and token files that feed the same engine
+OUTPUT_MODULES = ('tokenizer', 'preprocessor', 'compilationEngine',
+				  'xmlWriter', 'symbolTable', 'parseTree', 'parallelCompile',
+				  'tokenFile')
+
+
+# SHA-256 of the source of OUTPUT_MODULES, hashed once per process. it goes
+# into every key, so a change to any of them, even one that nobody thought
+# would change the output, leaves the entries older code wrote unmatched
+@functools.cache
+def analyzerVersion() -> str:
+	digest = hashlib.sha256()
+	directory = Path(__file__).resolve().parent
+	for name in OUTPUT_MODULES:
+		digest.update(name.encode() + b'\0')
+		digest.update((directory / f'{name}.py').read_bytes())
+	return digest.hexdigest()
+
+
+class CompileCache:
+	def __init__(self, directory, maxBytes=256 << 20):
+		self.directory = Path(directory)
+		self.directory.mkdir(parents=True, exist_ok=True)
+		self.maxBytes = maxBytes
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	# cache key for a .jack file's raw bytes. variant names the kind of
+	# output stored, e.g. 'xml' or 'tokens', so each gets its own entry
+	@staticmethod
+	def key(source: bytes, variant='xml') -> str:
+		digest = hashlib.sha256(analyzerVersion().encode())
+		digest.update(b'\0' + variant.encode() + b'\0')
+		digest.update(source)
+		return digest.hexdigest()
+
+	def entryPath(self, key: str) -> Path:
+		return self.directory / key[:2] / f'{key}.xml'
+
+	# copies the cached XML for key to xmlPath. returns False on a miss
+	def fetch(self, key: str, xmlPath) -> bool:
+		entry = self.entryPath(key)
+		try:
+			shutil.copyfile(entry, xmlPath)
+			os.utime(entry)  # most recently used
+		except FileNotFoundError:
+			self.misses += 1
+			return False
+
+		self.hits += 1
+		return True
+
+	# stores the XML at xmlPath under key. the entry is written to a temporary
+	# file and renamed into place, so concurrent workers never see half of it
+	def store(self, key: str, xmlPath):
+		entry = self.entryPath(key)
+		entry.parent.mkdir(exist_ok=True)
+		handle, tmpUri = tempfile.mkstemp(dir=entry.parent, suffix='.tmp')
+		os.close(handle)
+		try:
+			shutil.copyfile(xmlPath, tmpUri)
+			os.replace(tmpUri, entry)
+		except BaseException:
+			os.remove(tmpUri)
+			raise
+
+	# (mtime, size, path) of every entry, oldest first
+	def __entries(self):
+		entries = []
+		for entry in self.directory.glob('*/*.xml'):
+			stat = entry.stat()
+			entries.append((stat.st_mtime, stat.st_size, entry))
+		entries.sort()
+		return entries
+
+	# deletes least recently used entries until the cache fits in maxBytes
+	def evict(self):
+		entries = self.__entries()
+		total = sum(size for mtime, size, entry in entries)
+		for mtime, size, entry in entries:
+			if total <= self.maxBytes:
+				break
+			entry.unlink(missing_ok=True)
+			total -= size
+			self.evictions += 1
+
+	def stats(self):
+		entries = self.__entries()
+		lookups = self.hits + self.misses
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'hitRate': self.hits / lookups if lookups else 0.0,
+			'evictions': self.evictions,
+			'entries': len(entries),
+			'bytes': sum(size for mtime, size, entry in entries),
+		}
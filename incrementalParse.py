@@ -0,0 +1,358 @@
+"""
+@date 2026.10.18
+
+incremental reparsing for editors: after a text edit, only the tokens and
+class members the edit touched are lexed and parsed again.
+
+	state = parseIncremental(source, 'Main.jack')
+	state = reparse(state, start, end, text)  # source[start:end] → text
+	state.xml, state.tree, state.xmlEdit
+
+relexing starts after the last token that ends before the edit, a point
+where the lexer can't be inside a comment or string constant, and scans the
+new text with the stream engine's STREAM_PATTERN until it reads a token past
+the edit that the old scan also read at the same place. from there on the
+old tokens are kept, shifted by the change in length.
+
+a subroutineDec parses the same way wherever it appears and never looks
+past its own last token, so one whose tokens all lie outside the damaged
+range isn't parsed again: its subtree from the last parse is spliced into
+the new tree as is, the same object, along with the XML it was written as.
+classVarDecs are reused the same way, their variables entered in the symbol
+table again from the saved node, so later declarations are still checked
+against them, and a reused subroutineDec's saved scope is put back in
+symbols.subroutineScopes, so the result has the symbol tables a full parse
+would. the class header and the damaged members are parsed normally.
+xmlEdit says which part of the old XML the new parse replaced, so a caller
+can update its copy without diffing.
+"""
+
+import io
+from bisect import bisect_left
+
+from analyzer import Analysis
+from compilationEngine import CompilationEngine
+from lineIndex import LineIndex
+from parseTree import TerminalNode, replay
+from symbolTable import ARG, VAR
+from tokenizer import JackTokenizer, TokenStream, classifyToken
+from tokenizer import KEYWORDS, STREAM_PATTERN, STRING_CONST
+from xmlWriter import XmlWriter
+
+
+class Member:
+	"""
+	a classVarDec or subroutineDec of a parsed class: its tokens
+	[first, last), its ParseNode, its XML at the class's indentation,
+	which is None until the output is assembled, and a subroutineDec's
+	scope, {name: Symbol} of its arguments and local vars
+	"""
+
+	__slots__ = ('first', 'last', 'node', 'xml', 'scope')
+
+	def __init__(self, first, last, node, xml=None, scope=None):
+		self.first = first
+		self.last = last
+		self.node = node
+		self.xml = xml
+		self.scope = scope
+
+	def __repr__(self):
+		return f'Member({self.node.tag!r}, {self.first}, {self.last})'
+
+
+class IncrementalAnalysis(Analysis):
+	"""
+	an Analysis that reparse() can update. besides Analysis's attributes:
+		source: the text that was parsed
+		members: every Member of the class, in order
+		reparsed: the Members that were parsed this time, not reused
+		xmlEdit: (start, end, text): replacing xml[start:end] of the
+			previous analysis with text gives this one's xml
+		chunks: the XML in pieces, one per child of the class node
+	"""
+
+	__slots__ = ('source', 'members', 'reparsed', 'xmlEdit', 'chunks')
+
+
+class IncrementalCompilationEngine(CompilationEngine):
+	"""
+	a buildTree CompilationEngine that records each class member's token
+	range, and splices in a Member from an earlier parse instead of parsing
+	one that starts where that Member's unchanged tokens now start
+	"""
+
+	__slots__ = ('reusable', 'members')
+
+	# reusable: {first token index: Member} of earlier Members whose tokens
+	# are unchanged, at their indexes in tokens
+	def __init__(self, filename, tokens, reusable):
+		super().__init__(filename, None, 'regex', buildTree=True,
+						 tokens=tokens)
+		self.reusable = reusable
+		self.members = []
+
+	def compileClassVarDec(self):
+		return self.__compileMember(
+			'classVarDec', super().compileClassVarDec)
+
+	def compileSubroutineDec(self):
+		return self.__compileMember(
+			'subroutineDec', super().compileSubroutineDec)
+
+	# index of the next token the parser will consume
+	def __nextIndex(self):
+		return self.tk.tokenIndex - (1 if self.skipNextAdvance else 0)
+
+	# enters the variables of a reused classVarDec node in the symbol table,
+	# as parsing it would have. returns False, entering none, if one is
+	# already declared: the declaration is then parsed again, to raise the
+	# error a full parse would
+	def __defineClassVars(self, node):
+		# (static | field) type varName (',' varName)* ';'
+		kind, varType = node.children[0].value, node.children[1].value
+		names = [child.value for child in node.children[2::2]]
+		if any(name in self.symbols.classScope for name in names):
+			return False
+		for name in names:
+			self.symbols.define(name, varType, kind)
+		return True
+
+	# puts a reused subroutineDec's scope back in the symbol table, as
+	# parsing it would have. returns False if it is a method's whose this is
+	# of another class, the class having been renamed: it is parsed again
+	def __restoreScope(self, member):
+		scope = member.scope
+		this = scope.get('this')
+		if this is not None and this.type != self.symbols.className:
+			return False
+
+		# ('constructor'|'function'|'method') ('void'|type) subroutineName
+		name = member.node.children[2].value
+		self.symbols.subroutineScope = self.symbols.subroutineScopes[name] = \
+			scope
+		kinds = [symbol.kind for symbol in scope.values()]
+		self.symbols.counts[ARG] = kinds.count(ARG)
+		self.symbols.counts[VAR] = kinds.count(VAR)
+		return True
+
+	# whether member can stand in for the tag it would be parsed as here,
+	# entering its declarations in the symbol table if so
+	def __reuse(self, member, tag):
+		if member is None or member.node.tag != tag:
+			return False
+		if tag == 'classVarDec':
+			return self.__defineClassVars(member.node)
+		return self.__restoreScope(member)
+
+	def __compileMember(self, tag, compileMember):
+		first = self.__nextIndex()
+		member = self.reusable.get(first)
+		if self.__reuse(member, tag):
+			self.out.stack[-1].children.append(member.node)
+			# load its last token, as if it had been parsed, so a syntax
+			# error right after it is reported the same way
+			self.tk.tokenIndex = member.last - 1
+			self.skipNextAdvance = False
+			self.tk.advance()
+			self.members.append(member)
+			return True
+
+		if not compileMember():
+			return False
+		node = self.out.stack[-1].children[-1]
+		scope = self.symbols.subroutineScope if tag == 'subroutineDec' \
+			else None
+		self.members.append(Member(first, self.__nextIndex(), node,
+								   scope=scope))
+		return True
+
+
+# one child of the class node as XML, at the class's indentation
+def nodeXml(node):
+	buffer = io.StringIO()
+	out = XmlWriter(buffer)
+	out.indent()
+	if type(node) is TerminalNode:
+		out.terminal(node.tag, node.value)
+	else:
+		replay(node, out)
+	out.close()
+	return buffer.getvalue()
+
+
+def relex(tokens, source, start, end, text, filename):
+	"""
+	the TokenStream of source with source[start:end] replaced by text,
+	lexing only as much of the new text as the edit could have changed
+
+	:param tokens: source's TokenStream
+	:return: (TokenStream, kept, resumed, fresh): tokens [0, kept) are the
+		old ones unchanged; old tokens from resumed on follow the fresh
+		tokens, so old index i ≥ resumed is now i - resumed + kept + fresh
+	"""
+	types, starts, ends = tokens.types, tokens.starts, tokens.ends
+	newSource = source[:start] + text + source[end:]
+	delta = len(text) - (end - start)
+	editEnd = start + len(text)  # end of the edit in newSource
+
+	# keep the tokens that end before the edit, with a character to spare: a
+	# token that ends right where the edit starts could run on into it.
+	# string constants' spans don't cover their closing quotes
+	kept = bisect_left(ends, start)
+	if kept and types[kept - 1] == STRING_CONST and ends[kept - 1] + 1 >= start:
+		kept -= 1
+	position = 0
+	if kept:
+		position = ends[kept - 1] + (types[kept - 1] == STRING_CONST)
+
+	newTokens = TokenStream(newSource)
+	newTypes, newStarts, newEnds = \
+		newTokens.types, newTokens.starts, newTokens.ends
+	newTypes.extend(types[:kept])
+	newStarts.extend(starts[:kept])
+	newEnds.extend(ends[:kept])
+
+	# the location of a lexical error in newSource, for its message
+	def where(offset):
+		line, column = LineIndex(newSource).lineColumn(offset)
+		return f'{filename}:{line}:{column}'
+
+	keywords = frozenset(KEYWORDS)
+	resumed = bisect_left(starts, end)  # first old token that could match
+	count = len(types)
+	fresh = 0
+	for match in STREAM_PATTERN.finditer(newSource, position):
+		kind = match.lastgroup
+		if kind == 'space' or kind == 'comment':
+			continue
+
+		lexStart = match.start()
+		tokenType, tokenStart, tokenEnd = \
+			classifyToken(match, kind, keywords, where)
+
+		# past the edit, the old scan read the same text. once both scans
+		# read the same token at the same place, they agree from there on
+		if lexStart >= editEnd:
+			oldStart = tokenStart - delta
+			while resumed < count and starts[resumed] < oldStart:
+				resumed += 1
+			if resumed < count and starts[resumed] == oldStart and \
+				types[resumed] == tokenType and \
+				ends[resumed] == tokenEnd - delta:
+				break
+
+		newTypes.append(tokenType)
+		newStarts.append(tokenStart)
+		newEnds.append(tokenEnd)
+		fresh += 1
+	else:
+		resumed = count
+
+	newTypes.extend(types[resumed:])
+	if delta:
+		newStarts.extend(map(delta.__add__, starts[resumed:]))
+		newEnds.extend(map(delta.__add__, ends[resumed:]))
+	else:
+		newStarts.extend(starts[resumed:])
+		newEnds.extend(ends[resumed:])
+	return newTokens, kept, resumed, fresh
+
+
+# (start, end, text) that turns the XML of oldChunks into that of newChunks.
+# reused members' chunks are the same strings, so comparing them is cheap
+def chunkEdit(oldChunks, newChunks):
+	limit = min(len(oldChunks), len(newChunks))
+	prefix = 0
+	while prefix < limit and oldChunks[prefix] == newChunks[prefix]:
+		prefix += 1
+	suffix = 0
+	while suffix < limit - prefix and \
+		oldChunks[-1 - suffix] == newChunks[-1 - suffix]:
+		suffix += 1
+
+	start = sum(map(len, oldChunks[:prefix]))
+	end = start + sum(map(len, oldChunks[prefix:len(oldChunks) - suffix]))
+	return start, end, ''.join(newChunks[prefix:len(newChunks) - suffix])
+
+
+# runs ce over the whole class and collects what it made
+def analyzeWith(ce, filename, source, previousChunks):
+	try:
+		ce.compileClass()
+	finally:
+		ce.close()
+	root = ce.out.root
+
+	reparsed = [member for member in ce.members if member.xml is None]
+	members = {id(member.node): member for member in ce.members}
+	chunks = ['<class>\n']
+	for child in root.children:
+		member = members.get(id(child))
+		if member is None:
+			chunks.append(nodeXml(child))
+		else:
+			if member.xml is None:
+				member.xml = nodeXml(child)
+			chunks.append(member.xml)
+	chunks.append('</class>\n')
+
+	analysis = IncrementalAnalysis(
+		filename, ce.tk.tokens, ''.join(chunks), root, ce.symbols)
+	analysis.source = source
+	analysis.members = ce.members
+	analysis.reparsed = reparsed
+	analysis.chunks = chunks
+	if previousChunks is None:
+		analysis.xmlEdit = (0, 0, analysis.xml)
+	else:
+		analysis.xmlEdit = chunkEdit(previousChunks, chunks)
+	return analysis
+
+
+def parseIncremental(source, filename='<source>'):
+	"""
+	parses a class from its source text, keeping what reparse() needs
+
+	:raises ValueError: on a syntax error, like analyzer.analyze()
+	:return: IncrementalAnalysis
+	"""
+	tokens = JackTokenizer(filename, 'regex', source=source).tokens
+	ce = IncrementalCompilationEngine(filename, tokens, {})
+	return analyzeWith(ce, filename, source, None)
+
+
+def reparse(previous, start, end, text):
+	"""
+	the analysis of previous.source with source[start:end] replaced by text.
+	previous is left as it was
+
+	:param start, end: character offsets into previous.source
+	:raises ValueError: on a syntax error in the edited source
+	:return: IncrementalAnalysis
+	"""
+	source = previous.source
+	if not 0 <= start <= end <= len(source):
+		raise ValueError(f'edit [{start}, {end}) is outside the source, '
+						 f'which is {len(source)} characters long')
+
+	tokens, kept, resumed, fresh = relex(
+		previous.tokens, source, start, end, text, previous.filename)
+
+	# members on either side of the damaged tokens [kept, resumed) are
+	# reused, those after it at their shifted indexes. a member that ran
+	# into the end of the tokens may have been cut short by it, so it is
+	# parsed again if the edit could have added tokens after it
+	shift = kept + fresh - resumed
+	count = len(previous.tokens)
+	reusable = {}
+	for member in previous.members:
+		if member.last <= kept and member.last < count:
+			reusable[member.first] = member
+		elif member.first >= resumed:
+			reusable[member.first + shift] = Member(
+				member.first + shift, member.last + shift, member.node,
+				member.xml, member.scope)
+
+	ce = IncrementalCompilationEngine(previous.filename, tokens, reusable)
+	return analyzeWith(ce, previous.filename, tokens.code, previous.chunks)
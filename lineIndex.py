@@ -0,0 +1,40 @@
+"""
+@date 2026.10.18
+
+maps character offsets in a .jack file to (line, column). bytes work too,
+e.g. a memory-mapped file: offsets and columns then count bytes.
+
+the tokenizer only records each token's offset; nothing counts lines while
+scanning. when a diagnostic needs a location, LineIndex finds every newline
+once, with str.find, and then answers each lookup with a binary search.
+"""
+
+from array import array
+from bisect import bisect_right
+
+
+class LineIndex:
+	def __init__(self, text):
+		# lineStarts[n] is the offset of the first character of line n+1
+		self.lineStarts = array('L', [0])
+		find = text.find
+		append = self.lineStarts.append
+
+		newlineChar = '\n' if isinstance(text, str) else b'\n'
+		newline = find(newlineChar)
+		while newline != -1:
+			append(newline + 1)
+			newline = find(newlineChar, newline + 1)
+
+	# a LineIndex from lineStarts saved earlier, any sequence of ints such as
+	# a memoryview of a token file: the text isn't needed
+	@classmethod
+	def fromLineStarts(cls, lineStarts):
+		lineIndex = cls.__new__(cls)
+		lineIndex.lineStarts = lineStarts
+		return lineIndex
+
+	# 1-based (line, column) of a character offset
+	def lineColumn(self, offset: int):
+		line = bisect_right(self.lineStarts, offset)
+		return line, offset - self.lineStarts[line - 1] + 1
@@ -0,0 +1,207 @@
+"""
+@date 2026.10.18
+
+compiles one large class with its subroutineDecs parsed in worker processes.
+
+the class is tokenized up front and its subroutines found by brace matching
+over the token stream, without parsing: at brace depth 1 a constructor,
+function, or method keyword starts a subroutineDec, and the '}' that brings
+the depth back to 1 ends it. runs of consecutive subroutines are handed to a
+process pool as token index ranges; each worker tokenizes the file once when
+it starts, then compiles its ranges to XML text at the class's indentation.
+
+meanwhile this process compiles the class header and classVarDecs, splices
+the workers' XML in at the first subroutine, in order, and finishes with the
+closing '}'. the output is byte-identical to CompilationEngine's. anything
+brace matching can't account for, e.g. unbalanced braces, is compiled
+serially, so syntax errors are reported the same way either way.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from compilationEngine import CompilationEngine, SUBROUTINE_DEC_FIRST
+from tokenizer import JackTokenizer, KEYWORD, SYMBOL
+
+SUBROUTINE_KEYWORDS = frozenset(value for tokenType, value in SUBROUTINE_DEC_FIRST)
+
+
+def findSubroutines(tokens):
+	"""
+	token index ranges of a class's subroutineDecs, by brace matching
+
+	:return: [(first, last)] with last exclusive, one per subroutineDec in
+		order, or None if the braces don't balance or anything but a
+		subroutineDec sits between two of them
+	"""
+	types = tokens.types
+	ranges = []
+	depth = 0
+	first = None  # start of the subroutine we're in, if any
+
+	for index in range(len(types)):
+		tokenType = types[index]
+		if tokenType == SYMBOL:
+			value = tokens.value(index)
+			if value == '{':
+				depth += 1
+			elif value == '}':
+				depth -= 1
+				if depth < 0:
+					return None
+				if depth == 1 and first is not None:
+					ranges.append((first, index + 1))
+					first = None
+		elif tokenType == KEYWORD and depth == 1 and first is None:
+			if tokens.value(index) in SUBROUTINE_KEYWORDS:
+				if ranges and ranges[-1][1] != index:
+					return None
+				first = index
+
+	if depth != 0 or first is not None:
+		return None
+	return ranges
+
+
+# splits contiguous subroutine ranges into about count runs of similar token
+# counts, each a single (first, last) range
+def batchRanges(ranges, count):
+	end = ranges[-1][1]
+	target = max(1, (end - ranges[0][0]) // count)
+	batches = []
+	first = ranges[0][0]
+	for start, last in ranges:
+		if last - first >= target:
+			batches.append((first, last))
+			first = last
+	if first < end:
+		batches.append((first, end))
+	return batches
+
+
+# (jackUri, engine, TokenStream, class SymbolTable or None) in a worker
+# process, set by loadWorkerTokens
+workerState = None
+
+
+# classSymbols: the SymbolTable of the class header, if identifiers are to be
+# annotated; the workers never see the classVarDecs themselves
+def loadWorkerTokens(jackUri, engine, classSymbols=None):
+	global workerState
+	workerState = (jackUri, engine, JackTokenizer(jackUri, engine=engine).tokens,
+				   classSymbols)
+
+
+# runs in a worker: the XML for the subroutineDecs in tokens [first, last)
+def compileSubroutineBatch(first, last):
+	jackUri, engine, tokens, classSymbols = workerState
+	buffer = io.StringIO()
+	ce = CompilationEngine(jackUri, buffer, engine, tokens=tokens,
+						   annotateSymbols=classSymbols is not None)
+	if classSymbols is not None:
+		# subroutines only add to their own scopes, so this is shared
+		ce.symbols.className = classSymbols.className
+		ce.symbols.classScope = classSymbols.classScope
+	ce.tk.tokenIndex = first
+	ce.out.indent()  # inside <class>
+
+	while ce.tk.tokenIndex < last:
+		if not ce.compileSubroutineDec():
+			ce.advance()
+			raise ValueError(f'{ce.where()}: expected a subroutineDec')
+
+	ce.close()
+	return buffer.getvalue()
+
+
+class ParallelCompilationEngine(CompilationEngine):
+	"""
+	a CompilationEngine whose first compileSubroutineDec() call writes every
+	subroutine at once from XML compiled elsewhere, then skips their tokens.
+	it compiles serially instead if the class header didn't end where the
+	subroutines were found to begin
+	"""
+
+	__slots__ = ('subroutineTokens', 'batches')
+
+	# subroutineTokens: (first, last) token range of all the subroutines.
+	# batches: their XML, in order, as an iterable of strings
+	def __init__(self, inputJackUri, outputXmlUri, tokenizerEngine, tokens,
+				 subroutineTokens, batches, annotateSymbols=False):
+		super().__init__(inputJackUri, outputXmlUri, tokenizerEngine,
+						 tokens=tokens, annotateSymbols=annotateSymbols)
+		self.subroutineTokens = subroutineTokens
+		self.batches = batches
+
+	def compileSubroutineDec(self):
+		if self.batches is None:
+			return super().compileSubroutineDec()
+
+		batches, self.batches = self.batches, None
+		first, last = self.subroutineTokens
+		nextIndex = self.tk.tokenIndex - (1 if self.skipNextAdvance else 0)
+		if nextIndex != first:
+			return super().compileSubroutineDec()
+
+		for xml in batches:
+			self.out.writeBlock(xml)
+		self.tk.tokenIndex = last
+		self.skipNextAdvance = False
+		return False
+
+
+def compileClassParallel(jackUri, xmlUri, workers=None, engine='regex',
+						 minSubroutines=64, annotateSymbols=False):
+	"""
+	compiles jackUri to xmlUri like CompilationEngine.compileClass(), with
+	subroutineDecs parsed by a pool of worker processes
+
+	:param workers: pool size, default one per core
+	:param engine: 'regex' or 'mmap', the engines that tokenize up front
+	:param minSubroutines: classes with fewer subroutines than this are
+		compiled serially; starting a pool costs more than they'd gain
+	:param annotateSymbols: see CompilationEngine. the class header is then
+		parsed once more up front, for the workers' symbol tables
+	"""
+	if engine not in ['regex', 'mmap']:
+		raise ValueError(f'parallel compilation needs the regex or mmap '
+						 f'engine, not {engine}')
+
+	tokens = JackTokenizer(jackUri, engine=engine).tokens
+	ranges = findSubroutines(tokens)
+	if not ranges or len(ranges) < minSubroutines:
+		ce = CompilationEngine(jackUri, xmlUri, engine, tokens=tokens,
+							   annotateSymbols=annotateSymbols)
+		try:
+			ce.compileClass()
+		finally:
+			ce.close()
+		return
+
+	subroutineTokens = (ranges[0][0], ranges[-1][1])
+	classSymbols = None
+	if annotateSymbols:
+		# no batches: the header and classVarDecs, then straight to the '}'
+		header = ParallelCompilationEngine(
+			jackUri, io.StringIO(), engine, tokens, subroutineTokens, [])
+		header.compileClass()
+		classSymbols = header.symbols
+
+	workers = workers or os.cpu_count() or 1
+	batches = batchRanges(ranges, 4 * workers)
+	pool = ProcessPoolExecutor(
+		workers, initializer=loadWorkerTokens,
+		initargs=(jackUri, engine, classSymbols))
+	try:
+		# map() submits every batch now and yields results in order
+		results = pool.map(compileSubroutineBatch, *zip(*batches))
+		ce = ParallelCompilationEngine(
+			jackUri, xmlUri, engine, tokens, subroutineTokens, results,
+			annotateSymbols)
+		try:
+			ce.compileClass()
+		finally:
+			ce.close()
+	finally:
+		pool.shutdown(cancel_futures=True)
@@ -0,0 +1,113 @@
+"""
+@date 2026.10.18
+
+in-memory parse tree built by CompilationEngine(buildTree=True).
+
+nonterminal rules (class, letStatement, term, ...) become ParseNodes holding
+their children in order; tokens become TerminalNodes. values are stored
+unescaped, exactly as the tokenizer returned them. writeXml() is the XML
+serializer, so a tree written out matches what the engine writes directly.
+"""
+
+from xmlWriter import XmlWriter
+
+
+class ParseNode:
+	__slots__ = ('tag', 'children')
+
+	def __init__(self, tag):
+		self.tag = tag  # grammar rule, e.g. 'subroutineDec'
+		self.children = []  # ParseNodes and TerminalNodes
+
+	def __repr__(self):
+		return f'ParseNode({self.tag!r}, {len(self.children)} children)'
+
+
+class TerminalNode:
+	__slots__ = ('tag', 'value')
+
+	def __init__(self, tag, value):
+		self.tag = tag  # keyword symbol identifier integerConstant stringConstant
+		self.value = value
+
+	def __repr__(self):
+		return f'TerminalNode({self.tag!r}, {self.value!r})'
+
+
+class IdentifierNode(TerminalNode):
+	"""
+	an identifier naming a variable, annotated with its symbolTable.Symbol:
+	written by CompilationEngine(annotateSymbols=True)
+	"""
+
+	__slots__ = ('symbol',)
+
+	def __init__(self, value, symbol):
+		super().__init__('identifier', value)
+		self.symbol = symbol
+
+	def __repr__(self):
+		return f'IdentifierNode({self.value!r}, {self.symbol!r})'
+
+
+class TreeBuilder:
+	"""
+	output sink with XmlWriter's openTag/closeTag/terminal interface that
+	builds a ParseNode tree instead of writing text
+	"""
+
+	def __init__(self):
+		self.root = None
+		self.stack = []  # open ParseNodes, innermost last
+
+	def openTag(self, tag):
+		node = ParseNode(tag)
+		if self.stack:
+			self.stack[-1].children.append(node)
+		else:
+			self.root = node
+		self.stack.append(node)
+
+	def closeTag(self, tag):
+		node = self.stack.pop()
+		assert node.tag == tag, f'closing {tag} but {node.tag} is open'
+
+	def terminal(self, tag, value):
+		self.stack[-1].children.append(TerminalNode(tag, value))
+
+	def annotatedIdentifier(self, name, symbol):
+		self.stack[-1].children.append(IdentifierNode(name, symbol))
+
+	def close(self):
+		pass
+
+
+# replays a tree into an XmlWriter-like sink: openTag, terminal, closeTag.
+# iterative so deeply nested expressions don't hit the recursion limit
+def replay(node, sink):
+	# stack of (node, index of the next child to visit)
+	stack = [(node, 0)]
+	sink.openTag(node.tag)
+
+	while stack:
+		node, index = stack.pop()
+		if index == len(node.children):
+			sink.closeTag(node.tag)
+			continue
+
+		stack.append((node, index + 1))
+		child = node.children[index]
+		childType = type(child)
+		if childType is TerminalNode:
+			sink.terminal(child.tag, child.value)
+		elif childType is IdentifierNode:
+			sink.annotatedIdentifier(child.value, child.symbol)
+		else:
+			sink.openTag(child.tag)
+			stack.append((child, 0))
+
+
+# writes a tree as project 10 XML to outputXmlUri
+def writeXml(node, outputXmlUri):
+	with XmlWriter(outputXmlUri) as out:
+		replay(node, out)
@@ -0,0 +1,57 @@
+"""
+@date 2026.10.18
+
+source normalization for JackTokenizer: removes // line comments, /* */ and
+/** */ block comments in one left-to-right pass over the file.
+
+comments are replaced by spaces rather than cut out, keeping any newlines they
+contain. every character that survives therefore sits at the same index it had
+in the original .jack file, so a token's index in the normalized code is also
+its position in the source.
+
+string constants are matched before comments, so "http://x" and "/* hi */"
+inside quotes are left alone.
+"""
+
+import re
+
+# string constants first so comment markers inside them never match
+COMMENT_PATTERN = re.compile(r'"[^"\n]*"|//[^\n]*|/\*.*?(?:\*/|\Z)', re.DOTALL)
+
+
+# returns comment text blanked out to spaces, preserving newlines
+def blankComment(comment: str) -> str:
+	if '\n' not in comment:
+		return ' ' * len(comment)
+	return '\n'.join(' ' * len(line) for line in comment.split('\n'))
+
+
+def normalizeSource(source: str):
+	"""
+	strips comments from a whole .jack file in a single pass
+
+	an unterminated block comment runs to the end of the file, like javac.
+
+	:return: (code, bytesCopied) where code has every comment blanked out and
+		bytesCopied is how many characters of source text were copied into it
+	"""
+	pieces = []
+	bytesCopied = 0
+	copiedUpTo = 0  # source[copiedUpTo:] hasn't been appended to pieces yet
+
+	for match in COMMENT_PATTERN.finditer(source):
+		if match.group()[0] == '"':
+			continue  # string constant: part of the code, copied later
+
+		start, end = match.span()
+		pieces.append(source[copiedUpTo:start])
+		bytesCopied += start - copiedUpTo
+		pieces.append(blankComment(match.group()))
+		copiedUpTo = end
+
+	if copiedUpTo == 0:
+		return source, 0  # no comments at all: nothing to copy
+
+	pieces.append(source[copiedUpTo:])
+	bytesCopied += len(source) - copiedUpTo
+	return ''.join(pieces), bytesCopied
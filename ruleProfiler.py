@@ -0,0 +1,294 @@
+"""
+@date 2026.10.18
+
+opt-in profiling of the parser by grammar rule: call counts, inclusive and
+exclusive time, and tokens consumed, reported as a table or as collapsed
+stacks for flame graph tools.
+
+	profiler = RuleProfiler()
+	ce = CompilationEngine('Main.jack', 'Main.xml', 'regex')
+	profiler.instrument(ce)
+	ce.compileClass()
+	ce.close()
+	print(profiler.table())
+	profiler.writeCollapsed('stacks.txt')  # flamegraph.pl stacks.txt
+
+or python syntaxAnalyzer.py tests -o out --profile --profile-stacks s.txt
+
+a grammar rule is timed from its open tag to its close tag, and named after
+the method that compiles it: <letStatement> is compileLet. most nested
+expressions and terms are steps on the expression parser's own stack rather
+than calls, so tags are the one place every rule begins and ends. compile
+helpers that don't write a tag, e.g. the LL(2) __compileTermIdentifier, eat
+and JackTokenizer.advance are timed per call.
+
+instrument() swaps the engine and its tokenizer to subclasses with the
+timing wrappers, and wraps the engine's output sink. nothing else changes
+and nothing is checked at run time, so an engine that isn't instrumented
+runs exactly the code it always did. an instrumented one runs two to four
+times slower, and the times include that overhead: compare them with each
+other, not with unprofiled runs.
+"""
+
+import time
+
+# nonterminal tag → the CompilationEngine method that compiles it
+TAG_RULES = {
+	'class': 'compileClass',
+	'classVarDec': 'compileClassVarDec',
+	'subroutineDec': 'compileSubroutineDec',
+	'parameterList': 'compileParameterList',
+	'subroutineBody': 'compileSubroutineBody',
+	'varDec': 'compileVarDec',
+	'statements': 'compileStatements',
+	'letStatement': 'compileLet',
+	'ifStatement': 'compileIf',
+	'whileStatement': 'compileWhile',
+	'doStatement': 'compileDo',
+	'returnStatement': 'compileReturn',
+	'expression': 'compileExpression',
+	'term': 'compileTerm',
+	'expressionList': 'compileExpressionList',
+}
+
+ADVANCE = 'JackTokenizer.advance'
+
+# the engine's grammar tables and the attributes __init__ binds them to
+HANDLER_TABLES = {
+	'statementHandlers': 'STATEMENT_FIRST',
+	'termHandlers': 'TERM_FIRST',
+	'termSuffixHandlers': 'TERM_SUFFIXES',
+}
+
+
+# a method's name as written in its class: private methods are stored as
+# _Class__name, shown as __name
+def methodName(attribute):
+	if attribute.startswith('_') and '__' in attribute[1:]:
+		return '__' + attribute.split('__', 1)[1]
+	return attribute
+
+
+class ProfilingSink:
+	"""
+	wraps a CompilationEngine's output sink, an XmlWriter or TreeBuilder, so
+	each nonterminal's open and close tags start and end a rule
+	"""
+
+	def __init__(self, sink, profiler):
+		self.sink = sink
+		self.profiler = profiler
+
+	def openTag(self, tag):
+		self.profiler.enter(TAG_RULES.get(tag, tag))
+		self.sink.openTag(tag)
+
+	def closeTag(self, tag):
+		self.sink.closeTag(tag)
+		self.profiler.exit(len(self.profiler.stack) - 1)
+
+	def terminal(self, tag, value):
+		self.sink.terminal(tag, value)
+
+	# anything else, e.g. indent(), close(), root, stack, is the sink's own
+	def __getattr__(self, name):
+		return getattr(self.sink, name)
+
+
+class RuleProfiler:
+	def __init__(self):
+		self.tokens = 0  # tokens loaded by instrumented tokenizers so far
+
+		# open rules, innermost last: [pathId, name, tokens at entry, time
+		# spent in nested rules, start time]
+		self.stack = []
+
+		# call paths, as a tree: pathKeys[pathId] is (parent pathId, name),
+		# path 0 is the root. per path: calls and exclusive nanoseconds
+		self.paths = {}
+		self.pathKeys = [None]
+		self.pathCalls = [0]
+		self.pathTimes = [0]
+
+		# name → [calls, inclusive ns, exclusive ns, tokens]. a recursive
+		# rule's inclusive time and tokens count only its outermost calls
+		self.rules = {}
+		self.active = {}  # name → how many of its calls are open
+
+		self.subclasses = {}  # class → its instrumented subclass
+
+	def enter(self, name):
+		stack = self.stack
+		key = (stack[-1][0] if stack else 0, name)
+		pathId = self.paths.get(key)
+		if pathId is None:
+			pathId = self.paths[key] = len(self.pathKeys)
+			self.pathKeys.append(key)
+			self.pathCalls.append(0)
+			self.pathTimes.append(0)
+
+		self.active[name] = self.active.get(name, 0) + 1
+		stack.append([pathId, name, self.tokens, 0, time.perf_counter_ns()])
+
+	# closes rules until depth are left open. a syntax error can leave rules
+	# open inside the one it propagates out of
+	def exit(self, depth):
+		end = time.perf_counter_ns()
+		stack = self.stack
+		while len(stack) > depth:
+			pathId, name, tokens, nested, start = stack.pop()
+			elapsed = end - start
+			self.pathCalls[pathId] += 1
+			self.pathTimes[pathId] += elapsed - nested
+
+			stats = self.rules.get(name)
+			if stats is None:
+				stats = self.rules[name] = [0, 0, 0, 0]
+			stats[0] += 1
+			stats[2] += elapsed - nested
+			self.active[name] -= 1
+			if not self.active[name]:
+				stats[1] += elapsed
+				stats[3] += self.tokens - tokens
+
+			if stack:
+				stack[-1][3] += elapsed
+
+	# function wrapped to time each call as the rule name
+	def timed(self, name, function):
+		profiler = self
+
+		def wrapper(*args):
+			depth = len(profiler.stack)
+			profiler.enter(name)
+			try:
+				return function(*args)
+			finally:
+				profiler.exit(depth)
+
+		wrapper.__name__ = function.__name__
+		return wrapper
+
+	# ce's class with its compile helpers and eat timed; rules that write a
+	# tag are timed by ProfilingSink instead
+	def engineSubclass(self, cls):
+		subclass = self.subclasses.get(cls)
+		if subclass is not None:
+			return subclass
+
+		tagRules = set(TAG_RULES.values())
+		namespace = {'__slots__': ()}
+		wrappers = {}  # original function → its wrapper
+		for base in reversed(cls.__mro__):
+			for attribute, function in vars(base).items():
+				name = methodName(attribute)
+				if callable(function) and name not in tagRules and \
+					(name == 'eat' or name.lstrip('_').startswith('compile')):
+					wrappers[function] = namespace[attribute] = self.timed(
+						name, function)
+
+		subclass = type(f'Profiled{cls.__name__}', (cls,), namespace)
+		subclass.wrappers = wrappers
+		self.subclasses[cls] = subclass
+		return subclass
+
+	# tk's class with advance() timed and counting tokens
+	def tokenizerSubclass(self, cls):
+		subclass = self.subclasses.get(cls)
+		if subclass is not None:
+			return subclass
+
+		profiler = self
+		advance = cls.advance
+
+		def timedAdvance(tk):
+			depth = len(profiler.stack)
+			profiler.enter(ADVANCE)
+			try:
+				advance(tk)
+				profiler.tokens += 1
+			finally:
+				profiler.exit(depth)
+
+		subclass = type(f'Profiled{cls.__name__}', (cls,),
+						{'__slots__': (), 'advance': timedAdvance})
+		self.subclasses[cls] = subclass
+		return subclass
+
+	def instrument(self, ce):
+		"""
+		profiles ce from now on, into this profiler. call before parsing;
+		one profiler can instrument any number of engines and totals them
+		"""
+		# rules a syntax error left open in the last engine end here
+		self.exit(0)
+
+		ce.__class__ = self.engineSubclass(type(ce))
+		ce.tk.__class__ = self.tokenizerSubclass(type(ce.tk))
+		ce.out = ProfilingSink(ce.out, self)
+
+		# the grammar tables were bound to the unwrapped methods
+		wrappers = type(ce).wrappers
+		for attribute, table in HANDLER_TABLES.items():
+			setattr(ce, attribute, {
+				key: wrappers.get(function, function).__get__(ce)
+				for key, function in getattr(type(ce), table).items()})
+		return ce
+
+	def table(self):
+		"""
+		one line per rule, most exclusive time first:
+			calls, inclusive and exclusive milliseconds, exclusive share of
+			the total, tokens consumed, and exclusive microseconds per call
+		"""
+		total = sum(stats[2] for stats in self.rules.values()) or 1
+		lines = [f'{"rule":<34}{"calls":>10}{"incl ms":>11}{"excl ms":>11}'
+				 f'{"excl %":>8}{"tokens":>10}{"excl µs/call":>14}']
+		ranked = sorted(self.rules.items(), key=lambda item: -item[1][2])
+		for name, (calls, inclusive, exclusive, tokens) in ranked:
+			lines.append(
+				f'{name:<34}{calls:>10}{inclusive / 1e6:>11.2f}'
+				f'{exclusive / 1e6:>11.2f}{exclusive / total:>8.1%}'
+				f'{tokens:>10}{exclusive / calls / 1e3:>14.2f}')
+		return '\n'.join(lines)
+
+	def collapsed(self, maxDepth=200):
+		"""
+		collapsed stacks, one line per call path: rule names from the
+		outermost, separated by ';', then exclusive microseconds. the input
+		format of flamegraph.pl, speedscope, and inferno
+
+		:param maxDepth: paths deeper than this are cut short and ended with
+			'...', their time added to it. a path's text grows with its
+			depth, so machine-generated expressions thousands of levels deep
+			would otherwise make the output quadratic in their depth
+		"""
+		names = ['']  # pathId → its 'a;b;c' path, or None past maxDepth
+		depths = [0]
+		shownAs = [0]  # pathId → the path whose line its time goes on
+		times = {}  # shown pathId → exclusive ns
+		for pathId in range(1, len(self.pathKeys)):
+			parent, name = self.pathKeys[pathId]
+			depth = depths[parent] + 1
+			depths.append(depth)
+			if depth <= maxDepth:
+				names.append(names[parent] + ';' + name if parent else name)
+				shownAs.append(pathId)
+			elif depth == maxDepth + 1:
+				names.append(names[parent] + ';...')
+				shownAs.append(pathId)
+			else:
+				names.append(None)
+				shownAs.append(shownAs[parent])
+			shown = shownAs[pathId]
+			times[shown] = times.get(shown, 0) + self.pathTimes[pathId]
+
+		lines = []
+		for pathId, nanoseconds in times.items():
+			if nanoseconds >= 1000:
+				lines.append(f'{names[pathId]} {nanoseconds // 1000}')
+		return '\n'.join(lines) + '\n'
+
+	def writeCollapsed(self, uri, maxDepth=200):
+		with open(uri, 'w') as f:
+			f.write(self.collapsed(maxDepth))
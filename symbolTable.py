@@ -0,0 +1,89 @@
+"""
+@date 2026.10.18
+
+the symbol tables of a class, built by CompilationEngine as it parses the
+declarations, so a later stage such as a code generator has them without a
+second pass over the tree.
+
+two hashed scopes, as in chapter 11 of the book: the class scope holds its
+static and field variables, the subroutine scope the arguments and local
+vars of the subroutine being parsed. each name maps to a Symbol, (kind,
+type, index), where index counts the names of that kind declared so far in
+the scope. a method's scope starts with 'this', argument 0, the way the
+VM calls it. lookups try the subroutine scope first, so a local hides a
+field of the same name.
+
+	ce = CompilationEngine('Main.jack', 'Main.xml', 'regex')
+	ce.compileClass()
+	ce.symbols.classScope['size']           # Symbol('field', 'int', 0)
+	ce.symbols.subroutineScopes['draw']     # {name: Symbol} of draw()
+"""
+
+from collections import namedtuple
+
+STATIC = 'static'
+FIELD = 'field'
+ARG = 'arg'
+VAR = 'var'
+
+KINDS = (STATIC, FIELD, ARG, VAR)
+CLASS_KINDS = frozenset((STATIC, FIELD))
+
+Symbol = namedtuple('Symbol', ['kind', 'type', 'index'])
+
+
+class SymbolTable:
+	def __init__(self, className=None):
+		self.className = className
+		self.classScope = {}  # name → Symbol, static and field
+		self.subroutineScope = {}  # name → Symbol, arg and var
+		self.counts = dict.fromkeys(KINDS, 0)
+
+		# every subroutine's scope so far, by subroutine name
+		self.subroutineScopes = {}
+
+	# starts a new subroutine scope. a method's starts with this, argument 0
+	def startSubroutine(self, name=None, subroutineKind='function'):
+		self.subroutineScope = {}
+		self.counts[ARG] = self.counts[VAR] = 0
+		if name is not None:
+			self.subroutineScopes[name] = self.subroutineScope
+		if subroutineKind == 'method':
+			self.define('this', self.className, ARG)
+
+	# declares name in the scope its kind belongs to and returns its Symbol,
+	# or None if that scope already has a name, leaving it as it was
+	def define(self, name, type, kind):
+		scope = self.classScope if kind in CLASS_KINDS else self.subroutineScope
+		if name in scope:
+			return None
+
+		symbol = scope[name] = Symbol(kind, type, self.counts[kind])
+		self.counts[kind] += 1
+		return symbol
+
+	# the Symbol name refers to here, or None if it isn't a variable in scope
+	# (a class or subroutine name, or undeclared)
+	def lookup(self, name):
+		symbol = self.subroutineScope.get(name)
+		if symbol is None:
+			return self.classScope.get(name)
+		return symbol
+
+	# the book's SymbolTable API. like lookup(), kindOf, typeOf, and indexOf
+	# return None for a name that isn't a variable in scope
+
+	def varCount(self, kind):
+		return self.counts[kind]
+
+	def kindOf(self, name):
+		symbol = self.lookup(name)
+		return None if symbol is None else symbol.kind
+
+	def typeOf(self, name):
+		symbol = self.lookup(name)
+		return None if symbol is None else symbol.type
+
+	def indexOf(self, name):
+		symbol = self.lookup(name)
+		return None if symbol is None else symbol.index
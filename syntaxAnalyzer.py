@@ -75,67 +75,307 @@ project contract
 
 """
 
-# take care of multiple files in a directory vs one target file
+# compileCache, parallelCompile, ruleProfiler, and concurrent.futures are
+# imported where they're used, so importing this module stays cheap for runs
+# that don't need them. see benchmarks/startup.py
 
 from compilationEngine import CompilationEngine
+from textComparer import compareFiles, describe
+from xmlWriter import writeTokensXml
 
 from tokenizer import JackTokenizer
-from tokenizer import TokenType
+from tokenizer import printTrace
 
+from functools import partial
 from pathlib import Path
+import argparse
 import os
-
-
-def generateTokensFromJack():
-    root: str = 'C:/Dropbox/code/nand2tetris/kiwi/nand2tetris/projects/'
-    # filename: str = root + '10/ArrayTest/Main.jack'
-    filename: str = 'test.jack'
-
-    tk = JackTokenizer(filename)
-    tk.advance()
-    # output = open('tests/ArrayTest/output.xml', 'w')
-    output = open('output.xml', 'w')
-    output.write(f'<tokens>\n')
-
-    # main loop
-    while tk.hasMoreTokens():
-        tokenClassification = tk.getTokenType()
-        match tokenClassification:  # determine value of token
-            case TokenType.KEYWORD:
-                value = tk.keyWord()
-                tagName = 'keyword'
-            case TokenType.SYMBOL:
-                value = tk.symbol()
-                tagName = 'symbol'
-            case TokenType.IDENTIFIER:
-                value = tk.identifier()
-                tagName = 'identifier'
-            case TokenType.INT_CONST:
-                value = tk.intVal()
-                tagName = 'integerConstant'
-            case TokenType.STRING_CONST:
-                value = tk.stringVal()
-                tagName = 'stringConstant'
-            case _:
-                raise TypeError(f'token type invalid: not keyword, symbol, '
-                                f'identifier, int constant, or string constant.')
-
-        output.write(f'<{tagName}> {value} </{tagName}>\n')
-        tk.advance()
-
-    output.write(f'</tokens>\n')
-
-# generateTokensFromJack()
-
-
-def generateCompilationEngineOutput():
-    root: str = 'C:/Dropbox/code/nand2tetris/kiwi/nand2tetris/projects/'
-    # filename: str = root + '10/ArrayTest/Main.jack'
-    filename: str = 'test.jack'
-    outputUri = 'output.xml'  # compilation engine output
-
-    ce = CompilationEngine(filename, outputUri)
-    ce.testCompile()
-
-
-generateCompilationEngineOutput()
\ No newline at end of file
+import sys
+import time
+
+
+# writes the <tokens> listing for a .jack file, the *T.xml format. the file
+# is tokenized in one pass and the listing written with one buffered write,
+# so this runs at tokenizer speed: a cheap lexical check before parsing
+def generateTokensXml(jackUri, xmlUri):
+    tk = JackTokenizer(str(jackUri), engine='regex')
+    writeTokensXml(tk.tokens, xmlUri)
+
+
+# every .jack file named by paths: files as given, directories searched
+# recursively. returns (jackPath, xmlPath) pairs sorted by jackPath so runs
+# are reproducible. Xxx.jack → Xxx.xml next to it, or under outputDir at its
+# path relative to the deepest directory that holds every path given, so
+# tests/Square and tests/ExpressionLessSquare, whose files have the same
+# names, keep their own subdirectories. suffix 'T.xml' names token listings
+# XxxT.xml instead. raises ValueError if two files would write one .xml
+def findJackFiles(paths, outputDir=None, suffix='.xml'):
+    found = []  # (jackPath, the directory it was found from)
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.extend((jackPath, path) for jackPath in path.rglob('*.jack'))
+        elif path.suffix == '.jack':
+            found.append((path, path.parent))
+        else:
+            raise ValueError(f'not a .jack file or directory: {path}')
+
+    # absolute rather than resolved paths: a symlink followed out of its
+    # root would land outside the common directory
+    common = None
+    if outputDir is not None and found:
+        try:
+            common = Path(os.path.commonpath(
+                {os.path.abspath(root) for jackPath, root in found}))
+        except ValueError:
+            raise ValueError('with --output-dir, all paths must be on one '
+                             'drive') from None
+
+    jobs = {}  # resolved jackPath → (jackPath, xmlPath); first mention wins
+    writers = {}  # xmlPath → the jackPath it's written from
+    for jackPath, root in found:
+        key = jackPath.resolve()
+        if key in jobs:
+            continue
+
+        xmlPath = jackPath.with_name(jackPath.stem + suffix)
+        if common is not None:
+            xmlPath = Path(outputDir) / \
+                Path(os.path.abspath(xmlPath)).relative_to(common)
+        other = writers.setdefault(xmlPath.resolve(), jackPath)
+        if other is not jackPath:
+            raise ValueError(f'{other} and {jackPath} would both write '
+                             f'{xmlPath}')
+        jobs[key] = (jackPath, xmlPath)
+
+    return sorted(jobs.values())
+
+
+# compiles one .jack file to .xml. runs inside a worker process, so it
+# returns its outcome instead of raising: (jackPath, error or None, seconds,
+# cached). with a cacheDir, unchanged files are copied from the CompileCache
+# there and cached is True; without one, cached is None. trace prints every
+# token to stderr. check compares the output with the Xxx.xml next to the
+# .jack file, the way TextComparer would, and reports a difference as an
+# error. tokensOnly writes the XxxT.xml token listing instead of parsing.
+# subroutineJobs parses the class's subroutines in that many processes: see
+# parallelCompile.py. a RuleProfiler, in-process only, profiles the parse.
+# with a tokenDir, tokens are read from the file's token file there, written
+# first if need be, instead of lexing the source: see tokenFile.py.
+# annotateSymbols writes variables' identifiers with their kind, type, and
+# index: see symbolTable.py
+def compileFile(jackPath, xmlPath, engine='regex', cacheDir=None,
+                trace=False, check=False, tokensOnly=False,
+                subroutineJobs=None, profiler=None, tokenDir=None,
+                annotateSymbols=False):
+    start = time.perf_counter()
+    cached = None
+    try:
+        xmlPath.parent.mkdir(parents=True, exist_ok=True)
+
+        if cacheDir is not None:
+            from compileCache import CompileCache
+            cache = CompileCache(cacheDir)
+            variant = 'tokens' if tokensOnly else \
+                'symbols' if annotateSymbols else 'xml'
+            key = cache.key(jackPath.read_bytes(), variant)
+            cached = cache.fetch(key, xmlPath)
+            if cached:
+                error = checkAgainstGolden(jackPath, xmlPath) if check else None
+                return jackPath, error, time.perf_counter() - start, cached
+
+        tokens = None
+        if tokenDir is not None and not subroutineJobs:
+            from tokenFile import cachedTokenFile
+            tokens = cachedTokenFile(jackPath, tokenDir)
+
+        if tokensOnly and tokens is not None:
+            writeTokensXml(tokens, xmlPath)
+        elif tokensOnly:
+            generateTokensXml(jackPath, xmlPath)
+        elif subroutineJobs:
+            from parallelCompile import compileClassParallel
+            compileClassParallel(str(jackPath), str(xmlPath), subroutineJobs,
+                                 engine, annotateSymbols=annotateSymbols)
+        else:
+            # a token file is read the way the mmap engine reads its tokens
+            ce = CompilationEngine(str(jackPath), str(xmlPath),
+                                   engine if tokens is None else 'mmap',
+                                   trace=printTrace if trace else None,
+                                   tokens=tokens,
+                                   annotateSymbols=annotateSymbols)
+            if profiler is not None:
+                profiler.instrument(ce)
+            try:
+                ce.compileClass()
+            finally:
+                ce.close()
+
+        if cacheDir is not None:
+            cache.store(key, xmlPath)
+        error = None
+
+        if check:
+            error = checkAgainstGolden(jackPath, xmlPath)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+
+    return jackPath, error, time.perf_counter() - start, cached
+
+
+# None if xmlPath matches the golden file of the same name next to jackPath,
+# Xxx.xml or XxxT.xml, else a description of the first differing line
+def checkAgainstGolden(jackPath, xmlPath):
+    goldenPath = jackPath.with_name(xmlPath.name)
+    if not goldenPath.exists():
+        return f'no {goldenPath} to check against'
+    if goldenPath.resolve() == xmlPath.resolve():
+        return f'{goldenPath} was overwritten; use --output-dir with --check'
+
+    difference = compareFiles(xmlPath, goldenPath)
+    if difference is None:
+        return None
+    return describe(xmlPath, goldenPath, difference)
+
+
+# compiles every (jackPath, xmlPath) pair, in parallel unless jobs is 1.
+# results come back in the same order as the input. options are passed on to
+# compileFile
+def compileAll(jobs, workers=None, **options):
+    jackPaths = [jackPath for jackPath, xmlPath in jobs]
+    xmlPaths = [xmlPath for jackPath, xmlPath in jobs]
+    compileOne = partial(compileFile, **options)
+
+    if workers == 1:
+        return list(map(compileOne, jackPaths, xmlPaths))
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # large chunks keep IPC overhead down on runs over thousands of files
+        chunkSize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+        return list(pool.map(
+            compileOne, jackPaths, xmlPaths, chunksize=chunkSize))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='parse .jack files into nand2tetris project 10 .xml')
+    parser.add_argument(
+        'paths', nargs='+',
+        help='.jack files, or directories to search for .jack files')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='worker processes (default: one per core; 1 runs in-process)')
+    parser.add_argument(
+        '-o', '--output-dir', default=None,
+        help='write .xml files here instead of next to each .jack file')
+    parser.add_argument(
+        '--engine', choices=['char', 'regex', 'stream', 'mmap'],
+        default='regex',
+        help='JackTokenizer engine (default: regex)')
+    parser.add_argument(
+        '--cache', metavar='DIR', default=None,
+        help='reuse output for .jack files whose contents are unchanged')
+    parser.add_argument(
+        '--cache-size', metavar='MB', type=int, default=256,
+        help='evict least recently used cache entries past this size')
+    parser.add_argument(
+        '--token-files', metavar='DIR', default=None,
+        help='keep a binary token file per .jack file here and parse from '
+             'it instead of lexing again while the source is unchanged')
+    parser.add_argument(
+        '--trace', action='store_true',
+        help='print every token to stderr as it is read (use with -j 1)')
+    parser.add_argument(
+        '--check', action='store_true',
+        help='compare each output with the Xxx.xml beside its .jack file, '
+             'ignoring whitespace like TextComparer (needs --output-dir)')
+    parser.add_argument(
+        '--tokens', action='store_true',
+        help='only tokenize: write the XxxT.xml <tokens> listing')
+    parser.add_argument(
+        '--symbols', action='store_true',
+        help='annotate identifiers of variables with their kind, type, and '
+             'index in the symbol tables; the output then differs from the '
+             'project 10 .xml files')
+    parser.add_argument(
+        '--subroutine-jobs', metavar='N', type=int, default=None,
+        help='parse the subroutines of each large class in N processes; '
+             'files are then compiled one at a time')
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='time every grammar rule and print a table of the totals; '
+             'files are then compiled one at a time')
+    parser.add_argument(
+        '--profile-stacks', metavar='PATH', default=None,
+        help='also write the profile as collapsed stacks for flame graphs '
+             '(implies --profile)')
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error(f'--jobs must be at least 1, not {args.jobs}')
+    if args.subroutine_jobs is not None and args.subroutine_jobs < 1:
+        parser.error(f'--subroutine-jobs must be at least 1, '
+                     f'not {args.subroutine_jobs}')
+
+    try:
+        jobs = findJackFiles(args.paths, args.output_dir,
+                             'T.xml' if args.tokens else '.xml')
+    except ValueError as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+    if args.check and args.output_dir is None:
+        parser.error('--check needs --output-dir so the expected .xml files '
+                     'are not overwritten')
+    if args.check and args.symbols:
+        parser.error('--check compares with project 10 .xml files, which '
+                     'have no --symbols annotations')
+
+    profiler = None
+    if args.profile or args.profile_stacks:
+        from ruleProfiler import RuleProfiler
+        profiler = RuleProfiler()
+
+    # a class's subroutine workers can't be started from a file worker, and
+    # a profiler only sees what runs in this process
+    workers = 1 if args.subroutine_jobs or profiler else args.jobs
+    results = compileAll(jobs, workers, engine=args.engine,
+                         cacheDir=args.cache, trace=args.trace,
+                         check=args.check, tokensOnly=args.tokens,
+                         subroutineJobs=args.subroutine_jobs,
+                         profiler=profiler, tokenDir=args.token_files,
+                         annotateSymbols=args.symbols)
+    elapsed = time.perf_counter() - start
+
+    failures = 0
+    for jackPath, error, seconds, cached in results:
+        if error is not None:
+            failures += 1
+            print(f'FAIL  {jackPath}: {error}')
+        elif cached:
+            print(f'hit   {jackPath}')
+        else:
+            print(f'ok    {jackPath}')
+
+    print(f'{len(results)} files, {len(results) - failures} ok, '
+          f'{failures} failed in {elapsed:.2f}s')
+
+    if args.cache is not None:
+        # workers kept their own counts; total them here
+        from compileCache import CompileCache
+        cache = CompileCache(args.cache, args.cache_size << 20)
+        cache.hits = sum(1 for result in results if result[3])
+        cache.misses = sum(1 for result in results if result[3] is False)
+        cache.evict()
+        stats = cache.stats()
+        print(f'cache: {stats["hits"]} hits, {stats["misses"]} misses '
+              f'({stats["hitRate"]:.0%}), {stats["evictions"]} evicted, '
+              f'{stats["entries"]} entries, {stats["bytes"]} bytes')
+
+    if profiler is not None:
+        print(profiler.table())
+        if args.profile_stacks is not None:
+            profiler.writeCollapsed(args.profile_stacks)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
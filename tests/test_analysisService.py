@@ -0,0 +1,32 @@
+"""
+@date 2026.10.18
+
+regression tests for analysisService's request handling
+"""
+
+import unittest
+
+from analysisService import analyzeSource
+
+
+class AnalyzeSourceTest(unittest.TestCase):
+	# a tokens request only tokenizes, like syntaxAnalyzer --tokens, so
+	# source that lexes but doesn't parse still gets its listing
+	def testTokensOfUnparsableSource(self):
+		xml, error = analyzeSource('class A { let }', 'A.jack', True)
+		self.assertIsNone(error)
+		self.assertIn('<keyword> let </keyword>', xml)
+
+	def testParseError(self):
+		xml, error = analyzeSource('class A { let }', 'A.jack')
+		self.assertIsNone(xml)
+		self.assertRegex(error, r'A\.jack:1:11: expected: }, actual: let')
+
+	def testLexicalErrorInTokensRequest(self):
+		xml, error = analyzeSource('class A { # }', 'A.jack', True)
+		self.assertIsNone(xml)
+		self.assertRegex(error, r"A\.jack:1:11: invalid character '#'")
+
+
+if __name__ == '__main__':
+	unittest.main()
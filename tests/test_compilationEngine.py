@@ -0,0 +1,92 @@
+"""
+@date 2026.10.18
+
+regression tests for CompilationEngine's syntax errors, on every tokenizer
+engine. run from the repository root with python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+from compilationEngine import CompilationEngine
+
+ENGINES = ('char', 'regex', 'stream', 'mmap')
+
+
+class ErrorTestCase(unittest.TestCase):
+	# compiles source as A.jack with each engine, expecting a ValueError
+	# whose message matches the regular expression message
+	def assertErrorOnEveryEngine(self, source, message):
+		with tempfile.TemporaryDirectory() as directory:
+			jackUri = os.path.join(directory, 'A.jack')
+			with open(jackUri, 'w') as jackFile:
+				jackFile.write(source)
+
+			for engine in ENGINES:
+				with self.subTest(engine=engine), \
+					self.assertRaisesRegex(ValueError, message):
+					# regex and mmap raise lexical errors here, tokenizing
+					ce = CompilationEngine(
+						jackUri, os.path.join(directory, 'A.xml'), engine)
+					try:
+						ce.compileClass()
+					finally:
+						ce.close()
+
+
+class UnexpectedEndTest(ErrorTestCase):
+	# advancing past the last token used to leave it current, so eat('}')
+	# took the if's closing brace a second time
+	def testTruncatedIf(self):
+		self.assertErrorOnEveryEngine(
+			'class A { function void f() { if (x) { } ',
+			r'A\.jack:1:41: unexpected end of file')
+
+	def testMissingClassBrace(self):
+		self.assertErrorOnEveryEngine(
+			'class A { function void f() { return; }\n',
+			r'A\.jack:1:40: unexpected end of file')
+
+	def testEndInTerm(self):
+		self.assertErrorOnEveryEngine(
+			'class A { function void f() { let x =\n// nothing more\n',
+			r'A\.jack:1:38: unexpected end of file')
+
+
+# syntax errors point at the offending token on every engine, not at the
+# one before it that the parser peeked past
+class SyntaxErrorLocationTest(ErrorTestCase):
+	def testDeclarationAmongStatements(self):
+		self.assertErrorOnEveryEngine(
+			'class A {\n  function void f() {\n    let x = 1;\n'
+			'    var int y;\n    return;\n  }\n}\n',
+			r'A\.jack:4:5: did not find let, if, while, do, or return → var')
+
+
+# lexical errors carry the same file:line:column on every engine
+class LexicalErrorTest(ErrorTestCase):
+	def testUnterminatedString(self):
+		self.assertErrorOnEveryEngine(
+			'class A {\n  function void f() {\n    let s = "abc;\n',
+			r'A\.jack:3:13: invalid character \'"\'')
+
+	def testIntegerOutOfRange(self):
+		self.assertErrorOnEveryEngine(
+			'class A {\n  function void f() {\n    let x = 40000;\n',
+			r'A\.jack:3:13: integer constant 40000 out of range')
+
+	# the char engine read y#z as one identifier
+	def testInvalidCharacterInIdentifier(self):
+		self.assertErrorOnEveryEngine(
+			'class A {\n  function void f() {\n    let x = y#z;\n',
+			r"A\.jack:3:14: invalid character '#'")
+
+	def testInvalidCharacterStartingAWord(self):
+		self.assertErrorOnEveryEngine(
+			'class A {\n  function void f() {\n    let x = $y;\n',
+			r"A\.jack:3:13: invalid character '\$'")
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,65 @@
+"""
+@date 2026.10.18
+
+tests for compileCache.CompileCache
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import compileCache
+from compileCache import CompileCache
+
+XML = '<class>\n</class>\n'
+
+
+class CompileCacheTest(unittest.TestCase):
+	def setUp(self):
+		directory = tempfile.TemporaryDirectory()
+		self.addCleanup(directory.cleanup)
+		self.directory = Path(directory.name)
+		self.xmlPath = self.directory / 'Main.xml'
+		self.xmlPath.write_text(XML)
+
+	def testMissStoreHit(self):
+		cache = CompileCache(self.directory / 'cache')
+		key = cache.key(b'class Main {}')
+		fetched = self.directory / 'fetched.xml'
+
+		self.assertFalse(cache.fetch(key, fetched))
+		cache.store(key, self.xmlPath)
+		self.assertTrue(cache.fetch(key, fetched))
+		self.assertEqual(fetched.read_text(), XML)
+		self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+	def testKeyDependsOnSourceVariantAndAnalyzer(self):
+		key = CompileCache.key(b'class Main {}')
+		self.assertNotEqual(key, CompileCache.key(b'class Main { }'))
+		self.assertNotEqual(key, CompileCache.key(b'class Main {}', 'tokens'))
+		with mock.patch.object(compileCache, 'analyzerVersion',
+							   lambda: 'another analyzer'):
+			self.assertNotEqual(key, CompileCache.key(b'class Main {}'))
+
+	# the least recently used entries go first, and reading one counts
+	def testEvictionUnderMaxBytes(self):
+		cache = CompileCache(self.directory / 'cache', maxBytes=2 * len(XML))
+		keys = [cache.key(f'class C{n} {{}}'.encode()) for n in range(3)]
+		for age, key in zip((300, 200, 100), keys):
+			cache.store(key, self.xmlPath)
+			then = cache.entryPath(key).stat().st_mtime - age
+			os.utime(cache.entryPath(key), (then, then))
+		self.assertTrue(cache.fetch(keys[0], self.directory / 'fetched.xml'))
+
+		cache.evict()
+		self.assertEqual(cache.evictions, 1)
+		self.assertTrue(cache.entryPath(keys[0]).exists())
+		self.assertFalse(cache.entryPath(keys[1]).exists())
+		self.assertTrue(cache.entryPath(keys[2]).exists())
+		self.assertEqual(cache.stats()['bytes'], 2 * len(XML))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,85 @@
+"""
+@date 2026.10.18
+
+regression tests for incrementalParse: reparse() must agree with a full
+parse. python -m benchmarks.reparseFuzz checks the same on random edits
+"""
+
+import unittest
+
+from analyzer import analyze
+from incrementalParse import parseIncremental, reparse
+
+SOURCE = '''class Point {
+	field int x, y;
+	static int count;
+
+	method int getX() {
+		return x;
+	}
+}
+'''
+
+
+class ClassVarDecReuseTest(unittest.TestCase):
+	# an edit in a subroutine leaves the classVarDecs as they were, so only
+	# the subroutine is parsed again
+	def testEditInSubroutineReusesDeclarations(self):
+		state = parseIncremental(SOURCE, 'Point.jack')
+		start = SOURCE.index('return x') + len('return ')
+		edited = reparse(state, start, start + 1, 'y')
+
+		self.assertEqual([member.node.tag for member in edited.reparsed],
+						 ['subroutineDec'])
+		self.assertEqual(edited.xml, analyze(edited.source).xml)
+
+	# a reused classVarDec's fields are still in the symbol table, so a new
+	# declaration of one is the error a full parse reports
+	def testRedeclaringAReusedField(self):
+		state = parseIncremental(SOURCE, 'Point.jack')
+		start = SOURCE.index('\tstatic')
+		with self.assertRaisesRegex(
+			ValueError, r'Point\.jack:3:12: x is already declared'):
+			analyze(SOURCE[:start] + '\tfield int x;\n' + SOURCE[start:],
+					'Point.jack')
+		with self.assertRaisesRegex(
+			ValueError, r'Point\.jack:3:12: x is already declared'):
+			reparse(state, start, start, '\tfield int x;\n')
+
+
+
+class SymbolTableTest(unittest.TestCase):
+	# a reused subroutineDec's scope is put back, so the result has every
+	# subroutine's scope, as a full parse's does
+	def testReusedSubroutineKeepsItsScope(self):
+		source = SOURCE.replace('return x;', 'var int z;\n\t\treturn x;')
+		source = source[:source.rindex('}')] + \
+			'\tfunction void f(int a) {\n\t\treturn;\n\t}\n}\n'
+		state = parseIncremental(source, 'Point.jack')
+		start = source.index('return;')
+		edited = reparse(state, start, start, 'do f(1);\n\t\t')
+
+		self.assertEqual([member.node.tag for member in edited.reparsed],
+						 ['subroutineDec'])
+		expected = analyze(edited.source, 'Point.jack').symbols
+		self.assertEqual(edited.symbols.classScope, expected.classScope)
+		self.assertEqual(edited.symbols.subroutineScopes,
+						 expected.subroutineScopes)
+		self.assertEqual(edited.symbols.subroutineScopes['getX']['z'].kind,
+						 'var')
+
+	# renaming the class changes the type of each method's this, so the
+	# methods are parsed again rather than reused
+	def testRenamedClassReparsesMethods(self):
+		state = parseIncremental(SOURCE, 'Point.jack')
+		start = SOURCE.index('Point')
+		edited = reparse(state, start, start + len('Point'), 'Spot')
+
+		self.assertEqual(
+			edited.symbols.subroutineScopes['getX']['this'].type, 'Spot')
+		self.assertEqual(edited.symbols.subroutineScopes,
+						 analyze(edited.source).symbols.subroutineScopes)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,29 @@
+"""
+@date 2026.10.18
+
+regression tests for symbolTable.SymbolTable
+"""
+
+import unittest
+
+from symbolTable import ARG, FIELD, SymbolTable
+
+
+class SymbolTableTest(unittest.TestCase):
+	def testUnknownNames(self):
+		symbols = SymbolTable('Point')
+		symbols.define('x', 'int', FIELD)
+		for lookup in symbols.kindOf, symbols.typeOf, symbols.indexOf:
+			with self.subTest(lookup=lookup.__name__):
+				self.assertIsNone(lookup('Keyboard'))
+
+	def testMethodStartsWithThis(self):
+		symbols = SymbolTable('Point')
+		symbols.startSubroutine('getX', 'method')
+		self.assertEqual(symbols.kindOf('this'), ARG)
+		self.assertEqual(symbols.typeOf('this'), 'Point')
+		self.assertEqual(symbols.indexOf('this'), 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
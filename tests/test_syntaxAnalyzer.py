@@ -0,0 +1,94 @@
+"""
+@date 2026.10.18
+
+regression tests for syntaxAnalyzer's command line. run from the repository
+root with python -m unittest discover tests, or python -m pytest tests
+"""
+
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from syntaxAnalyzer import findJackFiles, main
+
+TESTS = Path(__file__).parent
+
+
+class FindJackFilesTest(unittest.TestCase):
+	# Square and ExpressionLessSquare both hold Main, Square, and SquareGame:
+	# with -o, each must keep its own directory instead of one overwriting
+	# the other's output
+	def testSameNamesUnderTwoRootsDontCollide(self):
+		roots = [TESTS / 'Square', TESTS / 'ExpressionLessSquare']
+		jobs = findJackFiles(roots, 'out')
+		xmlPaths = [xmlPath for jackPath, xmlPath in jobs]
+
+		self.assertEqual(len(jobs), 6)
+		self.assertEqual(len(set(xmlPaths)), 6)
+		self.assertIn(Path('out/Square/Main.xml'), xmlPaths)
+		self.assertIn(Path('out/ExpressionLessSquare/Main.xml'), xmlPaths)
+
+	def testOneRootMapsRelativeToItself(self):
+		jobs = findJackFiles([TESTS / 'Square'], 'out')
+		self.assertEqual(sorted(xmlPath for jackPath, xmlPath in jobs),
+						 [Path('out/Main.xml'), Path('out/Square.xml'),
+						  Path('out/SquareGame.xml')])
+
+	def testCheckTwoRoots(self):
+		with tempfile.TemporaryDirectory() as outputDir:
+			status = main([str(TESTS / 'Square'),
+						   str(TESTS / 'ExpressionLessSquare'),
+						   '-o', outputDir, '--check', '-j', '1'])
+			self.assertEqual(status, 0)
+			self.assertEqual(len(list(Path(outputDir).rglob('*.xml'))), 6)
+
+
+
+# every project 10 file in tests/ compiles to its expected .xml
+class CheckTest(unittest.TestCase):
+	def assertChecks(self, *options):
+		with tempfile.TemporaryDirectory() as outputDir, \
+			contextlib.redirect_stdout(io.StringIO()):
+			status = main([str(TESTS), '-o', outputDir, '--check', '-j', '1',
+						   *options])
+		self.assertEqual(status, 0)
+
+	def testEveryEngine(self):
+		for engine in ('char', 'regex', 'stream', 'mmap'):
+			with self.subTest(engine=engine):
+				self.assertChecks('--engine', engine)
+
+	def testSubroutineJobs(self):
+		self.assertChecks('--subroutine-jobs', '2')
+
+	# the second run parses from the token files the first one wrote
+	def testTokenFiles(self):
+		with tempfile.TemporaryDirectory() as tokenDir:
+			for run in ('write', 'read'):
+				with self.subTest(run=run):
+					self.assertChecks('--token-files', tokenDir)
+			self.assertEqual(len(list(Path(tokenDir).iterdir())), 7)
+
+
+class OptionsTest(unittest.TestCase):
+	# main()'s status when argparse rejects argv, keeping its usage message
+	# off the test output
+	def exitStatus(self, argv):
+		with contextlib.redirect_stderr(io.StringIO()), \
+			self.assertRaises(SystemExit) as raised:
+			main(argv)
+		return raised.exception.code
+
+	def testJobsMustBePositive(self):
+		for jobs in ('0', '-1'):
+			with self.subTest(jobs=jobs):
+				self.assertEqual(self.exitStatus(
+					[str(TESTS / 'Square'), '-j', jobs]), 2)
+				self.assertEqual(self.exitStatus(
+					[str(TESTS / 'Square'), '--subroutine-jobs', jobs]), 2)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,109 @@
+"""
+@date 2026.10.18
+
+regression tests for tokenFile: a token file reads back as the TokenStream
+it was written from, and a damaged or foreign file is rejected. run from the
+repository root with python -m unittest discover tests
+"""
+
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+from lineIndex import LineIndex
+from tokenFile import TOKEN_FILE_VERSION, TokenFile, writeTokenFile
+from tokenizer import JackTokenizer
+
+SOURCE = '''class Greeter {
+	field String name;
+
+	// says hello, twice
+	method void greet() {
+		do Output.printString("héllo, ");
+		do Output.printString("héllo, ");
+		return;
+	}
+}
+'''
+
+
+class TokenFileTest(unittest.TestCase):
+	def setUp(self):
+		directory = tempfile.TemporaryDirectory()
+		self.addCleanup(directory.cleanup)
+		self.directory = Path(directory.name)
+
+		self.source = SOURCE.encode('utf-8')
+		self.tokens = JackTokenizer(
+			'Greeter.jack', 'regex', source=SOURCE).tokens
+		self.uri = self.directory / 'Greeter.jtok'
+		writeTokenFile(self.tokens, self.source, self.uri)
+
+	# the file's bytes, changed by edit, written under another name
+	def damaged(self, edit):
+		data = bytearray(self.uri.read_bytes())
+		edit(data)
+		uri = self.directory / 'damaged.jtok'
+		uri.write_bytes(data)
+		return uri
+
+	def testRoundTrip(self):
+		tokens = TokenFile(self.uri)
+
+		self.assertEqual(len(tokens), len(self.tokens))
+		self.assertEqual(list(tokens.types), list(self.tokens.types))
+		self.assertEqual(list(tokens.values()), list(self.tokens.values()))
+		self.assertEqual(tokens.value(len(tokens) - 1), '}')
+		self.assertTrue(tokens.matches(self.source))
+		self.assertFalse(tokens.matches(self.source + b'\n'))
+
+		lines = LineIndex(self.tokens.code)
+		for start in self.tokens.starts:
+			self.assertEqual(tokens.lineIndex.lineColumn(start),
+							 lines.lineColumn(start))
+
+	# the mmap engine reads a token file as its tokens
+	def testMmapEngineReadsIt(self):
+		tk = JackTokenizer('Greeter.jack', 'mmap', tokens=TokenFile(self.uri))
+		values = []
+		while tk.hasMoreTokens():
+			tk.advance()
+			values.append(tk.currentValue)
+		self.assertEqual(values, list(self.tokens.values()))
+
+	def testBadMagic(self):
+		def edit(data):
+			data[0:4] = b'JTOX'
+		with self.assertRaisesRegex(ValueError,
+									r"not a token file, magic b'JTOX'"):
+			TokenFile(self.damaged(edit))
+
+	def testTooShort(self):
+		def edit(data):
+			del data[8:]
+		with self.assertRaisesRegex(ValueError,
+									r'not a token file, only 8 bytes'):
+			TokenFile(self.damaged(edit))
+
+	def testVersionMismatch(self):
+		def edit(data):
+			data[4:6] = struct.pack('<H', TOKEN_FILE_VERSION + 1)
+		with self.assertRaisesRegex(
+			ValueError, f'token file version {TOKEN_FILE_VERSION + 1}, '
+						f'expected {TOKEN_FILE_VERSION}'):
+			TokenFile(self.damaged(edit))
+
+	def testSizeMismatch(self):
+		size = self.uri.stat().st_size
+
+		def edit(data):
+			data.append(0)
+		with self.assertRaisesRegex(
+			ValueError, f'token file is {size + 1} bytes, its header says '
+						f'{size}'):
+			TokenFile(self.damaged(edit))
+
+
+if __name__ == '__main__':
+	unittest.main()
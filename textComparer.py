@@ -0,0 +1,125 @@
+"""
+@date 2026.10.18
+
+built-in replacement for nand2tetris/tools/TextComparer: checks generated
+.xml against the expected files without starting a JVM per file.
+
+like TextComparer, lines are compared with all whitespace removed, so
+'<symbol> { </symbol>' matches '<symbol>{</symbol>'. blank lines are skipped.
+both files are read lazily, line by line, and comparison stops at the first
+difference.
+
+usage:
+	python textComparer.py actual.xml expected.xml
+	python textComparer.py --tree generatedDir expectedDir [--jobs N]
+the second form compares every .xml under generatedDir with the file at the
+same relative path under expectedDir, in parallel.
+"""
+
+from itertools import zip_longest
+from pathlib import Path
+import argparse
+import os
+import sys
+
+# str.translate table deleting every whitespace character TextComparer ignores
+WHITESPACE = str.maketrans('', '', ' \t\r\n\f\v')
+
+
+# (line number, line with whitespace removed) for each non-blank line
+def normalizedLines(f):
+	for number, line in enumerate(f, 1):
+		line = line.translate(WHITESPACE)
+		if line:
+			yield number, line
+
+
+def compareFiles(actualUri, expectedUri):
+	"""
+	compares two text files, ignoring whitespace
+
+	:return: None if they match. otherwise (actualLine, expectedLine) for the
+		first difference, each a (line number, text) pair, or None where that
+		file ended first
+	"""
+	with open(actualUri, 'r') as actual, open(expectedUri, 'r') as expected:
+		for actualLine, expectedLine in zip_longest(
+				normalizedLines(actual), normalizedLines(expected)):
+			if actualLine is None or expectedLine is None or \
+					actualLine[1] != expectedLine[1]:
+				return actualLine, expectedLine
+	return None
+
+
+# one-line description of a compareFiles() result
+def describe(actualUri, expectedUri, difference):
+	if difference is None:
+		return f'{actualUri}: comparison ended successfully'
+
+	actualLine, expectedLine = difference
+	if actualLine is None:
+		return (f'{actualUri}: ends early; {expectedUri}:{expectedLine[0]} '
+				f'expects {expectedLine[1]}')
+	if expectedLine is None:
+		return (f'{actualUri}:{actualLine[0]}: extra line {actualLine[1]} '
+				f'after the end of {expectedUri}')
+	return (f'{actualUri}:{actualLine[0]}: {actualLine[1]} != '
+			f'{expectedUri}:{expectedLine[0]}: {expectedLine[1]}')
+
+
+# compareFiles for a worker process: a missing expected file is a failure
+# rather than an exception. returns (actualUri, expectedUri, difference)
+def comparePair(actualUri, expectedUri):
+	if not os.path.exists(expectedUri):
+		return actualUri, expectedUri, (None, (0, '<missing file>'))
+	return actualUri, expectedUri, compareFiles(actualUri, expectedUri)
+
+
+# compares every .xml under generatedDir with its counterpart under
+# expectedDir. returns comparePair results sorted by path
+def compareTree(generatedDir, expectedDir, workers=None):
+	generatedDir = Path(generatedDir)
+	actualUris = sorted(generatedDir.rglob('*.xml'))
+	expectedUris = [Path(expectedDir) / uri.relative_to(generatedDir)
+					for uri in actualUris]
+
+	if workers == 1 or len(actualUris) < 2:
+		return list(map(comparePair, actualUris, expectedUris))
+
+	# imported here: syntaxAnalyzer imports this module for compareFiles
+	from concurrent.futures import ProcessPoolExecutor
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		chunkSize = max(1, len(actualUris) // (4 * (workers or os.cpu_count() or 1)))
+		return list(pool.map(
+			comparePair, actualUris, expectedUris, chunksize=chunkSize))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		description='compare text files line by line, ignoring whitespace')
+	parser.add_argument('actual', help='generated file, or directory with --tree')
+	parser.add_argument('expected', help='expected file, or directory with --tree')
+	parser.add_argument('--tree', action='store_true',
+						help='compare every .xml under two directories')
+	parser.add_argument('-j', '--jobs', type=int, default=None,
+						help='worker processes for --tree (default: one per core)')
+	args = parser.parse_args(argv)
+
+	if not args.tree:
+		difference = compareFiles(args.actual, args.expected)
+		print(describe(args.actual, args.expected, difference))
+		return 0 if difference is None else 1
+
+	results = compareTree(args.actual, args.expected, args.jobs)
+	failures = 0
+	for actualUri, expectedUri, difference in results:
+		if difference is not None:
+			failures += 1
+			print(describe(actualUri, expectedUri, difference))
+	print(f'{len(results)} files compared, {len(results) - failures} match, '
+		  f'{failures} differ')
+	return 1 if failures else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
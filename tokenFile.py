@@ -0,0 +1,249 @@
+"""
+@date 2026.10.18
+
+a binary file of a .jack file's tokens, so later stages can reuse them
+without lexing the source again: the *T.xml listing, CompilationEngine, and
+any other tool that reads tokens. the file is memory-mapped and read in
+place; nothing is decoded until a token's value is asked for.
+
+	writeTokenFile(JackTokenizer('Main.jack', 'regex').tokens,
+				   Path('Main.jack').read_bytes(), 'Main.jtok')
+	tokens = TokenFile('Main.jtok')
+	ce = CompilationEngine('Main.jack', 'Main.xml', 'mmap', tokens=tokens)
+
+or python tokenFile.py Main.jack Main.jtok, and python tokenFile.py --dump
+Main.jtok to list one.
+
+layout, all integers unsigned and little-endian:
+	header, 64 bytes: magic b'JTOK', version u16, header size u16, then
+		u32 counts of tokens, strings, and lines, the string blob's size in
+		bytes, and the SHA-256 of the .jack file's raw bytes
+	records: 16 bytes per token, u32 type, string id, start, end. start and
+		end are the token's span in the source, as in TokenStream
+	string offsets: u32 × (strings + 1); string n is blob[offsets[n]:
+		offsets[n + 1]], UTF-8. each distinct value is stored once
+	line starts: u32 × lines, a LineIndex's lineStarts, so diagnostics get
+		line numbers without the source
+	string blob
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+from lineIndex import LineIndex
+from tokenizer import JackTokenizer, TOKEN_TYPES_BY_CODE
+
+TOKEN_FILE_MAGIC = b'JTOK'
+
+# bump whenever the layout changes; files of any other version are rejected
+TOKEN_FILE_VERSION = 1
+
+HEADER = struct.Struct('<4sHHIIII32s8x')
+RECORD_WORDS = 4  # u32s per token record
+
+
+# u32 array of values, in file byte order
+def littleEndian(values):
+	words = array('I', values)
+	if sys.byteorder == 'big':
+		words.byteswap()
+	return words
+
+
+def tokenFileBytes(tokens, source: bytes) -> bytes:
+	"""
+	the token file of a TokenStream as bytes
+
+	:param tokens: a TokenStream, e.g. JackTokenizer(uri, 'regex').tokens
+	:param source: the raw bytes of the .jack file it was made from
+	"""
+	strings = {}  # value → string id, in order of first use
+	stringIds = [strings.setdefault(value, len(strings))
+				 for value in tokens.values()]
+
+	records = array('I', bytes(4 * RECORD_WORDS * len(tokens)))
+	records[0::RECORD_WORDS] = array('I', tokens.types)
+	records[1::RECORD_WORDS] = array('I', stringIds)
+	records[2::RECORD_WORDS] = array('I', tokens.starts)
+	records[3::RECORD_WORDS] = array('I', tokens.ends)
+	if sys.byteorder == 'big':
+		records.byteswap()
+
+	encoded = [value.encode('utf-8') for value in strings]
+	offsets = [0]
+	for value in encoded:
+		offsets.append(offsets[-1] + len(value))
+
+	lineIndex = tokens.lineIndex or LineIndex(tokens.code)
+	header = HEADER.pack(
+		TOKEN_FILE_MAGIC, TOKEN_FILE_VERSION, HEADER.size, len(tokens),
+		len(strings), len(lineIndex.lineStarts), offsets[-1],
+		hashlib.sha256(source).digest())
+	return b''.join([
+		header, records.tobytes(), littleEndian(offsets).tobytes(),
+		littleEndian(lineIndex.lineStarts).tobytes(), *encoded])
+
+
+def writeTokenFile(tokens, source: bytes, uri):
+	"""
+	writes the token file of a TokenStream. the file is written under a
+	temporary name and renamed into place, so a reader never maps half of it
+	"""
+	data = tokenFileBytes(tokens, source)
+	handle, tmpUri = tempfile.mkstemp(
+		dir=os.path.dirname(os.path.abspath(uri)), suffix='.tmp')
+	try:
+		with os.fdopen(handle, 'wb') as f:
+			f.write(data)
+		os.replace(tmpUri, uri)
+	except BaseException:
+		os.remove(tmpUri)
+		raise
+
+
+class TokenFile:
+	"""
+	a memory-mapped token file. it reads like a MappedTokenStream: types,
+	starts, and ends are views of the records, value() decodes a token, and
+	JackTokenizer's mmap engine accepts it as tokens. a value is decoded
+	once per distinct string and kept
+
+		checksum: SHA-256 of the .jack file the tokens came from
+		lineIndex: a LineIndex over the mapped line starts
+	"""
+
+	def __init__(self, uri):
+		self.uri = uri
+		# the mapping outlives the file object; it's unmapped once this and
+		# every view of it are garbage
+		with open(uri, 'rb') as f:
+			size = os.fstat(f.fileno()).st_size
+			if size < HEADER.size:
+				raise ValueError(f'{uri}: not a token file, only {size} bytes')
+			self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		(magic, version, headerSize, tokenCount, stringCount, lineCount,
+		 stringBytes, self.checksum) = HEADER.unpack_from(self.mapping)
+		if magic != TOKEN_FILE_MAGIC:
+			raise ValueError(f'{uri}: not a token file, magic {magic!r}')
+		if version != TOKEN_FILE_VERSION:
+			raise ValueError(f'{uri}: token file version {version}, expected '
+							 f'{TOKEN_FILE_VERSION}')
+
+		wordCount = RECORD_WORDS * tokenCount + stringCount + 1 + lineCount
+		expected = headerSize + 4 * wordCount + stringBytes
+		if size != expected:
+			raise ValueError(f'{uri}: token file is {size} bytes, its header '
+							 f'says {expected}')
+
+		view = memoryview(self.mapping)
+		if sys.byteorder == 'little':
+			words = view[headerSize:headerSize + 4 * wordCount].cast('I')
+		else:
+			words = array('I')
+			words.frombytes(view[headerSize:headerSize + 4 * wordCount])
+			words.byteswap()
+
+		records = words[:RECORD_WORDS * tokenCount]
+		self.types = records[0::RECORD_WORDS]
+		self.stringIds = records[1::RECORD_WORDS]
+		self.starts = records[2::RECORD_WORDS]
+		self.ends = records[3::RECORD_WORDS]
+
+		offsetsEnd = RECORD_WORDS * tokenCount + stringCount + 1
+		self.stringOffsets = words[RECORD_WORDS * tokenCount:offsetsEnd]
+		self.lineIndex = LineIndex.fromLineStarts(words[offsetsEnd:])
+		self.blob = view[size - stringBytes:]
+		self.strings = [None] * stringCount
+
+		# there's no source text; JackTokenizer copies this
+		self.code = None
+
+	def __len__(self):
+		return len(self.types)
+
+	def tokenType(self, index: int):
+		return TOKEN_TYPES_BY_CODE[self.types[index]]
+
+	def string(self, stringId: int) -> str:
+		value = self.strings[stringId]
+		if value is None:
+			offsets = self.stringOffsets
+			value = self.strings[stringId] = str(
+				self.blob[offsets[stringId]:offsets[stringId + 1]], 'utf-8')
+		return value
+
+	def value(self, index: int) -> str:
+		return self.string(self.stringIds[index])
+
+	def values(self):
+		return map(self.string, self.stringIds)
+
+	# True if source, a .jack file's raw bytes, is what these tokens are of
+	def matches(self, source: bytes) -> bool:
+		return hashlib.sha256(source).digest() == self.checksum
+
+
+def cachedTokenFile(jackUri, directory) -> TokenFile:
+	"""
+	the TokenFile of a .jack file from directory, where token files are
+	named by the SHA-256 of their source. one is written first if there
+	isn't a current one, so every later stage, process, or run that needs
+	the file's tokens maps the same file instead of lexing it again
+	"""
+	source = Path(jackUri).read_bytes()
+	digest = hashlib.sha256(source)
+	directory = Path(directory)
+	uri = directory / f'{digest.hexdigest()}.jtok'
+	try:
+		tokens = TokenFile(uri)
+		if tokens.checksum == digest.digest():
+			return tokens
+	except FileNotFoundError:
+		pass
+	except ValueError:
+		pass  # an older version or a damaged file: replaced below
+
+	directory.mkdir(parents=True, exist_ok=True)
+	writeTokenFile(JackTokenizer(str(jackUri), 'regex').tokens, source, uri)
+	return TokenFile(uri)
+
+
+def main(argv=None):
+	import argparse
+
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+	parser.add_argument('jack', nargs='?', help='.jack file to tokenize')
+	parser.add_argument('output', nargs='?', help='token file to write')
+	parser.add_argument('--dump', metavar='JTOK', default=None,
+						help='print the tokens of a token file instead')
+	args = parser.parse_args(argv)
+
+	if args.dump is not None:
+		tokens = TokenFile(args.dump)
+		print(f'{len(tokens)} tokens, {len(tokens.strings)} strings, '
+			  f'{len(tokens.lineIndex.lineStarts)} lines, source sha256 '
+			  f'{tokens.checksum.hex()}')
+		for index, value in enumerate(tokens.values()):
+			line, column = tokens.lineIndex.lineColumn(tokens.starts[index])
+			print(f'{line}:{column}\t{tokens.tokenType(index).name}\t{value}')
+		return 0
+
+	if args.jack is None or args.output is None:
+		parser.error('give a .jack file and a token file to write, or --dump')
+	source = Path(args.jack).read_bytes()
+	tokens = JackTokenizer(args.jack, 'regex').tokens
+	writeTokenFile(tokens, source, args.output)
+	print(f'{args.output}: {len(tokens)} tokens, '
+		  f'{os.path.getsize(args.output)} bytes')
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,8 +1,19 @@
 import enum
+import io
+import mmap
+import os
+import re
+import sys
+from array import array
+from collections import deque
 
+from lineIndex import LineIndex
+from preprocessor import normalizeSource
 
-# enumeration for tokenTypes
-class TokenType(enum.Enum):
+
+# enumeration for tokenTypes. members are small ints, the same type codes
+# TokenStream stores, so a code read from its array compares equal to them
+class TokenType(enum.IntEnum):
 	KEYWORD = 1
 	SYMBOL = 2
 	IDENTIFIER = 3
@@ -10,6 +21,15 @@ class TokenType(enum.Enum):
 	STRING_CONST = 5
 
 
+# TokenType lookup by its integer value, for the type codes in TokenStream
+TOKEN_TYPES_BY_CODE = (None,) + tuple(TokenType)
+
+# the members again as globals: TokenType.KEYWORD is an attribute lookup on
+# the enum class that costs several times a global load, and the tokenizer
+# and CompilationEngine compare token types at least once per token
+KEYWORD, SYMBOL, IDENTIFIER, INT_CONST, STRING_CONST = TokenType
+
+
 ''' jack grammar guide for tokenizer.py
 
 	lexical elements → the jack language includes five categories of terminal 
@@ -34,105 +54,448 @@ class TokenType(enum.Enum):
 '''
 
 
+KEYWORDS = [
+	'class',
+	'constructor',
+	'function',
+	'method',
+	'field',
+	'static',
+	'var',
+	'int',
+	'char',
+	'boolean',
+	'void',
+	'true',
+	'false',
+	'null',
+	'this',
+	'let',
+	'do',
+	'if',
+	'else',
+	'while',
+	'return'
+]
+
+SYMBOLS = '{}[]().,;+-*/&|<>=~'
+
+# one shared copy of each keyword and symbol. slicing a keyword out of the
+# source makes a new string each time, so tokens swap it for this one;
+# values kept around, e.g. in a parse tree, then cost a pointer apiece.
+# CPython already shares one-character strings, but symbols are listed too
+# so every keyword and symbol value is the same object
+INTERNED = {value: sys.intern(value) for value in KEYWORDS + list(SYMBOLS)}
+
+
+# master pattern for the 'regex' engine: leading whitespace, then one
+# alternation per lexical category, tried in the same order as advance()
+# checks them. any other character is an error, so finditer never skips over
+# characters we don't understand
+TOKEN_PATTERN = re.compile(r'''
+	\s*
+	(?: (?P<symbol>[{}\[\]().,;+\-*/&|<>=~])
+	| (?P<string>"[^"\n]*")
+	| (?P<int>[0-9]+)
+	| (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+	| (?P<error>\S) )
+''', re.VERBOSE)
+
+
+# the 'stream' engine reads raw source, so it matches comments itself. an
+# unterminated block comment matches up to the end of the text it was given
+STREAM_PATTERN = re.compile(r'''
+	(?P<space>\s+)
+	| (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+	| (?P<symbol>[{}\[\]().,;+\-*/&|<>=~])
+	| (?P<string>"[^"\n]*")
+	| (?P<int>[0-9]+)
+	| (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+	| (?P<error>.)
+''', re.VERBOSE | re.DOTALL)
+
+# STREAM_PATTERN over bytes, for the 'mmap' engine: it scans the mapped file
+# in place, comments and all
+MAPPED_PATTERN = re.compile(
+	STREAM_PATTERN.pattern.encode(), re.VERBOSE | re.DOTALL)
+
+
+# an identifier or keyword, for the 'char' engine, which reads up to the next
+# delimiter and checks what it read against this
+WORD_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+# the largest integer constant, according to spec
+MAX_INT_CONSTANT = 32767
+
+
+# raises the ValueError for an integer constant value, a str, above
+# MAX_INT_CONSTANT. where(offset) gives the location for the message
+def checkIntConstant(value, offset, where):
+	if int(value) > MAX_INT_CONSTANT:
+		raise ValueError(
+			f'{where(offset)}: integer constant {value} out of range')
+
+
+def classifyToken(match, kind, keywords, where):
+	"""
+	a token pattern's match → (type code, start, end) of the token it read:
+	its value is text[start:end], inside the quotes of a string constant.
+	every lexer here but the char engine's reads tokens through this one
+
+	:param match: a match of TOKEN_PATTERN, STREAM_PATTERN or
+		MAPPED_PATTERN, of anything but space or a comment
+	:param kind: match.lastgroup
+	:param keywords: set of the keywords, as bytes for MAPPED_PATTERN
+	:param where: function of an offset → its location, for error messages
+	"""
+	start, end = match.span(kind)
+	if kind == 'symbol':
+		return SYMBOL, start, end
+	if kind == 'word':
+		if match.group(kind) in keywords:
+			return KEYWORD, start, end
+		return IDENTIFIER, start, end
+	if kind == 'string':
+		return STRING_CONST, start + 1, end - 1
+
+	text = match.group(kind)
+	if type(text) is bytes:
+		text = text.decode('utf-8', 'replace')
+	if kind == 'int':
+		checkIntConstant(text, start, where)
+		return INT_CONST, start, end
+	raise ValueError(f'{where(start)}: invalid character {text!r}')
+
+
+def streamTokens(jackFile, chunkSize=1 << 16, where=None):
+	"""
+	lazily tokenizes an open .jack file, reading chunkSize characters at a time
+
+	only text up to the last newline read so far is scanned: no token or
+	string constant spans a newline, so everything before it is complete. a
+	block comment still open at that point is carried over to the next chunk
+	along with the partial last line. memory use is bounded by chunkSize plus
+	the longest line or comment, not by the size of the file.
+
+	:param where: function of a character offset → where it is for error
+		messages, e.g. JackTokenizer.where's 'file:line:column'. without
+		one, errors give the offset
+
+	:return: generator of (TokenType, value, offset) where offset is the
+		token's character offset in the file. once the file runs out the
+		generator returns the offset just past its last token
+	"""
+	if where is None:
+		where = 'offset {}'.format
+	keywords = frozenset(KEYWORDS)
+	classify = classifyToken
+	interned = INTERNED
+	buffer = ''
+	base = 0  # file offset of buffer[0]
+	atEof = False
+	lastEnd = 0  # file offset just past the last token
+
+	while not atEof:
+		chunk = jackFile.read(chunkSize)
+		atEof = chunk == ''
+		buffer += chunk
+
+		limit = len(buffer) if atEof else buffer.rfind('\n') + 1
+		pos = 0
+		bufferWhere = lambda offset: where(base + offset)
+		for match in STREAM_PATTERN.finditer(buffer, 0, limit):
+			kind = match.lastgroup
+			start, end = match.span()
+			if kind == 'comment' and not atEof and end == limit and \
+				match.group()[1] == '*' and not match.group().endswith('*/'):
+				break  # block comment continues in the next chunk
+
+			pos = end
+			if kind == 'space' or kind == 'comment':
+				continue
+
+			lastEnd = base + end
+			tokenType, start, end = classify(match, kind, keywords, bufferWhere)
+			value = buffer[start:end]
+			if tokenType == KEYWORD or tokenType == SYMBOL:
+				value = interned[value]
+			yield tokenType, value, base + start
+
+		buffer = buffer[pos:]
+		base += pos
+
+	return lastEnd
+
+
+# names used in token traces, matching the tokenizer's old debug prints
+TRACE_NAMES = {
+	TokenType.KEYWORD: 'keyword',
+	TokenType.SYMBOL: 'symbol',
+	TokenType.IDENTIFIER: 'identifier',
+	TokenType.INT_CONST: 'intConstant',
+	TokenType.STRING_CONST: 'stringConstant',
+}
+
+
+# trace callback that prints each token the way the tokenizer used to
+# unconditionally, e.g. 'keyword → class', to stderr
+def printTrace(tokenType, value):
+	print(f'{TRACE_NAMES[tokenType]} → {value}', file=sys.stderr)
+
+
+def loggerTrace(logger=None):
+	"""
+	builds a trace callback that logs each token at DEBUG level
+
+	the level is checked once, here: if the logger wouldn't emit DEBUG records
+	this returns None and tracing costs nothing per token
+
+	:param logger: defaults to logging.getLogger('tokenizer')
+	"""
+	# logging is imported here, not at the top: it costs more to import than
+	# the rest of the tokenizer, and only tracing uses it
+	import logging
+
+	if logger is None:
+		logger = logging.getLogger('tokenizer')
+	if not logger.isEnabledFor(logging.DEBUG):
+		return None
+
+	def trace(tokenType, value):
+		logger.debug('%s → %s', TRACE_NAMES[tokenType], value)
+
+	return trace
+
+
+class TokenStream:
+	"""
+	a whole file's tokens stored as parallel arrays instead of token objects:
+		types: TokenType value of each token, one byte apiece
+		starts, ends: the token's value is code[start:end]. for string
+			constants the span excludes the double quotes
+
+	because the tokenizer keeps comments blanked out rather than removed,
+	starts are also the tokens' offsets in the original .jack file
+	"""
+
+	def __init__(self, code: str):
+		self.code = code
+		self.types = array('B')
+		self.starts = array('L')
+		self.ends = array('L')
+
+		# where diagnostics find line numbers when there's no code to build a
+		# LineIndex from, e.g. tokens loaded from a token file
+		self.lineIndex = None
+
+	def __len__(self):
+		return len(self.types)
+
+	def append(self, tokenType: TokenType, start: int, end: int):
+		self.types.append(tokenType)
+		self.starts.append(start)
+		self.ends.append(end)
+
+	def tokenType(self, index: int) -> TokenType:
+		return TOKEN_TYPES_BY_CODE[self.types[index]]
+
+	def value(self, index: int) -> str:
+		return self.code[self.starts[index]:self.ends[index]]
+
+	# every token's value, in order
+	def values(self):
+		return map(self.code.__getitem__, map(slice, self.starts, self.ends))
+
+
+class MappedTokenStream(TokenStream):
+	"""
+	a TokenStream over a memory-mapped .jack file. code is the mapping itself
+	and starts and ends are byte offsets into it, so a token is only a span
+	until value() decodes it from a memoryview slice: nothing is copied out
+	of the mapping but the token's own bytes
+	"""
+
+	def __init__(self, buffer):
+		super().__init__(buffer)
+		self.view = memoryview(buffer)
+
+	def value(self, index: int) -> str:
+		return str(self.view[self.starts[index]:self.ends[index]], 'utf-8')
+
+	def values(self):
+		return map(self.value, range(len(self)))
+
+
 class JackTokenizer:
-	def __init__(self, filename):
+	# one tokenizer is made per file, but its attributes are read for every
+	# token: slots make those loads cheaper than a __dict__ lookup
+	__slots__ = (
+		'engine', 'trace', 'code', 'i', 'currentTokenType', 'currentValue',
+		'currentOffset', 'filename', 'lineIndex', 'symbols', 'whitespace',
+		'digits', 'keywords', 'tokens', 'tokenIndex', 'pending',
+		'currentStreamToken', 'jackFile', 'stream', 'endOffset', 'bytesCopied')
+
+	def __init__(self, filename, engine='char', chunkSize=1 << 16, trace=None,
+				 tokens=None, source=None):
 		"""
 		opens a .jack file and saves all .jack commands for later processing.
-		strips whitespace, full-line comments, and inline comments
-
+		strips full-line, inline, and multi-line comments
+
+		:param engine: 'char' scans one character at a time in advance().
+			'regex' tokenizes the whole file up front in a single pass of
+			TOKEN_PATTERN; advance() then just steps through the results.
+			'stream' never holds the whole file: tokens are scanned lazily,
+			chunkSize characters at a time, as advance() asks for them.
+			'mmap' memory-maps the file and scans it in place like 'regex'
+			does, keeping only each token's span; values are decoded as
+			advance() reaches them. its offsets, and so the columns in
+			location(), count bytes rather than characters
+		:param trace: None, or a function called as trace(tokenType, value)
+			for every token advance() loads. see printTrace and loggerTrace
+		:param tokens: for the regex and mmap engines, the TokenStream an
+			earlier JackTokenizer made of this file. the file isn't read
+			again; advance() starts at tokenIndex, which callers may move
+		:param source: the .jack source text, tokenized instead of reading
+			filename, which then only names it in error messages. not for
+			the mmap engine, which needs a file to map
 		:return: nothing, but fills self.jack_commands array
 		"""
-
-		jack_file = open(filename, 'r')
-		lines = jack_file.readlines()
+		if engine not in ['char', 'regex', 'stream', 'mmap']:
+			raise ValueError(f'unknown tokenizer engine: {engine}')
+		self.engine = engine
+		self.trace = trace
 
 		self.code = ""  # all commands in one string, inc. newlines
 		self.i = 0  # current index in above monolithic code string
-		self.currentTokenType = None  # set in advance()
-
-		# these 5 are used by their respective accessors, e.g. symbol(),
-		# keyWord(), intVal(), stringVal(), identifier(). these are called
-		# only if the current tokenType matches. invalid otherwise.
-		self.currentSymbolValue = None
-		self.currentIdentifierValue = None
-		self.currentStrConstValue = None
-		self.currentIntConstValue = None
-		self.currentKeyWordValue = None
-
-		self.symbols = "{}[]().,;+-*/&|<>=~"
-		self.digits = "0123456789"  # for integer constants
-		self.keywords = [
-			'class',
-			'constructor',
-			'function',
-			'method',
-			'field',
-			'static',
-			'var',
-			'int',
-			'char',
-			'boolean',
-			'void',
-			'true',
-			'false',
-			'null',
-			'this',
-			'let',
-			'do',
-			'if',
-			'else',
-			'while',
-			'return'
-		]
-
-		for line in lines:
-			# ignore whitespace
-
-			# debug text
-			# print(f'{line}', end=" ")
-
-			if line == '\n':
-				continue
 
-			# ignore entire-line comments
-			if line[0] == '/' and line[1] == '/':
-				continue
+		# set in advance(). None before the first token and once advance()
+		# has gone past the last one, when currentOffset is the end of file
+		self.currentTokenType = None
 
-			# ignore comments that start with /**
-			# TODO add case if this appears mid-line: slice!
-			#  but what about multiline?
-			# if line[0] == '/' and line[1] == '*' and line[2] == '*':
-			#	continue
+		# source offset where the current token's value starts (just inside
+		# the quotes for string constants). see location()
+		self.currentOffset = None
+		self.filename = filename
+		self.lineIndex = None  # LineIndex, built on first use by location()
 
-			# ignore mid-line comments
-			try:
-				index = line.index('//')
-				line = line[0:index]
-			except ValueError:
-				# '//' wasn't found!
-				pass
+		# the current token's value, whatever its type. read through the
+		# accessors, e.g. symbol(), keyWord(), intVal(), stringVal(),
+		# identifier(), which are called only if the current tokenType matches
+		self.currentValue = None
 
-			# strip whitespace
-			line = line.strip()
+		self.symbols = SYMBOLS
+		self.whitespace = " \t\r\n"
+		self.digits = "0123456789"  # for integer constants
+		self.keywords = KEYWORDS
+
+		# characters of source the comment stripper copied: see
+		# preprocessor.normalizeSource. stays 0 for the stream and mmap
+		# engines, which don't strip comments up front, and for reused tokens
+		self.bytesCopied = 0
+
+		# the regex engine fills this once, below
+		self.tokens = TokenStream(self.code)
+		self.tokenIndex = 0  # index of the next token advance() will load
+
+		# the stream engine's tokens, read ahead of the current one by
+		# hasMoreTokens() and lookahead()
+		self.pending = deque()
+		self.currentStreamToken = (None, None, None)
+		# offset just past the last token, once the stream runs out
+		self.endOffset = None
+
+		if source is not None and self.engine == 'mmap':
+			raise ValueError('the mmap engine cannot tokenize source text')
+
+		if self.engine == 'stream':
+			if source is not None:
+				self.jackFile = io.StringIO(source)
+				self.lineIndex = LineIndex(source)
+			else:
+				self.jackFile = open(filename, 'r')
+			self.stream = streamTokens(self.jackFile, chunkSize, self.where)
+			return
+
+		if tokens is not None:
+			if self.engine not in ['regex', 'mmap']:
+				raise ValueError(f'the {engine} engine cannot reuse tokens')
+			self.code = tokens.code
+			self.tokens = tokens
+			self.lineIndex = tokens.lineIndex
+			return
 
-			# combine lines into a single string separated by newlines
-			# later, we can count our current line via newline characters?
-			# unless newline chars are present in .jack file strings, too.
-			self.code += line
+		if self.engine == 'mmap':
+			# the mapping outlives the file object; it's unmapped once the
+			# tokenizer and its tokens are garbage
+			with open(filename, 'rb') as jack_file:
+				if os.fstat(jack_file.fileno()).st_size == 0:
+					self.code = b''  # empty files can't be mapped
+				else:
+					self.code = mmap.mmap(
+						jack_file.fileno(), 0, access=mmap.ACCESS_READ)
+			self.tokens = self.tokenizeMapped()
+			return
 
-		# unsure why this is needed
-		# all .jack files have extra newline at the end
-		self.code += '\n'
+		if source is None:
+			with open(filename, 'r') as jack_file:
+				source = jack_file.read()
+
+		# comments are blanked out in one pass, so self.code keeps the source's
+		# layout: the index of a character is its offset in the .jack file.
+		# see preprocessor.py
+		code, self.bytesCopied = normalizeSource(source)
+
+		# all .jack files need an extra newline at the end: hasMoreTokens()
+		# stops one character short of it
+		self.code = code.rstrip() + '\n'
+
+		# the regex engine does all of its scanning here, once
+		if self.engine == 'regex':
+			self.tokens = self.tokenize()
+
+	# tokenizes self.code in one pass with TOKEN_PATTERN. token values are the
+	# same strings the char engine stores in its current*Value attributes
+	def tokenize(self) -> TokenStream:
+		keywords = frozenset(self.keywords)
+		classify = classifyToken
+		where = self.where
+		tokens = TokenStream(self.code)
+		appendType = tokens.types.append
+		appendStart = tokens.starts.append
+		appendEnd = tokens.ends.append
+
+		for match in TOKEN_PATTERN.finditer(self.code):
+			tokenType, start, end = classify(
+				match, match.lastgroup, keywords, where)
+			appendType(tokenType)
+			appendStart(start)
+			appendEnd(end)
+
+		return tokens
+
+	# the mmap engine's tokenize: scans the mapped file with MAPPED_PATTERN,
+	# recording spans. nothing is decoded, and only words are copied out, to
+	# tell keywords from identifiers
+	def tokenizeMapped(self) -> MappedTokenStream:
+		keywords = frozenset(keyword.encode() for keyword in self.keywords)
+		classify = classifyToken
+		where = self.where
+		tokens = MappedTokenStream(self.code)
+		appendType = tokens.types.append
+		appendStart = tokens.starts.append
+		appendEnd = tokens.ends.append
+
+		for match in MAPPED_PATTERN.finditer(self.code):
+			kind = match.lastgroup
+			if kind == 'space' or kind == 'comment':
+				continue
 
-		# process out all multi-line comments starting '/**', ending '*/'
+			tokenType, start, end = classify(match, kind, keywords, where)
+			appendType(tokenType)
+			appendStart(start)
+			appendEnd(end)
 
-		while True:
-			try:
-				start = self.code.index('/**')
-				end = self.code.index('*/') + 2
-				self.code = self.code[:start] + self.code[end:]
-			except ValueError:
-				break
+		return tokens
 
 	# unnecessary; not part of the API
 	def getJackCommands(self):
@@ -147,24 +510,43 @@ class JackTokenizer:
 		# we're done and hasMoreTokens should return false.
 		#
 		# note that all .jack files have an extra newline at the end
+		if self.engine == 'regex' or self.engine == 'mmap':
+			return self.tokenIndex < len(self.tokens)
+
+		if self.engine == 'stream':
+			return self.__readAhead(1)
+
 		return self.i < len(self.code) - 1
 
 	def advance(self):
-		# 🏭 skip whitespace(s) and single newlines after tokens
-		# lines cannot start with spaces, which the constructor handles w/trim()
-		while self.code[self.i] == ' ':
-			self.i += 1
-			if not self.hasMoreTokens():
-				return
+		if self.engine == 'regex':
+			self.__advanceScanned()
+			return
 
-		if self.code[self.i] == '\n':  # constructor ensures no double \n
+		if self.engine == 'stream':
+			self.__advanceStreamed()
+			return
+
+		if self.engine == 'mmap':
+			self.__advanceMapped()
+			return
+
+		# 🏭 skip whitespace: spaces, tabs, and the newlines and indentation
+		# the constructor leaves in place to keep source offsets intact
+		if not self.hasMoreTokens():
+			self.__setEndOfInput(len(self.code) - 1)
+			return
+		while self.code[self.i] in self.whitespace:
 			self.i += 1
 			if not self.hasMoreTokens():
+				self.__setEndOfInput(len(self.code) - 1)
 				return
 
+		self.currentOffset = self.i
+
 		# every lexical category needs to:
 		# 1. set self.currentTokenType
-		# 2. set self.currentSymbolValue
+		# 2. set self.currentValue
 		# 3. appropriately increment code index, self.i
 		firstChar = self.code[self.i] # the first character in our new token!
 
@@ -187,29 +569,159 @@ class JackTokenizer:
 		self.__processKeywordIdentifier()
 		return
 
+	# regex engine version of advance: load the next pre-scanned token into the
+	# same attributes the accessors read
+	def __advanceScanned(self):
+		index = self.tokenIndex
+		tokens = self.tokens
+		if index >= len(tokens.types):
+			self.__setEndOfInput(self.__tokensEnd())
+			return
+
+		self.tokenIndex = index + 1
+		self.currentOffset = start = tokens.starts[index]
+		tokenType = TOKEN_TYPES_BY_CODE[tokens.types[index]]
+		value = tokens.code[start:tokens.ends[index]]
+		if tokenType == KEYWORD:
+			value = INTERNED[value]
+		self.__setCurrentToken(tokenType, value)
+
+	# mmap engine version of advance: decode the next token's span
+	def __advanceMapped(self):
+		index = self.tokenIndex
+		tokens = self.tokens
+		if index >= len(tokens.types):
+			self.__setEndOfInput(self.__tokensEnd())
+			return
+
+		self.tokenIndex = index + 1
+		self.currentOffset = tokens.starts[index]
+		tokenType = TOKEN_TYPES_BY_CODE[tokens.types[index]]
+		value = tokens.value(index)
+		if tokenType == KEYWORD:
+			value = INTERNED[value]
+		self.__setCurrentToken(tokenType, value)
+
+	# stream engine version of advance: take the next token off the generator
+	def __advanceStreamed(self):
+		if not self.__readAhead(1):
+			self.currentStreamToken = (None, None, self.endOffset)
+			self.__setEndOfInput(self.endOffset)
+			return
+
+		self.currentStreamToken = self.pending.popleft()
+		tokenType, value, self.currentOffset = self.currentStreamToken
+		self.__setCurrentToken(tokenType, value)
+
+	# pulls tokens from the stream engine's generator until k are pending.
+	# returns False if the file runs out first, closing it
+	def __readAhead(self, k: int):
+		while len(self.pending) < k:
+			if self.endOffset is not None:
+				return False
+			try:
+				self.pending.append(next(self.stream))
+			except StopIteration as end:
+				self.endOffset = end.value
+				self.jackFile.close()
+				return False
+		return True
+
+	# offset just past the last of the regex or mmap engine's tokens, closing
+	# quote and all; 0 if there are none
+	def __tokensEnd(self):
+		tokens = self.tokens
+		if len(tokens) == 0:
+			return 0
+		return tokens.ends[-1] + (tokens.types[-1] == STRING_CONST)
+
+	# advance() past the last token: no current token, and offset, just past
+	# the last one, is where an 'unexpected end of file' is reported
+	def __setEndOfInput(self, offset):
+		self.currentTokenType = None
+		self.currentValue = None
+		self.currentOffset = offset
+
+	# makes a token the current one
+	def __setCurrentToken(self, tokenType, value):
+		self.currentTokenType = tokenType
+		self.currentValue = value
+		if self.trace is not None:
+			self.trace(tokenType, value)
+
+	# returns (TokenType, value) of the token k places past the current one
+	# without advancing; lookahead(0) is the current token. (None, None) past
+	# the end of the file. the char engine can't look ahead
+	def lookahead(self, k: int):
+		assert self.engine != 'char', 'lookahead needs the regex or stream engine'
+
+		if self.engine == 'stream':
+			if k == 0:
+				return self.currentStreamToken[:2]
+			if not self.__readAhead(k):
+				return None, None
+			return self.pending[k - 1][:2]
+
+		index = self.tokenIndex - 1 + k
+		if not 0 <= index < len(self.tokens):
+			return None, None
+		return self.tokens.tokenType(index), self.tokens.value(index)
+
+	# 'file:line:column' of a source offset, by default the current token's,
+	# for error messages
+	def where(self, offset=None):
+		location = self.location(offset)
+		if location is None:
+			return self.filename
+		line, column = location
+		return f'{self.filename}:{line}:{column}'
+
+	# 1-based (line, column) of a source offset, by default the current
+	# token's. the line index is only built the first time this is called;
+	# the stream engine has no copy of the source so it rereads the file
+	def location(self, offset=None):
+		if offset is None:
+			offset = self.currentOffset
+		if offset is None:
+			return None
+
+		if self.lineIndex is None:
+			if self.engine == 'stream':
+				with open(self.filename, 'r') as jack_file:
+					self.lineIndex = LineIndex(jack_file.read())
+			else:
+				self.lineIndex = LineIndex(self.code)
+		return self.lineIndex.lineColumn(offset)
+
 	# helper function to process symbols
 	def __processSymbol(self):
 		sym = self.code[self.i]
-		self.currentSymbolValue = sym
-		self.currentTokenType = TokenType.SYMBOL
+		self.currentValue = sym
+		self.currentTokenType = SYMBOL
 		self.i += 1
 
-		# debug print
-		print(f'symbol → {sym}')
+		if self.trace is not None:
+			self.trace(SYMBOL, sym)
 
 	# helper function to process string constants
 	def __processStringConstant(self):
 		# given: the current character is a double quote; now we need to find
-		# the next double quote. code[i+1:] gives the 'rest' of the code
-		nextDblQuoteIndex = self.code[self.i+1:].index('\"') + self.i
-		self.currentTokenType = TokenType.STRING_CONST
-
-		# it's ndqi+1 because the slice endpoint is not inclusive
-		self.currentStrConstValue = self.code[self.i+1: nextDblQuoteIndex+1]
-		self.i += len(self.currentStrConstValue) + 2
-
-		# debug print
-		print(f'stringConstant → {self.currentStrConstValue}')
+		# the next double quote. searching from an offset rather than in a
+		# slice of the 'rest' of the code doesn't copy the rest of the file.
+		# like the other engines, a string constant can't span a newline
+		nextDblQuoteIndex = self.code.find('\"', self.i + 1)
+		if nextDblQuoteIndex == -1 or \
+			self.code.find('\n', self.i + 1, nextDblQuoteIndex) != -1:
+			raise ValueError(
+				f'{self.where(self.i)}: invalid character \'"\'')
+		self.currentTokenType = STRING_CONST
+		self.currentOffset = self.i + 1  # inside the opening quote
+
+		self.currentValue = self.code[self.i+1:nextDblQuoteIndex]
+		self.i = nextDblQuoteIndex + 1
+
+		if self.trace is not None:
+			self.trace(STRING_CONST, self.currentValue)
 
 	# helper function to process keywords and identifiers
 	def __processKeywordIdentifier(self):
@@ -218,21 +730,28 @@ class JackTokenizer:
 			stringBuilder += self.code[self.i]
 			self.i += 1
 
+		# the first character that can't be part of a word is an error, as
+		# the other engines report it
+		match = WORD_PATTERN.match(stringBuilder)
+		valid = match.end() if match else 0
+		if valid < len(stringBuilder):
+			raise ValueError(f'{self.where(self.currentOffset + valid)}: '
+							 f'invalid character {stringBuilder[valid]!r}')
+
 		# 🏭 detect keyword
 		if self.__isKeyword(stringBuilder):
-			self.currentTokenType = TokenType.KEYWORD
-			self.currentKeyWordValue = stringBuilder
+			self.currentTokenType = KEYWORD
+			self.currentValue = INTERNED[stringBuilder]
 
-			# debug print
-			print(f'keyword → {self.currentKeyWordValue}')
+			if self.trace is not None:
+				self.trace(KEYWORD, stringBuilder)
 		else:
-			# 🏭 detect identifier; imperfect as we'd need checks on valid chars
-			self.currentTokenType = TokenType.IDENTIFIER
-			self.currentIdentifierValue = stringBuilder
+			# 🏭 detect identifier
+			self.currentTokenType = IDENTIFIER
+			self.currentValue = stringBuilder
 
-			# debug print
-			print(f'identifier → {self.currentIdentifierValue}')
-			# print(f'{self.currentTokenType}')
+			if self.trace is not None:
+				self.trace(IDENTIFIER, stringBuilder)
 
 	# helper function to process integer constant tokens
 	def __processIntConstant(self):
@@ -245,18 +764,17 @@ class JackTokenizer:
 			intBuilder += self.code[self.i]
 			self.i += 1
 
-		# assert value does not overflow, according to spec
-		assert 0 <= int(intBuilder) <= 32767
+		checkIntConstant(intBuilder, self.currentOffset, self.where)
 
-		self.currentTokenType = TokenType.INT_CONST
-		self.currentIntConstValue = intBuilder
+		self.currentTokenType = INT_CONST
+		self.currentValue = intBuilder
 
-		# debug print
-		print(f'intConstant → {self.currentIntConstValue}')
+		if self.trace is not None:
+			self.trace(INT_CONST, intBuilder)
 
-	# returns true if next char is ⎵, \n, symbol
+	# returns true if next char is whitespace or a symbol
 	def __isDelimiter(self, char: str):
-		return self.__isSymbol(char) or (char == ' ') or (char == '\n')
+		return self.__isSymbol(char) or char in self.whitespace
 
 	# returns true if character input is in our symbols list
 	def __isSymbol(self, char: str):
@@ -269,23 +787,26 @@ class JackTokenizer:
 	def getTokenType(self):
 		return self.currentTokenType
 
+	# the accessors assert the token type as a consistency check only: callers
+	# check the type themselves first, so syntax errors never rely on these.
+	# under python -O the asserts are compiled out and each accessor is a
+	# single attribute load
 	def keyWord(self):
-		# assert tokenType
-		assert self.currentTokenType == TokenType.KEYWORD
-		return self.currentKeyWordValue
+		assert self.currentTokenType == KEYWORD
+		return self.currentValue
 
 	def symbol(self):
-		assert self.currentTokenType == TokenType.SYMBOL
-		return self.currentSymbolValue
+		assert self.currentTokenType == SYMBOL
+		return self.currentValue
 
 	def identifier(self):
-		assert self.currentTokenType == TokenType.IDENTIFIER
-		return self.currentIdentifierValue
+		assert self.currentTokenType == IDENTIFIER
+		return self.currentValue
 
 	def intVal(self):
-		assert self.currentTokenType == TokenType.INT_CONST
-		return self.currentIntConstValue
+		assert self.currentTokenType == INT_CONST
+		return self.currentValue
 
 	def stringVal(self):
-		assert self.currentTokenType == TokenType.STRING_CONST
-		return self.currentStrConstValue
+		assert self.currentTokenType == STRING_CONST
+		return self.currentValue
@@ -0,0 +1,163 @@
+"""
+@date 2026.10.18
+
+buffered output sink for CompilationEngine's XML.
+
+indentation prefixes are computed once per depth instead of per line, the tag
+strings for the five terminal types and every nonterminal are built once at
+import, and lines are collected in a list that is joined and written out in
+large blocks rather than one file write per line.
+"""
+
+from tokenizer import TokenType
+
+TERMINAL_TAGS = ['keyword', 'symbol', 'identifier', 'integerConstant',
+				 'stringConstant']
+
+NONTERMINAL_TAGS = ['class', 'classVarDec', 'subroutineDec', 'parameterList',
+					'subroutineBody', 'varDec', 'statements', 'letStatement',
+					'ifStatement', 'whileStatement', 'doStatement',
+					'returnStatement', 'expression', 'term', 'expressionList']
+
+# '<keyword> ' and ' </keyword>\n': a terminal's value goes between them
+TERMINAL_OPEN = {tag: f'<{tag}> ' for tag in TERMINAL_TAGS}
+TERMINAL_CLOSE = {tag: f' </{tag}>\n' for tag in TERMINAL_TAGS}
+
+# the only symbols that need escaping; string constants are escaped in full
+SYMBOL_ESCAPES = {'<': '&lt;', '>': '&gt;', '&': '&amp;'}
+
+# terminal tag for each TokenType value, as stored in a TokenStream
+TOKEN_TAGS = {
+	TokenType.KEYWORD.value: 'keyword',
+	TokenType.SYMBOL.value: 'symbol',
+	TokenType.IDENTIFIER.value: 'identifier',
+	TokenType.INT_CONST.value: 'integerConstant',
+	TokenType.STRING_CONST.value: 'stringConstant',
+}
+
+NONTERMINAL_OPEN = {tag: f'<{tag}>\n' for tag in NONTERMINAL_TAGS}
+NONTERMINAL_CLOSE = {tag: f'</{tag}>\n' for tag in NONTERMINAL_TAGS}
+
+
+def escapeXml(value):
+	return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+class XmlWriter:
+	# flushes once this many strings have been buffered, which keeps memory
+	# bounded when the engine streams a large file
+	flushThreshold = 1 << 14
+
+	# outputXmlUri is a path, or an open text file such as an io.StringIO,
+	# which close() flushes but leaves open
+	def __init__(self, outputXmlUri, indentUnit='  '):
+		self.ownsFile = not hasattr(outputXmlUri, 'write')
+		self.file = open(outputXmlUri, 'w') if self.ownsFile else outputXmlUri
+		self.parts = []
+		self.indentUnit = indentUnit
+		self.indents = [indentUnit * depth for depth in range(32)]
+		self.level = 0  # current indentation depth
+		self.currentIndent = ''  # self.indents[self.level], cached
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		self.close()
+
+	def indent(self):
+		self.level += 1
+		if self.level == len(self.indents):
+			self.indents.append(self.indentUnit * self.level)
+		self.currentIndent = self.indents[self.level]
+
+	def outdent(self):
+		self.level -= 1
+		self.currentIndent = self.indents[self.level]
+
+	# writes one line, s, at the current indentation. s ends with '\n'
+	def write(self, s):
+		self.parts.append(self.currentIndent + s)
+		if len(self.parts) >= self.flushThreshold:
+			self.flush()
+
+	# <tag> on its own line, then indents the contents
+	def openTag(self, tag):
+		self.parts.append(self.currentIndent + NONTERMINAL_OPEN[tag])
+		self.indent()
+
+	# outdents, then </tag> on its own line
+	def closeTag(self, tag):
+		self.level -= 1
+		self.currentIndent = self.indents[self.level]
+		self.parts.append(self.currentIndent + NONTERMINAL_CLOSE[tag])
+
+	# <tag> value </tag> for a terminal, escaping < > & in the value
+	def terminal(self, tag, value):
+		if tag == 'symbol':
+			value = SYMBOL_ESCAPES.get(value, value)
+		elif tag == 'stringConstant':
+			value = escapeXml(value)
+		self.parts.append(
+			self.currentIndent + TERMINAL_OPEN[tag] + value + TERMINAL_CLOSE[tag])
+		if len(self.parts) >= self.flushThreshold:
+			self.flush()
+
+	# <identifier kind="field" type="int" index="0"> size </identifier>: an
+	# identifier naming a variable, with its symbolTable.Symbol. names and
+	# types are identifiers or keywords, so nothing needs escaping
+	def annotatedIdentifier(self, name, symbol):
+		kind, varType, index = symbol
+		self.parts.append(
+			f'{self.currentIndent}<identifier kind="{kind}" type="{varType}" '
+			f'index="{index}"> {name} </identifier>\n')
+		if len(self.parts) >= self.flushThreshold:
+			self.flush()
+
+	# appends lines that are already indented and terminated, e.g. the output
+	# of another XmlWriter that was at the same level
+	def writeBlock(self, text):
+		self.parts.append(text)
+		if len(self.parts) >= self.flushThreshold:
+			self.flush()
+
+	def flush(self):
+		self.file.write(''.join(self.parts))
+		self.parts.clear()
+
+	# flushes remaining output and closes the file, if it was opened here.
+	# safe to call twice
+	def close(self):
+		if not self.file.closed:
+			self.flush()
+			if self.ownsFile:
+				self.file.close()
+
+
+# a whole TokenStream as a <tokens> listing, the *T.xml format. values are
+# escaped like XmlWriter.terminal() escapes them
+def tokensXml(tokens):
+	stringCode = TokenType.STRING_CONST.value
+	symbolCode = TokenType.SYMBOL.value
+	opens = {code: TERMINAL_OPEN[tag] for code, tag in TOKEN_TAGS.items()}
+	closes = {code: TERMINAL_CLOSE[tag] for code, tag in TOKEN_TAGS.items()}
+
+	parts = ['<tokens>\n']
+	append = parts.append
+	for typeCode, value in zip(tokens.types, tokens.values()):
+		if typeCode == symbolCode:
+			value = SYMBOL_ESCAPES.get(value, value)
+		elif typeCode == stringCode:
+			value = escapeXml(value)
+		append(opens[typeCode] + value + closes[typeCode])
+	append('</tokens>\n')
+	return ''.join(parts)
+
+
+# writes tokensXml(tokens) with a single write, to a path or an open text file
+def writeTokensXml(tokens, outputXmlUri):
+	if hasattr(outputXmlUri, 'write'):
+		outputXmlUri.write(tokensXml(tokens))
+		return
+	with open(outputXmlUri, 'w') as out:
+		out.write(tokensXml(tokens))